@@ -11,6 +11,7 @@ import sys
 from pathlib import Path
 import shutil
 from datetime import datetime
+from dotenv import load_dotenv
 
 # Proje kök dizinini path'e ekle
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
@@ -18,7 +19,21 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 from src.assistant import EngineeringAssistant
 from src.fault_code_manager import FaultCodeManager
 from src.document_processor import DocumentProcessor
-from src.rag_engine import RAGEngine
+from src.rag_engine import RAGEngine, training_settings
+from src.sharded_store import open_vector_store
+from src.ollama_health import get_monitor
+from src.llm_scheduler import QueueFullError
+
+
+# .env dosyasını yükle (training ve Ollama ayarları scripts/train_rag.py ile aynı)
+load_dotenv()
+
+# Vektör DB klasörü (eski sürümler tek dosya vectordb.pkl kullanıyordu)
+VECTOR_DB_PATH = './data/vector_store/vectordb'
+LEGACY_VECTOR_DB_PATH = VECTOR_DB_PATH + '.pkl'
+# Ollama sağlık yoklaması (arka planda, saniye aralıkla)
+OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+OLLAMA_HEALTH_TTL = float(os.getenv('OLLAMA_HEALTH_TTL', '30'))
 
 
 # Sayfa konfigürasyonu
@@ -72,28 +87,52 @@ def init_session_state():
         st.session_state.chat_history = []
     if 'training_done' not in st.session_state:
         st.session_state.training_done = check_training_status()
+    if 'selected_generator_id' not in st.session_state:
+        st.session_state.selected_generator_id = None
 
 
 def check_training_status():
     """Training yapılmış mı kontrol et"""
-    vector_db_path = './data/vector_store/vectordb.pkl'
-    return os.path.exists(vector_db_path)
+    return os.path.exists(VECTOR_DB_PATH) or os.path.exists(LEGACY_VECTOR_DB_PATH)
+
+
+def release_assistant():
+    """
+    Oturumdaki asistanın vektör DB dosyalarını bırak ve asistanı sıfırla
+
+    DB yeniden yazılmadan/silinmeden önce çağrılır: eski store'un açık
+    dosyaları Windows'ta yazmayı engeller ve oturum eski DB'yi kullanmaya
+    devam ederdi. Sonraki sorguda asistan güncel DB ile yeniden yüklenir.
+    """
+    if st.session_state.assistant is not None:
+        st.session_state.assistant.close()
+    st.session_state.assistant = None
+
+
+def remove_from_vector_db(source):
+    """Silinen PDF'in chunk'larını vektör DB'den çıkar (yeniden training gerekmez)"""
+    if not os.path.isdir(VECTOR_DB_PATH):
+        return 0
+    store = open_vector_store(VECTOR_DB_PATH)
+    removed = store.delete_source(source)
+    if removed:
+        release_assistant()
+        store.save(VECTOR_DB_PATH)
+    return removed
 
 
 def check_ollama():
-    """Ollama servisini kontrol et"""
-    try:
-        import ollama
-        result = ollama.list()
-        # Yeni API: result.models (ListResponse objesi)
-        # Eski API: result['models'] (dict)
-        if hasattr(result, 'models'):
-            return True, result.models
-        elif isinstance(result, dict):
-            return True, result.get('models', [])
-        return True, []
-    except Exception:
-        return False, []
+    """
+    Ollama durumu (arka plandaki sağlık izleyicisinin son sonucu)
+    
+    Sayfa çizimi ağı beklemez; izleyici Ollama'yı OLLAMA_HEALTH_TTL
+    saniyede bir yoklar.
+    
+    Returns:
+        (çalışıyor mu (None = henüz bilinmiyor), yüklü model adları)
+    """
+    status = get_monitor(OLLAMA_URL, ttl=OLLAMA_HEALTH_TTL).status()
+    return status['ok'], status['models']
 
 
 def load_assistant():
@@ -101,7 +140,12 @@ def load_assistant():
     if st.session_state.assistant is None:
         try:
             with st.spinner('🤖 Asistan yükleniyor...'):
-                st.session_state.assistant = EngineeringAssistant()
+                assistant = EngineeringAssistant()
+                # CLI'da ertelenen yükleme web arayüzünde spinner altında yapılır
+                assistant.rag_engine.embedder
+                # Ollama modeli ilk sorudan önce arka planda yüklenir
+                assistant.warm_up()
+                st.session_state.assistant = assistant
             return True
         except Exception as e:
             st.error(f"❌ Asistan yüklenemedi: {str(e)}")
@@ -134,12 +178,9 @@ with st.sidebar:
     if ollama_ok:
         st.success("✅ Ollama Çalışıyor")
         if ollama_models:
-            try:
-                m = ollama_models[0]
-                model_name = m.model if hasattr(m, 'model') else m.get('name', m.get('model', 'N/A'))
-                st.caption(f"Model: {model_name}")
-            except Exception:
-                st.caption("Model: Yüklü")
+            st.caption(f"Model: {ollama_models[0]}")
+    elif ollama_ok is None:
+        st.info("⏳ Ollama kontrol ediliyor...")
     else:
         st.error("❌ Ollama Bulunamadı")
         st.caption("[Nasıl kurulur?](#)")
@@ -276,6 +317,7 @@ elif page == "📚 Training":
                 with col2:
                     if st.button("🗑️", key=f"del_{pdf}"):
                         os.remove(os.path.join(pdf_folder, pdf))
+                        remove_from_vector_db(pdf)
                         st.rerun()
         else:
             st.info("Henüz PDF yüklenmemiş")
@@ -300,8 +342,12 @@ elif page == "📚 Training":
             status_text.text("📄 PDF'ler işleniyor...")
             progress_bar.progress(20)
             
-            processor = DocumentProcessor(chunk_size=800, overlap=200)
-            chunks = processor.process_all_pdfs(pdf_folder)
+            # Embedding arka ucu, önbellek, işçi sayısı, indeks tipi ve saklama
+            # tipi .env'den (scripts/train_rag.py ile aynı)
+            settings = training_settings()
+            processor = DocumentProcessor(chunk_size=settings['chunk_size'], overlap=settings['chunk_overlap'])
+            generator_map = FaultCodeManager().get_manual_generator_map()
+            chunks = processor.process_all_pdfs(pdf_folder, generator_map=generator_map)
             
             if not chunks:
                 st.error("❌ Hiç chunk oluşturulamadı!")
@@ -311,7 +357,7 @@ elif page == "📚 Training":
             status_text.text("🧠 RAG Engine başlatılıyor...")
             progress_bar.progress(40)
             
-            rag = RAGEngine(embedding_model="all-MiniLM-L6-v2", llm_model="mistral")
+            rag = RAGEngine(llm_model="mistral", **settings['engine'])
             
             # 3. Embedding oluştur
             status_text.text("🔄 Embedding'ler oluşturuluyor...")
@@ -323,18 +369,22 @@ elif page == "📚 Training":
             status_text.text("💾 Vektör veritabanı kaydediliyor...")
             progress_bar.progress(80)
             
-            vector_db_path = './data/vector_store/vectordb.pkl'
-            rag.save_vector_db(vector_db_path)
+            release_assistant()
+            rag.save_vector_db(VECTOR_DB_PATH, shard_by=settings['shard_by'])
             
             # Tamamlandı
             progress_bar.progress(100)
             status_text.text("✅ Training tamamlandı!")
             
+            cache = rag.embedding_cache
+            cache_line = (f"Embedding önbelleği: {cache.hits} isabet / {cache.misses} yeni (%{cache.hit_rate * 100:.0f})"
+                          if cache is not None else "Embedding önbelleği: kapalı")
             st.success(f"""
             🎉 **Training Başarılı!**
             
             - {len(pdf_files)} PDF işlendi
             - {len(chunks)} chunk oluşturuldu
+            - {cache_line}
             - Vektör DB kaydedildi
             
             Artık sorgulama yapabilirsiniz!
@@ -362,6 +412,11 @@ elif page == "💬 Sorgulama":
     
     st.markdown("Jeneratör hakkında sorularınızı sorun. AI asistan, yüklediğiniz manuellerden bilgi çekerek cevap verecek.")
     
+    selected_generator_id = st.session_state.selected_generator_id
+    if selected_generator_id:
+        st.caption(f"🏭 Arama seçili jeneratörün manuelleriyle sınırlı: **{selected_generator_id}** "
+                   f"(🔍 Arıza Kodları sekmesinden değiştirilebilir)")
+    
     # Chat geçmişi
     for message in st.session_state.chat_history:
         with st.chat_message(message["role"]):
@@ -376,20 +431,44 @@ elif page == "💬 Sorgulama":
         
         # Asistan cevabı
         with st.chat_message("assistant"):
-            with st.spinner("Düşünüyor..."):
-                try:
-                    answer = st.session_state.assistant.query(prompt, top_k=3)
-                    st.markdown(answer)
-                    st.session_state.chat_history.append({"role": "assistant", "content": answer})
-                except Exception as e:
-                    error_msg = f"❌ Hata: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.chat_history.append({"role": "assistant", "content": error_msg})
+            try:
+                assistant = st.session_state.assistant
+                stream = assistant.query_stream(prompt, top_k=3, generator_id=selected_generator_id)
+                
+                # Arama ve ilk token beklenirken spinner, sonra cevap geldikçe yazılır
+                with st.spinner("Düşünüyor..."):
+                    answer = next(stream, "")
+                placeholder = st.empty()
+                placeholder.markdown(answer + "▌")
+                for piece in stream:
+                    answer += piece
+                    placeholder.markdown(answer + "▌")
+                placeholder.markdown(answer)
+                st.caption(assistant.format_timing())
+                st.session_state.chat_history.append({"role": "assistant", "content": answer})
+            except QueueFullError as e:
+                # Paylaşılan LLM kuyruğu dolu: istek hiç gönderilmedi
+                st.warning(f"⏳ {str(e)}")
+            except Exception as e:
+                error_msg = f"❌ Hata: {str(e)}"
+                st.error(error_msg)
+                st.session_state.chat_history.append({"role": "assistant", "content": error_msg})
     
     # Chat temizleme
     if st.button("🗑️ Sohbeti Temizle"):
         st.session_state.chat_history = []
         st.rerun()
+    
+    # Benzer soru önbelleği metrikleri
+    with st.expander("♻️ Önbellek İstatistikleri"):
+        assistant = st.session_state.assistant
+        st.caption(assistant.format_cache_stats())
+        for line in assistant.format_llm_stats().splitlines():
+            st.caption(line)
+        if assistant.last_timing.get('cached') == 'semantic':
+            if st.button("👎 Son cevap bu soruya uymuyor"):
+                assistant.semantic_cache.report_false_hit()
+                st.success("Geri bildirim kaydedildi, cevap önbellekten çıkarıldı")
 
 
 # 🔍 ARIZA KODLARI SAYFASI
@@ -409,10 +488,14 @@ elif page == "🔍 Arıza Kodları":
         "Jeneratör Modeli",
         range(len(generator_options)),
         format_func=lambda x: generator_options[x],
+        index=generator_ids.index(st.session_state.selected_generator_id)
+        if st.session_state.selected_generator_id in generator_ids else 0,
         help="Filtrelemek için bir jeneratör seçin"
     )
     
     selected_generator_id = generator_ids[selected_index]
+    # Sorgulama sayfasında doküman araması bu jeneratörle sınırlanır
+    st.session_state.selected_generator_id = selected_generator_id
     
     # Seçili jeneratör bilgisi
     if selected_generator_id and selected_generator_id != "general":
@@ -555,9 +638,12 @@ elif page == "⚙️ Ayarlar":
     
     with col1:
         if st.button("🗑️ Vektör DB'yi Temizle", help="Training'i sıfırlar"):
-            vector_db_path = './data/vector_store/vectordb.pkl'
-            if os.path.exists(vector_db_path):
-                os.remove(vector_db_path)
+            if check_training_status():
+                release_assistant()
+                if os.path.exists(VECTOR_DB_PATH):
+                    shutil.rmtree(VECTOR_DB_PATH)
+                if os.path.exists(LEGACY_VECTOR_DB_PATH):
+                    os.remove(LEGACY_VECTOR_DB_PATH)
                 st.success("✅ Vektör DB temizlendi")
                 st.session_state.training_done = False
                 st.rerun()
@@ -584,12 +670,11 @@ elif page == "⚙️ Ayarlar":
     # Ollama
     ollama_ok, models = check_ollama()
     if ollama_ok and models:
-        try:
-            m = models[0]
-            model_name = m.model if hasattr(m, 'model') else m.get('name', m.get('model', 'N/A'))
-            st.write(f"🤖 Ollama Model: {model_name}")
-        except Exception:
-            st.write("🤖 Ollama: Çalışıyor")
+        st.write(f"🤖 Ollama Model: {', '.join(models)}")
+    elif ollama_ok:
+        st.write("🤖 Ollama: Çalışıyor")
+    if st.button("🔄 Ollama Durumunu Yenile"):
+        get_monitor(OLLAMA_URL).refresh()
     
     # Training durumu
     st.write(f"📊 Training: {'✅ Tamamlandı' if st.session_state.training_done else '❌ Yapılmadı'}")
@@ -41,6 +41,12 @@ def main():
         default=3,
         help='Kaç doküman chunk\'ı kullanılacak (varsayılan: 3)'
     )
+    query_parser.add_argument(
+        '-g', '--generator',
+        type=str,
+        default=None,
+        help='Aramayı bu jeneratörün manuelleriyle sınırla (örn: caterpillar_3406)'
+    )
     
     # Fault komutu
     fault_parser = subparsers.add_parser('fault', help='Arıza kodu analizi')
@@ -80,11 +86,15 @@ def main():
         print(f"❌ Asistan başlatılamadı: {str(e)}")
         return
     
+    # Doküman sorgularında model arka planda yüklenir (arıza kodu komutları Ollama'ya gitmez)
+    if args.command in ('query', 'interactive'):
+        assistant.warm_up()
+    
     # Komutları işle
     try:
         if args.command == 'query':
-            answer = assistant.query(args.question, top_k=args.top_k)
-            print(f"\n🤖 Cevap:\n{answer}\n")
+            # Cevap token token yazdırılır, sonunda ilk token / toplam süre
+            assistant.print_answer(args.question, top_k=args.top_k, generator_id=args.generator)
         
         elif args.command == 'fault':
             result = assistant.analyze_fault(args.code)
@@ -0,0 +1,253 @@
+"""
+Uçtan Uca Gecikme Benchmark Script'i
+
+EngineeringAssistant.query_stream'i (arıza kodu araması + doküman
+araması + prompt + LLM akışı) gerçek Ollama yerine ayarlanabilir
+gecikmeli sahte bir Ollama sunucusuyla (src/mock_ollama.py) çalıştırır.
+LLM süresi sabit olduğu için arama ve orkestrasyon (prompt paketleme,
+kuyruk, HTTP) gerilemeleri model olmadan yakalanır.
+
+Aşama başına p50/p95/p99 raporlanır:
+    arama       : arıza kodu + doküman araması
+    ek yük      : ilk token - arama - sunucunun ilk token gecikmesi
+    ilk token   : sorgu başından ilk parçaya
+    üretim      : ilk parçadan son parçaya
+    toplam      : sorgunun tamamı
+
+Vektör DB yoksa (veya --synthetic verilirse) örnek bakım cümlelerinden
+geçici bir DB oluşturulur. --embedder hash, embedding modeli indirilemeyen
+ortamlarda (CI) model yerine sabit bir özetleme (feature hashing)
+kullanır; arama kalitesi değil, hız ölçülür.
+
+Kullanım:
+    python scripts/benchmark_e2e.py
+    python scripts/benchmark_e2e.py --repeat 5 --concurrency 4 --ttft 0.3 --tps 25
+    python scripts/benchmark_e2e.py --synthetic 2000 --embedder hash
+"""
+
+import io
+import os
+import sys
+import zlib
+import time
+import argparse
+import tempfile
+import threading
+from contextlib import redirect_stdout
+import numpy as np
+from dotenv import load_dotenv
+
+# Proje kök dizinini Python path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_scheduler import percentile
+from src.mock_ollama import MockOllamaServer
+
+
+SAMPLE_SENTENCES = [
+    "Motor yağı her {n} saatte bir değiştirilmelidir, tahliye tapası {n} Nm ile sıkılır.",
+    "E{n} arızası düşük yağ basıncını gösterir, yağ pompasını ve filtreyi kontrol edin.",
+    "Silindir kapağı cıvataları {n} Nm torkla çapraz sırayla sıkılır.",
+    "Yakıt filtresi {n} saatlik bakımda değiştirilir, ardından sistemin havası alınır.",
+    "Soğutma suyu sıcaklığı {n} derecenin üzerine çıkarsa motor durdurulur.",
+    "Akü voltajı {n} voltun altına düşerse marş motoru çalışmaz, şarj devresini ölçün.",
+    "Hava filtresi gösterge kırmızıya döndüğünde ({n}. kademe) temizlenmelidir.",
+    "Alternatör kayışı gerginliği {n} mm sehim olacak şekilde ayarlanır.",
+]
+
+QUERIES = [
+    "Yağ değişimi nasıl yapılır?",
+    "500 saatlik bakımda neler yapılır",
+    "Motor aşırı ısınıyor ne yapmalıyım",
+    "Akü şarj olmuyor",
+    "Yakıt sisteminin havası nasıl alınır",
+    "Silindir kapağı tork değeri nedir",
+    "Kayış gerginliği nasıl ayarlanır",
+    "Hava filtresi ne zaman temizlenir",
+]
+
+STAGES = [
+    ('retrieval', 'Arama'),
+    ('overhead', 'Ek yük'),
+    ('ttft', 'İlk token'),
+    ('generation', 'Üretim'),
+    ('total', 'Toplam'),
+]
+
+
+class HashingEmbedder:
+    """Model gerektirmeyen sabit embedding (kelime ve 3'lü harf özetleri)"""
+
+    model_name = 'hash'
+    backend = 'torch'
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode_single(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode('utf-8')) % self.dim] += 1.0
+            for i in range(max(1, len(word) - 2)):
+                vector[zlib.crc32(word[i:i + 3].encode('utf-8')) % self.dim] += 0.5
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def encode(self, texts):
+        return np.stack([self.encode_single(text) for text in texts])
+
+    def encode_corpus(self, texts, batch_size: int = 32, workers: int = 1):
+        return self.encode(texts)
+
+
+def build_synthetic_db(path: str, size: int, embedder) -> str:
+    """Örnek cümlelerden vektör DB oluştur"""
+    from src.rag_engine import RAGEngine
+
+    rng = np.random.default_rng(42)
+    chunks = []
+    for i in range(size):
+        sentences = [
+            SAMPLE_SENTENCES[(i + j) % len(SAMPLE_SENTENCES)].format(n=int(rng.integers(1, 1000)))
+            for j in range(4)
+        ]
+        chunks.append({
+            'text': ' '.join(sentences),
+            'source': f'manual_{i % 20}.pdf',
+            'chunk_id': i,
+            'start_char': 0,
+            'generator_id': 'general',
+        })
+    rag = RAGEngine()
+    if embedder is not None:
+        rag.embedder = embedder
+    rag.add_documents(chunks)
+    rag.save_vector_db(path)
+    return path
+
+
+def create_assistant(db_path: str, embedder):
+    """Sahte sunucuya bağlı asistan (embedding modeli paylaşılır)"""
+    from src.assistant import EngineeringAssistant
+
+    assistant = EngineeringAssistant(vector_db_path=db_path)
+    if embedder is not None:
+        assistant.rag_engine.embedder = embedder
+    return assistant
+
+
+def run_queries(assistant, queries, server_ttft: float, results: list):
+    """Soruları sırayla sor, aşama sürelerini topla"""
+    for question in queries:
+        start = time.perf_counter()
+        pieces = list(assistant.query_stream(question))
+        total = time.perf_counter() - start
+        timing = dict(assistant.last_timing)
+        ttft = timing['ttft'] if timing['ttft'] is not None else total
+        load = timing.get('load') or 0.0
+        results.append({
+            'retrieval': timing['retrieval'],
+            'overhead': max(0.0, ttft - timing['retrieval'] - server_ttft - load),
+            'ttft': ttft,
+            'generation': total - ttft,
+            'total': total,
+            'chars': len(''.join(pieces)),
+        })
+
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Sahte Ollama ile uçtan uca gecikme raporu')
+    parser.add_argument('--db', default=os.getenv('VECTOR_DB_PATH', './data/vector_store/vectordb'))
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Bu kadar chunk\'lık geçici örnek DB kullan (0 = --db, yoksa 500)')
+    parser.add_argument('--embedder', choices=['model', 'hash'], default='model',
+                        help='model: EMBEDDING_MODEL, hash: modelsiz sabit embedding')
+    parser.add_argument('--repeat', type=int, default=3, help='Soru listesi kaç kez sorulacak')
+    parser.add_argument('--concurrency', type=int, default=1, help='Aynı anda soru soran kullanıcı')
+    parser.add_argument('--ttft', type=float, default=0.2, help='Sunucunun ilk token gecikmesi (s)')
+    parser.add_argument('--tps', type=float, default=50.0, help='Sunucunun saniyedeki token\'ı')
+    parser.add_argument('--load-time', type=float, default=1.0, help='Sunucuda soğuk model yükleme (s)')
+    parser.add_argument('--parallel', type=int, default=4, help='Sunucuda aynı anda işlenen istek')
+    parser.add_argument('--cache', action='store_true', help='LLM ve benzer soru önbelleklerini açık bırak')
+    args = parser.parse_args()
+
+    server = MockOllamaServer(ttft=args.ttft, tokens_per_sec=args.tps,
+                              load_time=args.load_time, parallel=args.parallel).start()
+    os.environ['OLLAMA_URL'] = server.url
+    os.environ['OLLAMA_MODEL'] = 'mistral'
+    if not args.cache:
+        # Her soru LLM'e gitsin (tekrar eden sorular önbellekten gelmesin)
+        os.environ['LLM_CACHE_PATH'] = ''
+        os.environ['SEMANTIC_CACHE_SIZE'] = '0'
+
+    embedder = HashingEmbedder() if args.embedder == 'hash' else None
+    temp_dir = None
+    db_path = args.db
+    if args.synthetic or not os.path.exists(db_path):
+        temp_dir = tempfile.TemporaryDirectory()
+        size = args.synthetic or 500
+        with redirect_stdout(io.StringIO()):
+            if embedder is None:
+                from src.rag_engine import Embedder
+                embedder = Embedder(os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2'))
+            db_path = build_synthetic_db(os.path.join(temp_dir.name, 'vectordb'), size, embedder)
+        db_name = f'örnek DB ({size} chunk)'
+    else:
+        db_name = db_path
+
+    print("=" * 78)
+    print("⏱️  Uçtan Uca Gecikme Benchmark (sahte Ollama)")
+    print("=" * 78)
+    print(f"\nSunucu: {server.url} | ilk token {args.ttft} s | {args.tps:.0f} token/s | "
+          f"yükleme {args.load_time} s | paralel {args.parallel}")
+    print(f"Vektör DB: {db_name} | embedding: {args.embedder} | "
+          f"{args.concurrency} kullanıcı x {args.repeat} x {len(QUERIES)} soru\n")
+
+    with redirect_stdout(io.StringIO()):
+        assistants = [create_assistant(db_path, embedder) for _ in range(args.concurrency)]
+        if embedder is None:
+            embedder = assistants[0].rag_engine.embedder
+            for assistant in assistants[1:]:
+                assistant.rag_engine.embedder = embedder
+        # İlk sorgu (model ve önbellek ısınması) ölçüme katılmaz
+        assistants[0].rag_engine.warm_up()
+        run_queries(assistants[0], QUERIES[:1], args.ttft, [])
+
+    results = []
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        threads = [
+            threading.Thread(target=run_queries, args=(assistant, QUERIES * args.repeat, args.ttft, results))
+            for assistant in assistants
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Aşama':<11} | {'p50 (ms)':>10} | {'p95 (ms)':>10} | {'p99 (ms)':>10} | {'ort. (ms)':>10}")
+    print("-" * 63)
+    for key, label in STAGES:
+        values = [r[key] * 1000 for r in results]
+        print(f"{label:<11} | {percentile(values, 50):>10.1f} | {percentile(values, 95):>10.1f} | "
+              f"{percentile(values, 99):>10.1f} | {np.mean(values):>10.1f}")
+
+    print(f"\nSorgu: {len(results)} | Süre: {elapsed:.1f} s | Verim: {len(results) / elapsed:.2f} sorgu/s")
+    print(f"Sunucu: {len(server.requests)} istek | aynı anda en fazla {server.max_active} işlendi")
+    llm_stats = assistants[0].format_llm_stats()
+    if llm_stats:
+        print(llm_stats)
+    print("\nNot: 'Ek yük' sunucu gecikmesi dışındaki ilk token süresidir (prompt, kuyruk, HTTP);")
+    print("sunucu ayarları sabitken artış arama/orkestrasyon gerilemesi demektir.")
+    print("\n" + "=" * 78 + "\n")
+
+    server.stop()
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
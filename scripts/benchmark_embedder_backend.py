@@ -0,0 +1,148 @@
+"""
+Embedding Arka Ucu Benchmark Script'i
+
+torch / onnx / onnx-int8 arka uçlarını karşılaştırır: model yükleme
+süresi, tek sorgu gecikmesi (p50), toplu encode verimi ve torch'a göre
+arama uyumu (aynı korpus ve sorgularla top-k örtüşmesi, embedding
+cosine benzerliği).
+
+Korpus olarak vektör DB'deki chunk'lar kullanılır; DB yoksa örnek
+Türkçe bakım cümleleri üretilir.
+
+Kullanım:
+    python scripts/benchmark_embedder_backend.py
+    python scripts/benchmark_embedder_backend.py --backends torch onnx-int8 --corpus 2000
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+
+# Proje kök dizinini Python path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.embedding_backends import BACKENDS
+from src.vector_index import top_k_indices
+
+
+SAMPLE_SENTENCES = [
+    "Motor yağı her {n} saatte bir değiştirilmelidir.",
+    "E{n} arızası düşük yağ basıncını gösterir, yağ pompasını kontrol edin.",
+    "Silindir kapağı cıvataları {n} Nm torkla çapraz sırayla sıkılır.",
+    "Yakıt filtresi {n} saatlik bakımda değiştirilir, sistemin havası alınır.",
+    "Soğutma suyu sıcaklığı {n} derecenin üzerine çıkarsa motor durdurulur.",
+    "Akü voltajı {n} voltun altına düşerse marş motoru çalışmaz.",
+    "Hava filtresi gösterge kırmızıya döndüğünde ({n}. kademe) temizlenmelidir.",
+    "Alternatör kayışı gerginliği {n} mm sehim olacak şekilde ayarlanır.",
+]
+
+QUERIES = [
+    "Yağ değişimi nasıl yapılır?",
+    "500 saatlik bakımda neler yapılır",
+    "E101 arızası",
+    "Motor aşırı ısınıyor",
+    "Akü şarj olmuyor",
+    "Yakıt sisteminin havası nasıl alınır",
+    "Silindir kapağı tork değeri",
+    "Kayış gerginliği ayarı",
+]
+
+
+def load_corpus(db_path: str, size: int):
+    """Vektör DB chunk metinleri (yoksa örnek cümleler)"""
+    if os.path.exists(db_path):
+        from src.sharded_store import open_vector_store
+        store = open_vector_store(db_path)
+        chunks = getattr(store, 'chunks', None)
+        if chunks is not None and len(chunks) > 0:
+            return [chunks[i]['text'] for i in range(min(size, len(chunks)))], db_path
+    rng = np.random.default_rng(42)
+    texts = [
+        SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)].format(n=int(rng.integers(1, 1000)))
+        for i in range(size)
+    ]
+    return texts, 'örnek cümleler'
+
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Embedding arka ucu gecikme/verim/uyum raporu')
+    parser.add_argument('--model', default=os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2'))
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--db', default=os.getenv('VECTOR_DB_PATH', './data/vector_store/vectordb'))
+    parser.add_argument('--corpus', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from src.rag_engine import Embedder
+
+    texts, corpus_name = load_corpus(args.db, args.corpus)
+
+    print("=" * 78)
+    print("⚡ Embedding Arka Ucu Benchmark")
+    print("=" * 78)
+    print(f"\nModel: {args.model} | Korpus: {len(texts)} metin ({corpus_name}) | "
+          f"batch: {args.batch_size} | top_k: {args.top_k}\n")
+
+    results = {}
+    for backend in args.backends:
+        start = time.perf_counter()
+        try:
+            embedder = Embedder(args.model, backend=backend)
+        except Exception as e:
+            print(f"⚠️  {backend} atlandı: {e}\n")
+            continue
+        load_time = time.perf_counter() - start
+
+        embedder.encode_single(QUERIES[0])  # Isınma
+        latencies = []
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            embedder.encode_single(QUERIES[i % len(QUERIES)])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        corpus = embedder.encode_corpus(texts, batch_size=args.batch_size)
+        throughput = len(texts) / (time.perf_counter() - start)
+        queries = np.stack([embedder.encode_single(q) for q in QUERIES])
+
+        results[backend] = {
+            'load': load_time,
+            'p50': float(np.median(latencies)),
+            'throughput': throughput,
+            'corpus': corpus / np.linalg.norm(corpus, axis=1, keepdims=True),
+            'queries': queries / np.linalg.norm(queries, axis=1, keepdims=True),
+        }
+
+    if not results:
+        print("❌ Hiçbir arka uç yüklenemedi")
+        return
+
+    reference = results.get('torch') or next(iter(results.values()))
+    ref_name = 'torch' if 'torch' in results else next(iter(results))
+    ref_top = [set(top_k_indices(reference['corpus'] @ q, args.top_k)) for q in reference['queries']]
+
+    print(f"\n{'Arka uç':<11} | {'Yükleme (s)':>11} | {'Sorgu p50 (ms)':>14} | "
+          f"{'Verim (metin/s)':>15} | {'Top-k uyumu':>11} | {'Cosine':>7}")
+    print("-" * 86)
+    for backend, r in results.items():
+        top = [set(top_k_indices(r['corpus'] @ q, args.top_k)) for q in r['queries']]
+        agreement = np.mean([len(a & b) / args.top_k for a, b in zip(top, ref_top)])
+        cosine = float(np.mean(np.sum(r['corpus'] * reference['corpus'], axis=1)))
+        print(f"{backend:<11} | {r['load']:>11.1f} | {r['p50']:>14.2f} | "
+              f"{r['throughput']:>15.0f} | {agreement:>11.1%} | {cosine:>7.4f}")
+
+    print(f"\nNot: Uyum ve cosine {ref_name} arka ucuna göredir. Vektör DB bir arka uçla")
+    print("oluşturulup sorgular diğeriyle yapılabilir; uyum düşükse yeniden training yapın.")
+    print("\n" + "=" * 78 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Embedding Kuantizasyon Benchmark Script'i
+
+float32 / float16 / int8 saklama modlarını karşılaştırır:
+skorlanan matrisin bellek kullanımı, tam aramaya göre recall@k ve
+sorgu başına gecikme (yeniden skorlamalı ve skorlamasız).
+
+Kullanım:
+    python scripts/benchmark_quantization.py
+    python scripts/benchmark_quantization.py --size 200000 --rescore-factor 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Proje kök dizinini Python path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import VectorStore
+from src.vector_index import top_k_indices
+
+
+def make_store(embeddings: np.ndarray, quantization: str, rescore: bool, factor: int) -> VectorStore:
+    """Verilen modda VectorStore oluştur"""
+    store = VectorStore(
+        embedding_dim=embeddings.shape[1],
+        quantization=quantization,
+        rescore=rescore,
+        rescore_factor=factor
+    )
+    chunks = [{'text': '', 'source': 'bench.pdf', 'chunk_id': i} for i in range(len(embeddings))]
+    store.add_documents(chunks, embeddings)
+    store.build_index()
+    return store
+
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    parser = argparse.ArgumentParser(description='Embedding kuantizasyon bellek/recall raporu')
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--rescore-factor', type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    topics = rng.standard_normal((200, args.dim)).astype(np.float32)
+    embeddings = VectorStore._normalize(
+        topics[rng.integers(0, 200, size=args.size)]
+        + rng.standard_normal((args.size, args.dim)).astype(np.float32) * 0.6
+    )
+    queries = VectorStore._normalize(
+        embeddings[rng.integers(0, args.size, size=args.queries)]
+        + rng.standard_normal((args.queries, args.dim)).astype(np.float32) * 0.3
+    )
+    truth = [set(top_k_indices(embeddings @ q, args.top_k)) for q in queries]
+
+    print("=" * 70)
+    print("🗜️  Embedding Kuantizasyon Benchmark")
+    print("=" * 70)
+    print(f"\nChunk: {args.size} | Boyut: {args.dim} | Sorgu: {args.queries} | "
+          f"top_k: {args.top_k} | rescore x{args.rescore_factor}\n")
+    print(f"{'Mod':<22} | {'Bellek (MB)':>11} | {'Recall@k':>9} | {'ms/sorgu':>9}")
+    print("-" * 62)
+
+    configs = [
+        ('float32', False),
+        ('float16', False),
+        ('float16', True),
+        ('int8', False),
+        ('int8', True),
+    ]
+    for mode, rescore in configs:
+        store = make_store(embeddings, mode, rescore, args.rescore_factor)
+        scored = store.codes if store.codes is not None else store.embeddings
+
+        start = time.perf_counter()
+        results = [store.search(q, top_k=args.top_k) for q in queries]
+        ms = (time.perf_counter() - start) / args.queries * 1000
+
+        hits = sum(
+            len({r['chunk_id'] for r in found} & expected)
+            for found, expected in zip(results, truth)
+        )
+        recall = hits / (args.queries * args.top_k)
+        name = f"{mode}{' + rescore' if rescore else ''}"
+        print(f"{name:<22} | {scored.nbytes / 2**20:>11.1f} | {recall:>9.3f} | {ms:>9.3f}")
+
+    print("\nNot: Bellek, sorgu sırasında skorlanan matrisi gösterir. Yeniden skorlama")
+    print("diskteki float32 matristen (mmap) yalnızca kısa liste satırlarını okur.")
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+CLI Açılış Süresi Benchmark Script'i
+
+main.py alt komutlarını ayrı Python işlemlerinde çalıştırıp açılıştan
+çıkışa kadar geçen süreyi ölçer ve hangi ağır modüllerin (torch,
+sentence_transformers, ollama) yüklendiğini raporlar. Arıza kodu
+komutları bu modüllerin hiçbirini yüklememelidir.
+
+Kullanım:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --repeat 10 --with-query
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ('torch', 'sentence_transformers', 'ollama', 'numpy')
+
+# Alt işlemde main.py'yi çalıştırır, sonra yüklenen ağır modülleri yazar
+_RUNNER = f"""
+import sys
+sys.argv = ['main.py'] + sys.argv[1:]
+import main
+main.main()
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print('@@HEAVY@@' + ','.join(loaded))
+"""
+
+COMMANDS = [
+    ['--help'],
+    ['fault', 'E101'],
+    ['symptom', 'titreşim'],
+    ['critical'],
+]
+
+
+def run_once(args):
+    """Alt komutu bir kez çalıştır: (süre ms, yüklenen ağır modüller)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', _RUNNER, *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding='utf-8'
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    heavy = ''
+    for line in result.stdout.splitlines():
+        if line.startswith('@@HEAVY@@'):
+            heavy = line[len('@@HEAVY@@'):]
+    return elapsed, heavy
+
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    parser = argparse.ArgumentParser(description='main.py alt komutlarının açılış süresi')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--with-query', action='store_true',
+                        help='query komutunu da ölç (embedding modeli + Ollama gerekir)')
+    args = parser.parse_args()
+
+    commands = COMMANDS + ([['query', 'E101']] if args.with_query else [])
+
+    # Python yorumlayıcısının kendi açılışı (taban çizgisi)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'])
+        timings.append((time.perf_counter() - start) * 1000)
+    baseline = statistics.median(timings)
+
+    print("=" * 70)
+    print("⏱️  CLI Açılış Süresi Benchmark")
+    print("=" * 70)
+    print(f"\nTekrar: {args.repeat} | Boş Python açılışı: {baseline:.0f} ms\n")
+    print(f"{'Komut':<22} | {'Medyan (ms)':>11} | {'En iyi (ms)':>11} | Ağır modüller")
+    print("-" * 70)
+
+    for command in commands:
+        results = [run_once(command) for _ in range(args.repeat)]
+        times = [elapsed for elapsed, _ in results]
+        heavy = results[-1][1] or '-'
+        name = ' '.join(command)
+        print(f"{name:<22} | {statistics.median(times):>11.0f} | {min(times):>11.0f} | {heavy}")
+
+    print("\nNot: fault/symptom/critical komutları sadece arıza kodu JSON'unu okur;")
+    print("torch ve embedding modeli yalnızca doküman sorgularında yüklenir.")
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Vektör Arama Benchmark Script'i
+
+Farklı korpus boyutlarında sorgu başına arama gecikmesini ölçer.
+Eski yöntem (her sorguda tüm matrisi yeniden normalize etme) ile
+önceden normalize edilmiş matris üzerinde tek matris-vektör çarpımı
+karşılaştırılır.
+
+Kullanım:
+    python scripts/benchmark_vector_search.py
+    python scripts/benchmark_vector_search.py --sizes 1000 10000 100000 --queries 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Proje kök dizinini Python path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import VectorStore
+
+
+def make_store(n_chunks: int, dim: int, rng: np.random.Generator) -> VectorStore:
+    """Rastgele embedding'lerle doldurulmuş bir VectorStore oluştur"""
+    store = VectorStore(embedding_dim=dim)
+    embeddings = rng.standard_normal((n_chunks, dim)).astype(np.float32)
+    chunks = [{'text': '', 'source': 'bench.pdf', 'chunk_id': i} for i in range(n_chunks)]
+    store.add_documents(chunks, embeddings)
+    store.build_index()
+    return store
+
+
+def legacy_search(embeddings: np.ndarray, query: np.ndarray, top_k: int) -> np.ndarray:
+    """Eski arama: her sorguda tüm korpus normalize edilir ve tam sıralanır"""
+    query_norm = query / np.linalg.norm(query)
+    embeddings_norm = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    similarities = np.dot(embeddings_norm, query_norm)
+    return np.argsort(similarities)[::-1][:top_k]
+
+
+def time_per_query(fn, queries: np.ndarray) -> float:
+    """Sorgu başına ortalama süreyi milisaniye cinsinden döndür"""
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    parser = argparse.ArgumentParser(description='Vektör arama gecikme benchmark\'ı')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000, 100000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    print("=" * 70)
+    print("⏱️  Vektör Arama Benchmark")
+    print("=" * 70)
+    print(f"\nBoyut: {args.dim} | Sorgu: {args.queries} | top_k: {args.top_k}\n")
+    print(f"{'Chunk':>10} | {'Eski (ms)':>10} | {'Yeni (ms)':>10} | {'Hızlanma':>9}")
+    print("-" * 50)
+
+    for n in args.sizes:
+        store = make_store(n, args.dim, rng)
+        raw = store.embeddings * rng.uniform(0.5, 2.0, size=(n, 1)).astype(np.float32)
+
+        legacy_ms = time_per_query(lambda q: legacy_search(raw, q, args.top_k), queries)
+        new_ms = time_per_query(lambda q: store.search(q, top_k=args.top_k), queries)
+
+        print(f"{n:>10} | {legacy_ms:>10.3f} | {new_ms:>10.3f} | {legacy_ms / new_ms:>8.1f}x")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
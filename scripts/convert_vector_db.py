@@ -0,0 +1,42 @@
+"""
+Vektör DB Dönüştürme Script'i
+
+Eski tek dosyalık vectordb.pkl'i yeni klasör formatına
+(embeddings.npy + chunks.jsonl + meta.json) dönüştürür.
+
+Kullanım:
+    python scripts/convert_vector_db.py
+    python scripts/convert_vector_db.py eski/vectordb.pkl yeni/vectordb
+"""
+
+import os
+import sys
+import argparse
+
+# Proje kök dizinini Python path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.vector_storage import convert_legacy_pickle
+
+
+def main():
+    """Ana dönüştürme fonksiyonu"""
+    parser = argparse.ArgumentParser(description='vectordb.pkl → klasör formatı dönüştürücü')
+    parser.add_argument('source', nargs='?', default='./data/vector_store/vectordb.pkl',
+                        help='Eski pickle dosyası')
+    parser.add_argument('target', nargs='?', default='./data/vector_store/vectordb',
+                        help='Yeni vektör DB klasörü')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.source):
+        print(f"❌ Pickle dosyası bulunamadı: {args.source}")
+        sys.exit(1)
+
+    print(f"🔄 Dönüştürülüyor: {args.source} → {args.target}\n")
+    count = convert_legacy_pickle(args.source, args.target)
+    print(f"\n✅ {count} chunk dönüştürüldü")
+    print(f"   Eski dosyayı silebilirsiniz: {args.source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,8 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.document_processor import DocumentProcessor
-from src.rag_engine import RAGEngine
+from src.fault_code_manager import FaultCodeManager
+from src.rag_engine import RAGEngine, training_settings
 
 
 def main():
@@ -22,12 +23,22 @@ def main():
     # .env dosyasını yükle
     load_dotenv()
     
-    # Konfigürasyon
-    MANUALS_FOLDER = os.getenv('MANUALS_FOLDER', 'dokumanlar/manueller')
-    VECTOR_DB_PATH = os.getenv('VECTOR_DB_PATH', './data/vector_store/vectordb.pkl')
-    CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '800'))
-    CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '200'))
-    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    # Konfigürasyon (web arayüzünün Training sayfası da aynı ayarları kullanır);
+    # tek başına çalıştığı için EMBEDDING_WORKERS boşsa tüm çekirdekler kullanılır
+    settings = training_settings(default_workers=0)
+    engine_settings = settings['engine']
+    MANUALS_FOLDER = settings['manuals_folder']
+    VECTOR_DB_PATH = settings['vector_db_path']
+    CHUNK_SIZE = settings['chunk_size']
+    CHUNK_OVERLAP = settings['chunk_overlap']
+    VECTOR_SHARD_BY = settings['shard_by']
+    EMBEDDING_MODEL = engine_settings['embedding_model']
+    EMBEDDING_BACKEND = engine_settings['embedding_backend']
+    VECTOR_INDEX_TYPE = engine_settings['index_type']
+    EMBEDDING_QUANTIZATION = engine_settings['quantization']
+    EMBEDDING_CACHE_PATH = engine_settings['embedding_cache_path']
+    EMBEDDING_BATCH_SIZE = engine_settings['embedding_batch_size']
+    EMBEDDING_WORKERS = engine_settings['embedding_workers']
     
     print("=" * 70)
     print("🚀 RAG Sistemi Training")
@@ -36,7 +47,12 @@ def main():
     print(f"💾 Vektör DB yolu: {VECTOR_DB_PATH}")
     print(f"📏 Chunk boyutu: {CHUNK_SIZE} karakter")
     print(f"🔄 Overlap: {CHUNK_OVERLAP} karakter")
-    print(f"🤖 Embedding model: {EMBEDDING_MODEL}\n")
+    print(f"🤖 Embedding model: {EMBEDDING_MODEL} ({EMBEDDING_BACKEND})")
+    print(f"🗂️  İndeks tipi: {VECTOR_INDEX_TYPE}")
+    print(f"🗜️  Embedding saklama: {EMBEDDING_QUANTIZATION}")
+    print(f"🧩 Parçalama: {VECTOR_SHARD_BY or 'yok (tek parça)'}")
+    print(f"🗃️  Embedding önbelleği: {EMBEDDING_CACHE_PATH or 'kapalı'}")
+    print(f"⚙️  Embedding batch/işçi: {EMBEDDING_BATCH_SIZE} / {EMBEDDING_WORKERS or 'çekirdek sayısı'}\n")
     print("=" * 70 + "\n")
     
     # 1. PDF'leri kontrol et
@@ -61,7 +77,8 @@ def main():
     processor = DocumentProcessor(chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
     
     try:
-        chunks = processor.process_all_pdfs(MANUALS_FOLDER)
+        generator_map = FaultCodeManager().get_manual_generator_map()
+        chunks = processor.process_all_pdfs(MANUALS_FOLDER, generator_map=generator_map)
     except Exception as e:
         print(f"\n❌ PDF işleme hatası: {str(e)}")
         return
@@ -75,7 +92,7 @@ def main():
     print("🧠 RAG Engine başlatılıyor...\n")
     
     try:
-        rag = RAGEngine(embedding_model=EMBEDDING_MODEL, llm_model="mistral")
+        rag = RAGEngine(llm_model="mistral", **engine_settings)
     except Exception as e:
         print(f"\n❌ RAG engine hatası: {str(e)}")
         return
@@ -94,7 +111,7 @@ def main():
     print("💾 Vektör veritabanı kaydediliyor...\n")
     
     try:
-        rag.save_vector_db(VECTOR_DB_PATH)
+        rag.save_vector_db(VECTOR_DB_PATH, shard_by=VECTOR_SHARD_BY)
     except Exception as e:
         print(f"\n❌ Kaydetme hatası: {str(e)}")
         return
@@ -106,6 +123,10 @@ def main():
     print(f"\n📊 Özet:")
     print(f"   • {pdf_count} PDF işlendi")
     print(f"   • {len(chunks)} chunk oluşturuldu")
+    if rag.embedding_cache is not None:
+        cache = rag.embedding_cache
+        print(f"   • Embedding önbelleği: {cache.hits} isabet / {cache.misses} yeni "
+              f"(%{cache.hit_rate * 100:.0f} isabet)")
     print(f"   • Vektör DB kaydedildi: {VECTOR_DB_PATH}")
     print(f"\n🎯 Sistem kullanıma hazır!")
     print(f"\nTest etmek için:")
@@ -0,0 +1,82 @@
+"""
+Tek Manuel Güncelleme Script'i
+
+Revize edilen bir manueli tüm kütüphaneyi yeniden eğitmeden vektör
+DB'de günceller: sadece o PDF'in eski chunk'ları silinir, yeni
+chunk'ların embedding'leri oluşturulup eklenir.
+
+Kullanım:
+    python scripts/update_manual.py dokumanlar/manueller/jenerator_manual.pdf
+    python scripts/update_manual.py --delete jenerator_manual.pdf
+"""
+
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Proje kök dizinini Python path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import training_settings
+from src.sharded_store import open_vector_store
+
+
+def main():
+    """Ana güncelleme fonksiyonu"""
+    load_dotenv()
+    # train_rag.py ile aynı chunk ve embedding ayarları
+    settings = training_settings()
+
+    parser = argparse.ArgumentParser(description='Vektör DB\'de tek manueli güncelle veya sil')
+    parser.add_argument('pdfs', nargs='+', help='PDF dosya yolları (silmede dosya adları)')
+    parser.add_argument('--delete', action='store_true', help='Manuelin chunk\'larını sadece sil')
+    parser.add_argument('--db', default=settings['vector_db_path'])
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Vektör DB bulunamadı: {args.db}")
+        print("   Önce training yapın: python scripts/train_rag.py")
+        return
+
+    if args.delete:
+        # Silme için embedding modeli gerekmez
+        store = open_vector_store(args.db)
+        removed = sum(store.delete_source(os.path.basename(pdf)) for pdf in args.pdfs)
+        store.save(args.db)
+        print(f"\n✅ {removed} chunk silindi")
+        return
+
+    from src.document_processor import DocumentProcessor
+    from src.fault_code_manager import FaultCodeManager
+    from src.rag_engine import RAGEngine
+
+    processor = DocumentProcessor(
+        chunk_size=settings['chunk_size'],
+        overlap=settings['chunk_overlap']
+    )
+    # İndeks tipi ve saklama tipi verilmez: mevcut DB kendi ayarlarıyla yüklenir,
+    # .env farklıysa güncelleme DB'yi sessizce dönüştürmez
+    engine_settings = {key: value for key, value in settings['engine'].items()
+                       if key not in ('index_type', 'index_params', 'quantization')}
+    rag = RAGEngine(
+        llm_model="mistral",
+        vector_db_path=args.db,
+        **engine_settings
+    )
+
+    generator_map = FaultCodeManager().get_manual_generator_map()
+    for pdf in args.pdfs:
+        if not os.path.isfile(pdf):
+            print(f"⚠️  Dosya bulunamadı, atlanıyor: {pdf}")
+            continue
+        chunks = processor.process_pdf(pdf, generator_id=generator_map.get(os.path.basename(pdf)))
+        if chunks:
+            rag.replace_source(os.path.basename(pdf), chunks)
+
+    rag.save_vector_db(args.db)
+    print(f"\n✅ Vektör DB güncellendi: {rag.vector_store.live_count} chunk")
+
+
+if __name__ == "__main__":
+    main()
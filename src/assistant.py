@@ -3,18 +3,23 @@ Mühendislik Asistanı - Ana Sınıf
 
 RAG engine, arıza kodu yöneticisi ve Ollama'yı birleştirerek
 kullanıcı sorgularına cevap veren ana asistan sınıfı.
+
+RAG engine (torch, embedding modeli, vektör DB) ilk doküman sorgusunda
+oluşturulur; arıza kodu komutları sadece JSON dosyasını okur.
 """
 
 import os
 import sys
-from typing import Optional, Dict, List
+import time
+import asyncio
+import threading
+from typing import Optional, Dict, Iterator, List, Tuple
 
 # Proje kökünü path'e ekle (app.py'den veya doğrudan çalıştırıldığında çalışsın)
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from src.rag_engine import RAGEngine
 from src.fault_code_manager import FaultCodeManager
 
 
@@ -23,32 +28,140 @@ class EngineeringAssistant:
     
     def __init__(
         self,
-        vector_db_path: str = './data/vector_store/vectordb.pkl',
+        vector_db_path: str = './data/vector_store/vectordb',
         fault_db_path: str = 'dokumanlar/ariza_kodlari.json',
-        ollama_model: str = 'mistral'
+        ollama_model: str = 'mistral',
+        embedding_backend: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+        semantic_cache_size: Optional[int] = None
     ):
         """
         Args:
             vector_db_path: Vektör veritabanı yolu
             fault_db_path: Arıza kodları JSON yolu
             ollama_model: Ollama model adı (mistral - en stabil)
+            embedding_backend: 'torch', 'onnx' veya 'onnx-int8' (None = EMBEDDING_BACKEND)
+            semantic_cache_threshold: Benzer soru cevap önbelleği cosine eşiği
+                (None = SEMANTIC_CACHE_THRESHOLD)
+            semantic_cache_size: Benzer soru önbelleğinde en fazla cevap
+                (None = SEMANTIC_CACHE_SIZE; 0 = kapalı)
         """
         print("🤖 Mühendislik Asistanı başlatılıyor...\n")
         
         # Arıza kodu yöneticisi
         self.fault_manager = FaultCodeManager(db_path=fault_db_path)
         
-        # RAG engine
-        self.rag_engine = RAGEngine(
-            llm_model=ollama_model,
-            vector_db_path=vector_db_path if os.path.exists(vector_db_path) else None
-        )
-        
+        # RAG engine ilk doküman sorgusunda yüklenir (bkz. rag_engine)
         self.vector_db_path = vector_db_path
+        self.ollama_model = ollama_model
+        self.embedding_backend = embedding_backend or os.getenv('EMBEDDING_BACKEND', 'torch')
+        self._rag_engine = None
+        self._rag_engine_lock = threading.Lock()
+        self.last_timing: Dict = {}
+        
+        # Benzer (paraphrase) sorular aynı chunk'ları getirirse LLM çağrılmaz
+        # (önbellek numpy yüklediği için ilk doküman sorgusunda oluşturulur)
+        if semantic_cache_threshold is None:
+            semantic_cache_threshold = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92'))
+        if semantic_cache_size is None:
+            semantic_cache_size = int(os.getenv('SEMANTIC_CACHE_SIZE', '500'))
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.semantic_cache_size = semantic_cache_size
+        self._semantic_cache = None
+        self._semantic_cache_lock = threading.Lock()
         
         print("\n✓ Asistan hazır!\n")
     
-    def query(self, question: str, top_k: int = 3, use_rag: bool = True) -> str:
+    @property
+    def rag_engine(self):
+        """RAG engine (ilk erişimde vektör DB ile birlikte yüklenir)"""
+        # Isınma thread'i ile ilk sorgu aynı anda erişebilir
+        with self._rag_engine_lock:
+            if self._rag_engine is None:
+                self._rag_engine = self._create_rag_engine()
+        return self._rag_engine
+    
+    @property
+    def semantic_cache(self):
+        """Benzer soru cevap önbelleği (ilk erişimde oluşturulur)"""
+        with self._semantic_cache_lock:
+            if self._semantic_cache is None:
+                from src.semantic_cache import SemanticAnswerCache
+                self._semantic_cache = SemanticAnswerCache(
+                    self.semantic_cache_threshold, self.semantic_cache_size
+                )
+        return self._semantic_cache
+    
+    def _create_rag_engine(self):
+        """Vektör DB'yi (gerekirse eski formattan dönüştürerek) RAG engine ile yükle"""
+        from src.llm_scheduler import get_scheduler
+        from src.rag_engine import RAGEngine, keep_alive_value
+        from src.vector_storage import convert_legacy_pickle
+        
+        # Eski tek dosyalık pickle varsa yeni klasör formatına dönüştür
+        legacy_path = self.vector_db_path + '.pkl'
+        if not os.path.exists(self.vector_db_path) and os.path.isfile(legacy_path):
+            print(f"🔄 Eski vektör DB dönüştürülüyor: {legacy_path}")
+            convert_legacy_pickle(legacy_path, self.vector_db_path)
+        
+        llm_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+        llm_concurrency = int(os.getenv('OLLAMA_CONCURRENCY', '4'))
+        return RAGEngine(
+            llm_model=self.ollama_model,
+            llm_url=llm_url,
+            llm_concurrency=llm_concurrency,
+            llm_keep_alive=keep_alive_value(os.getenv('OLLAMA_KEEP_ALIVE', '30m')),
+            # Aynı süreçteki tüm oturumlar (Streamlit) tek kuyruğu paylaşır
+            llm_scheduler=get_scheduler(llm_url, llm_concurrency, int(os.getenv('LLM_QUEUE_SIZE', '16'))),
+            response_cache_path=os.getenv('LLM_CACHE_PATH', './data/llm_cache.sqlite') or None,
+            response_cache_size=int(os.getenv('LLM_CACHE_SIZE', '1000')),
+            response_cache_ttl=float(os.getenv('LLM_CACHE_TTL_HOURS', '168')) * 3600,
+            prompt_budget=int(os.getenv('PROMPT_TOKEN_BUDGET', '2048')),
+            prompt_tokenizer=os.getenv('PROMPT_TOKENIZER') or None,
+            pin_num_ctx=os.getenv('OLLAMA_PIN_NUM_CTX', 'false').lower() in ('1', 'true', 'yes'),
+            embedding_backend=self.embedding_backend,
+            vector_db_path=self.vector_db_path if os.path.exists(self.vector_db_path) else None
+        )
+    
+    def close(self):
+        """
+        Yüklüyse vektör DB dosyalarını bırak
+        
+        DB başka bir store ile yeniden kaydedilmeden veya silinmeden önce
+        çağrılır (Windows açık/mmap'li dosyalara yazmaya izin vermez);
+        sonrasında asistan yeniden oluşturulmalıdır.
+        """
+        if self._rag_engine is not None:
+            self._rag_engine.vector_store.close()
+    
+    def warm_up(self, background: bool = True) -> Optional[Dict]:
+        """
+        Ollama modelini ve sabit sistem prompt'unu önceden yükle
+        
+        Boşta kalmadan sonraki ilk soru model yüklemesini beklemesin diye
+        başlangıçta çağrılır. Arka planda çalışırken arama (embedding
+        modeli, vektör DB) ile model yüklemesi örtüşür.
+        
+        Args:
+            background: True ise daemon thread'de çalışır ve hemen döner
+        
+        Returns:
+            Isınma sonucu (arka planda çalışırken None)
+        """
+        if background:
+            threading.Thread(
+                target=self.warm_up, kwargs={'background': False}, name='ollama-warm-up', daemon=True
+            ).start()
+            return None
+        return self.rag_engine.warm_up()
+    
+    def query(
+        self,
+        question: str,
+        top_k: int = 3,
+        use_rag: bool = True,
+        generator_id: Optional[str] = None
+    ) -> str:
         """
         Kullanıcı sorusuna cevap ver
         
@@ -56,10 +169,37 @@ class EngineeringAssistant:
             question: Kullanıcı sorusu
             top_k: RAG'den kaç chunk alınacak
             use_rag: RAG kullanılacak mı (False ise sadece LLM)
+            generator_id: Seçili jeneratör; doküman araması bu jeneratörün
+                ve genel manuellerle sınırlanır
         
         Returns:
             Cevap metni
         """
+        return "".join(self.query_stream(question, top_k, use_rag, generator_id))
+    
+    def query_stream(
+        self,
+        question: str,
+        top_k: int = 3,
+        use_rag: bool = True,
+        generator_id: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Kullanıcı sorusunun cevabını token token üret
+        
+        Süreler sorgu başından ölçülür ve bitince `last_timing` içine
+        yazılır: arama, ilk token (ttft) ve toplam.
+        
+        Daha önce cevaplanmış benzer bir soru (cosine >= eşik) aynı
+        chunk'ları ve arıza kodunu getirdiyse kayıtlı cevap döndürülür.
+        
+        Args:
+            query() ile aynı
+        
+        Yields:
+            Cevap metni parçaları
+        """
+        start = time.perf_counter()
         print(f"💭 Sorgu: {question}\n")
         
         # 1. Arıza kodlarında ara (soru kod içeriyorsa veya belirtiler varsa)
@@ -73,23 +213,188 @@ class EngineeringAssistant:
         
         # 2. RAG ile dokümanlardan context al
         context_chunks = None
+        embedding = None
         if use_rag:
-            context_chunks = self.rag_engine.retrieve_context(question, top_k=top_k)
+            context_chunks, embedding = self._retrieve(question, top_k, generator_id)
             if context_chunks:
                 print(f"📚 {len(context_chunks)} ilgili doküman chunk'ı bulundu")
                 for i, chunk in enumerate(context_chunks, 1):
-                    print(f"   {i}. {chunk['source']} (benzerlik: {chunk['similarity']:.2f})")
+                    # Embedding'siz kod aramasında sadece BM25 skoru vardır
+                    if chunk.get('similarity') is not None:
+                        score = f"benzerlik: {chunk['similarity']:.2f}"
+                    else:
+                        score = f"BM25: {chunk['bm25']:.1f}"
+                    print(f"   {i}. {chunk['source']} ({score})")
+        retrieval = time.perf_counter() - start
+        
+        # 3. Benzer soru daha önce aynı bağlamla cevaplandıysa LLM çağrılmaz;
+        # aramanın embedding'i kullanılır (BM25 kısayolunda embedding yoksa atlanır)
+        semantic_key = None
+        if context_chunks and embedding is not None and self.semantic_cache.max_entries > 0:
+            signature = self.semantic_cache.context_signature(context_chunks, fault_info)
+            semantic_key = (self.rag_engine.embedding_key, embedding, signature)
+            cached = self.semantic_cache.lookup(*semantic_key)
+            if cached is not None:
+                print("♻️  Benzer soru önbellekten cevaplandı\n")
+                self.last_timing = {
+                    'retrieval': retrieval,
+                    'ttft': time.perf_counter() - start,
+                    'total': time.perf_counter() - start,
+                    'cached': 'semantic',
+                }
+                yield cached
+                return
         
-        # 3. Cevap üret
+        # 4. Cevap üret
         print(f"\n🤔 Cevap üretiliyor...\n")
-        answer = self.rag_engine.generate_answer(
+        first_token = None
+        pieces = []
+        try:
+            for piece in self.rag_engine.generate_answer_stream(
+                query=question,
+                context_chunks=context_chunks,
+                fault_info=fault_info,
+                top_k=top_k
+            ):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                pieces.append(piece)
+                yield piece
+        finally:
+            engine = self.rag_engine
+            # Üretim başlamadıysa (örn: kuyruk dolu) last_timing boştur
+            llm_timing = {} if engine.last_answer_cached else engine.llm.last_timing
+            self.last_timing = {
+                'retrieval': retrieval,
+                'ttft': first_token,
+                'total': time.perf_counter() - start,
+                'cached': engine.last_answer_cached,
+                'cold': llm_timing.get('cold', False),
+                'load': llm_timing.get('load'),
+                'queued': llm_timing.get('queued', 0.0),
+            }
+        
+        # Hatalı (Ollama'ya ulaşılamayan) cevaplar saklanmaz
+        failed = not engine.last_answer_cached and engine.llm.last_timing.get('error')
+        if semantic_key is not None and not failed:
+            self.semantic_cache.add(*semantic_key, question=question, answer="".join(pieces))
+    
+    async def aquery(
+        self,
+        question: str,
+        top_k: int = 3,
+        generator_id: Optional[str] = None
+    ) -> str:
+        """
+        query()'nin asenkron sürümü (çok kullanıcılı ön yüzler için)
+        
+        Arama thread havuzunda, üretim paylaşılan bağlantı havuzlu
+        istemciyle yapılır; aynı anda en fazla OLLAMA_CONCURRENCY istek
+        Ollama'ya gider.
+        """
+        fault_results = self.fault_manager.search_by_symptom(question)
+        fault_info = fault_results[0] if fault_results else None
+        context_chunks, _ = await asyncio.to_thread(self._retrieve, question, top_k, generator_id)
+        return await self.rag_engine.agenerate_answer(
             query=question,
             context_chunks=context_chunks,
             fault_info=fault_info,
             top_k=top_k
         )
+    
+    def print_answer(self, question: str, header: str = "🤖 Cevap:", **kwargs) -> str:
+        """
+        Cevabı geldikçe konsola yazdır ve sonunda süreleri göster
+        
+        Args:
+            question: Kullanıcı sorusu
+            header: Cevaptan önce yazılacak başlık
+            **kwargs: query_stream() parametreleri (top_k, generator_id...)
         
-        return answer
+        Returns:
+            Cevabın tamamı
+        """
+        stream = self.query_stream(question, **kwargs)
+        # İlk parça gelene kadar arama logları yazılır; başlık onlardan sonra
+        pieces = [next(stream, "")]
+        print(f"\n{header}")
+        print(pieces[0], end="", flush=True)
+        for piece in stream:
+            pieces.append(piece)
+            print(piece, end="", flush=True)
+        print(f"\n\n{self.format_timing()}\n")
+        return "".join(pieces)
+    
+    def format_timing(self) -> str:
+        """Son sorgunun süreleri (örn: '⏱️  Arama: 0.05 s | İlk token: 0.84 s | Toplam: 9.1 s')"""
+        timing = self.last_timing
+        if not timing:
+            return ""
+        ttft = f"{timing['ttft']:.2f} s" if timing.get('ttft') is not None else "-"
+        if timing.get('cached') == 'semantic':
+            cached = " (benzer soru önbelleğinden)"
+        else:
+            cached = " (önbellekten)" if timing.get('cached') else ""
+        if timing.get('queued', 0.0) >= 0.05:
+            cached += f" (kuyrukta {timing['queued']:.1f} s beklendi)"
+        if timing.get('cold'):
+            load = f", model yükleme {timing['load']:.1f} s" if timing.get('load') else ""
+            cached += f" (soğuk başlangıç{load})"
+        return (f"⏱️  Arama: {timing['retrieval']:.2f} s | İlk token: {ttft} | "
+                f"Toplam: {timing['total']:.1f} s{cached}")
+    
+    def format_cache_stats(self) -> str:
+        """Benzer soru önbelleğinin isabet ve yanlış isabet metrikleri"""
+        stats = self.semantic_cache.stats()
+        return (f"♻️  Benzer soru önbelleği: {stats['entries']} cevap | "
+                f"İsabet: {stats['hits']}/{stats['lookups']} ({stats['hit_rate']:.0%}) | "
+                f"Yanlış isabet adayı: {stats['false_hits']} ({stats['false_hit_rate']:.0%}) | "
+                f"Bildirilen yanlış: {stats['reported_false']} | Eşik: {stats['threshold']:.2f}")
+    
+    def format_llm_stats(self) -> str:
+        """Soğuk / sıcak ilk token süreleri ve son ısınma (LLM henüz kullanılmadıysa boş)"""
+        engine = self._rag_engine
+        if engine is None or engine._llm is None:
+            return ""
+        llm = engine.llm
+        parts = []
+        for kind, label in (('warm', 'Sıcak'), ('cold', 'Soğuk')):
+            stats = llm.ttft_summary()[kind]
+            p50 = f"{stats['p50']:.2f} s" if stats['p50'] is not None else "-"
+            parts.append(f"{label} ilk token p50: {p50} ({stats['count']} istek)")
+        warm_up = llm.last_warm_up
+        if warm_up:
+            parts.append("Isınma: hata" if warm_up['error'] else f"Isınma: {warm_up['total']:.1f} s")
+        lines = ["🔥 " + " | ".join(parts)]
+        
+        if llm.scheduler is not None:
+            queue = llm.scheduler.stats()
+            wait = (f"{queue['wait_p50']:.2f} / {queue['wait_p95']:.2f} s"
+                    if queue['wait_p50'] is not None else "-")
+            lines.append(
+                f"🚦 Kuyruk: {queue['queue_depth']}/{queue['max_queue']} bekliyor "
+                f"(en fazla {queue['max_depth']}) | İşlenen: {queue['in_flight']}/{queue['max_in_flight']} | "
+                f"Bekleme p50/p95: {wait} | Reddedilen: {queue['rejected']}"
+            )
+        return "\n".join(lines)
+    
+    def _retrieve(self, question: str, top_k: int, generator_id: Optional[str]) -> Tuple[List[Dict], object]:
+        """
+        Doküman chunk'larını getir (jeneratör seçiliyse onun manuelleriyle sınırlı)
+        
+        Returns:
+            (chunk'lar, aramada kullanılan sorgu embedding'i veya None)
+        """
+        if generator_id and generator_id != 'general':
+            filters = {'generator_id': [generator_id, 'general']}
+            chunks, embedding = self.rag_engine.retrieve_context(
+                question, top_k=top_k, filters=filters, return_embedding=True
+            )
+            if chunks:
+                return chunks, embedding
+            # Manuelleri jeneratörle eşlenmemiş DB'lerde tüm manuellerde ara
+            print(f"ℹ️  '{generator_id}' için etiketli manuel yok, tüm manuellerde aranıyor")
+        return self.rag_engine.retrieve_context(question, top_k=top_k, return_embedding=True)
     
     def analyze_fault(self, code: str) -> str:
         """
@@ -158,6 +463,8 @@ class EngineeringAssistant:
         print("  - Arıza kodu: 'fault E101' veya 'kod E101'")
         print("  - Belirtiye göre ara: 'belirti titreşim'")
         print("  - Kritik kodlar: 'kritik' veya 'critical'")
+        print("  - Önbellek istatistikleri: 'istatistik'")
+        print("  - Son cevap yanlış (önbellekten geldiyse): 'yanlış'")
         print("  - Çıkış: 'exit', 'quit' veya 'çıkış'\n")
         print("=" * 60 + "\n")
         
@@ -190,9 +497,23 @@ class EngineeringAssistant:
                     print(f"\n{self.get_critical_faults()}\n")
                     continue
                 
-                # Normal sorgu
-                answer = self.query(user_input)
-                print(f"\n🤖 Asistan:\n{answer}\n")
+                # Önbellek metrikleri
+                if user_input.lower() in ['istatistik', 'stats']:
+                    print(f"\n{self.format_cache_stats()}")
+                    print(f"{self.format_llm_stats()}\n")
+                    continue
+                
+                # Önbellekten gelen son cevap için geri bildirim
+                if user_input.lower() in ['yanlış', 'yanlis']:
+                    if self.last_timing.get('cached') == 'semantic':
+                        self.semantic_cache.report_false_hit()
+                        print("\n📝 Geri bildirim kaydedildi (eşiği yükseltmeyi düşünün: SEMANTIC_CACHE_THRESHOLD)\n")
+                    else:
+                        print("\nℹ️  Son cevap benzer soru önbelleğinden gelmedi\n")
+                    continue
+                
+                # Normal sorgu (cevap geldikçe yazdırılır)
+                self.print_answer(user_input, header="🤖 Asistan:")
                 print("-" * 60 + "\n")
             
             except KeyboardInterrupt:
@@ -0,0 +1,222 @@
+"""
+Asenkron Ollama İstemcisi
+
+OllamaLLM her çağrıda thread'i bloklar; çok kullanıcılı bir ön yüzde
+kullanıcı başına bir thread gerekir. AsyncOllamaLLM asyncio üzerinde
+çalışır:
+
+    - Ayarlı OLLAMA_URL'e tek bir HTTP istemcisi (keep-alive bağlantı
+      havuzu) açılır ve tüm isteklerde yeniden kullanılır
+    - Aynı anda Ollama'ya giden istek sayısı bir semafor ile sınırlanır;
+      fazlası sırada bekler (Ollama tarafındaki OLLAMA_NUM_PARALLEL ile
+      uyumlu tutulmalıdır)
+    - Doküman araması (CPU) thread havuzunda, üretim event loop'ta
+      yürüdüğü için bir kullanıcının araması diğerinin üretimiyle örtüşür
+    - Paylaşılan LLMScheduler verilirse istekler senkron istemcilerle aynı
+      kuyruğa (öncelik, max_in_flight, QueueFullError) girer
+
+Kullanım:
+    llm = AsyncOllamaLLM(model='mistral', max_concurrency=4)
+    answers = await asyncio.gather(*(llm.agenerate(p) for p in prompts))
+    await llm.aclose()
+"""
+
+import time
+import asyncio
+from typing import AsyncIterator, Dict, Optional
+
+from src.llm_scheduler import PRIORITY_NORMAL
+from src.ollama_health import get_monitor
+from src.rag_engine import (
+    COLD_LOAD_SECONDS, build_messages, generation_options, load_seconds, ollama_error_message
+)
+
+
+class AsyncOllamaLLM:
+    """Bağlantı havuzlu, eşzamanlılık sınırlı asenkron Ollama istemcisi"""
+
+    def __init__(
+        self,
+        model: str = "mistral",
+        url: str = "http://localhost:11434",
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+        keep_alive=None,
+        scheduler=None
+    ):
+        """
+        Args:
+            model: Ollama model adı
+            url: Ollama API URL
+            max_concurrency: Aynı anda Ollama'ya giden en fazla istek
+            timeout: İstek zaman aşımı (saniye; None = sınırsız)
+            keep_alive: Modelin Ollama'da bellekte kalma süresi (None = Ollama varsayılanı)
+            scheduler: Paylaşılan LLMScheduler (None = sadece yerel semafor)
+        """
+        self.model = model
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.scheduler = scheduler
+        self.in_flight = 0
+        self.last_timing: Dict = {}
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _ensure_client(self):
+        """
+        Event loop'a bağlı istemci ve semaforu hazırla
+
+        httpx istemcisi oluşturulduğu loop'a bağlıdır; loop değişirse
+        (örn: ardışık asyncio.run çağrıları) yenisi açılır.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            import httpx
+            import ollama
+
+            self._client = ollama.AsyncClient(
+                host=self.url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system: str = "",
+        temperature: float = 0.3,
+        top_p: float = 0.9,
+        max_tokens: int = 512,
+        num_ctx: int = 2048,
+        priority: int = PRIORITY_NORMAL
+    ) -> str:
+        """
+        Ollama ile asenkron cevap üret
+
+        Args:
+            OllamaLLM.generate() ile aynı
+
+        Returns:
+            Üretilen cevap (hata olursa kullanıcıya gösterilecek mesaj)
+        """
+        pieces = []
+        async for piece in self.agenerate_stream(prompt, system, temperature, top_p, max_tokens, num_ctx,
+                                                 priority=priority):
+            pieces.append(piece)
+        return "".join(pieces)
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        system: str = "",
+        temperature: float = 0.3,
+        top_p: float = 0.9,
+        max_tokens: int = 512,
+        num_ctx: int = 2048,
+        timing: Optional[Dict] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> AsyncIterator[str]:
+        """
+        Ollama ile cevabı asenkron token token üret
+
+        Sıra bekleme süresi ilk token süresine (ttft) dahildir; süreler
+        üretim bitince `last_timing` içine yazılır. Eşzamanlı isteklerde
+        `last_timing` başka bir isteğe ait olabileceği için istek başına
+        `timing` sözlüğü verilebilir.
+
+        Zamanlayıcı varsa istek önce sırasını bekler; kuyruk doluysa
+        QueueFullError fırlatılır.
+
+        Args:
+            timing: Verilirse bu isteğin süreleri (ve hata bayrağı) buraya yazılır
+            priority: Zamanlayıcı önceliği (bkz. llm_scheduler)
+
+        Yields:
+            Cevap metni parçaları
+        """
+        client = self._ensure_client()
+        start = time.perf_counter()
+        first_token = None
+        pieces = 0
+        error = False
+        load = None
+        extra = {'keep_alive': self.keep_alive} if self.keep_alive is not None else {}
+        self.last_timing = {}
+        queued = await self._acquire_slot(priority)
+        try:
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    stream = await client.chat(
+                        model=self.model,
+                        messages=build_messages(prompt, system),
+                        options=generation_options(temperature, top_p, max_tokens, num_ctx),
+                        stream=True,
+                        **extra
+                    )
+                    async for part in stream:
+                        load = load_seconds(part) or load
+                        content = part['message']['content']
+                        if not content:
+                            continue
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                        pieces += 1
+                        yield content
+                finally:
+                    self.in_flight -= 1
+
+        except Exception as e:
+            error = True
+            get_monitor(self.url).refresh()
+            yield ollama_error_message(self.model, e)
+
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release()
+            self.last_timing = {
+                'ttft': first_token,
+                'total': time.perf_counter() - start,
+                'tokens': pieces,
+                'error': error,
+                'load': load,
+                'cold': load is not None and load >= COLD_LOAD_SECONDS,
+                'queued': queued,
+            }
+            if timing is not None:
+                timing.update(self.last_timing)
+
+    async def _acquire_slot(self, priority: int) -> float:
+        """
+        Zamanlayıcıdan sıra al (bekleme thread'de; event loop bloklanmaz)
+
+        Beklerken iptal edilirse sonradan alınan slot hemen bırakılır.
+
+        Returns:
+            Kuyrukta beklenen süre (zamanlayıcı yoksa 0)
+        """
+        if self.scheduler is None:
+            return 0.0
+        acquire = asyncio.ensure_future(asyncio.to_thread(self.scheduler.acquire, priority))
+        try:
+            return await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            acquire.add_done_callback(
+                lambda done: done.cancelled() or done.exception() or self.scheduler.release()
+            )
+            raise
+
+    async def aclose(self):
+        """HTTP bağlantı havuzunu kapat"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
@@ -6,7 +6,8 @@ overlap'li chunk'lara böler ve RAG sistemi için hazırlar.
 """
 
 import os
-from typing import List, Dict
+from bisect import bisect_right
+from typing import List, Dict, Optional
 import PyPDF2
 from pathlib import Path
 
@@ -25,10 +26,23 @@ class PDFReader:
         Returns:
             Çıkarılan metin
         """
+        return "".join(page + "\n" for page in PDFReader.extract_pages(pdf_path)).strip()
+    
+    @staticmethod
+    def extract_pages(pdf_path: str) -> List[str]:
+        """
+        PDF'den sayfa sayfa metin çıkar
+        
+        Args:
+            pdf_path: PDF dosya yolu
+        
+        Returns:
+            Sayfa metinleri (okuma hatasında boş liste)
+        """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF bulunamadı: {pdf_path}")
         
-        text = ""
+        pages = []
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -36,14 +50,14 @@ class PDFReader:
                 
                 for page_num in range(num_pages):
                     page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+                    pages.append(page.extract_text())
         
         except Exception as e:
             print(f"❌ PDF okuma hatası: {pdf_path}")
             print(f"   Hata: {str(e)}")
-            return ""
+            return []
         
-        return text.strip()
+        return pages
 
 
 class TextChunker:
@@ -136,20 +150,29 @@ class DocumentProcessor:
         self.pdf_reader = PDFReader()
         self.text_chunker = TextChunker(chunk_size=chunk_size, overlap=overlap)
     
-    def process_pdf(self, pdf_path: str) -> List[Dict[str, str]]:
+    def process_pdf(self, pdf_path: str, generator_id: Optional[str] = None) -> List[Dict[str, str]]:
         """
         Bir PDF'i işle ve chunk'lara böl
         
         Args:
             pdf_path: PDF dosya yolu
+            generator_id: Manuelin ait olduğu jeneratör (filtreli arama için)
         
         Returns:
-            Chunk listesi
+            Chunk listesi ('page' = chunk'ın başladığı sayfa, 1'den başlar)
         """
         print(f"📄 İşleniyor: {os.path.basename(pdf_path)}")
         
-        # Metni çıkar
-        text = self.pdf_reader.extract_text(pdf_path)
+        # Metni sayfa başlangıç ofsetleriyle birlikte çıkar
+        pages = self.pdf_reader.extract_pages(pdf_path)
+        raw = "".join(page + "\n" for page in pages)
+        text = raw.strip()
+        lead = len(raw) - len(raw.lstrip())
+        page_starts = []
+        offset = -lead
+        for page in pages:
+            page_starts.append(offset)
+            offset += len(page) + 1
         
         if not text:
             print(f"   ⚠️  Metin çıkarılamadı")
@@ -160,16 +183,26 @@ class DocumentProcessor:
             text=text,
             source=os.path.basename(pdf_path)
         )
+        for chunk in chunks:
+            chunk['page'] = max(bisect_right(page_starts, chunk['start_char']), 1)
+            if generator_id:
+                chunk['generator_id'] = generator_id
         
         print(f"   ✓ {len(chunks)} chunk oluşturuldu ({len(text)} karakter)")
         return chunks
     
-    def process_all_pdfs(self, folder_path: str) -> List[Dict[str, str]]:
+    def process_all_pdfs(
+        self,
+        folder_path: str,
+        generator_map: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, str]]:
         """
         Bir klasördeki tüm PDF'leri işle
         
         Args:
             folder_path: Klasör yolu
+            generator_map: PDF dosya adı -> jeneratör ID'si
+                (bkz. FaultCodeManager.get_manual_generator_map)
         
         Returns:
             Tüm chunk'ların listesi
@@ -187,7 +220,10 @@ class DocumentProcessor:
         print(f"\n📂 {len(pdf_files)} PDF bulundu\n")
         
         for pdf_path in pdf_files:
-            chunks = self.process_pdf(str(pdf_path))
+            chunks = self.process_pdf(
+                str(pdf_path),
+                generator_id=(generator_map or {}).get(pdf_path.name)
+            )
             all_chunks.extend(chunks)
         
         print(f"\n✓ Toplam {len(all_chunks)} chunk oluşturuldu")
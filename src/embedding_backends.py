@@ -0,0 +1,254 @@
+"""
+Embedding Model Arka Uçları
+
+Aynı sentence-transformer modeli üç şekilde çalıştırılabilir:
+
+    torch      PyTorch (varsayılan)
+    onnx       ONNX Runtime (torch'a göre hızlı import ve CPU çıkarımı)
+    onnx-int8  Dinamik int8 kuantize ONNX (en hızlı, embedding'ler
+               torch'a göre çok az farklı)
+
+ONNX arka uçları `pip install optimum[onnxruntime]` gerektirir. Model ilk
+kullanımda ONNX'e (ve int8'e) çevrilip export_dir altına kaydedilir; bu
+tek seferlik çevirme sentence-transformers (dolayısıyla torch) kullanır.
+Sonraki açılışlar sadece onnxruntime ve tokenizers yükler: tokenizer,
+model ve pooling/normalizasyon ayarları kaydedilen klasörden okunur.
+"""
+
+import os
+import re
+import json
+import platform
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+DEFAULT_EXPORT_DIR = './data/onnx'
+
+
+def check_backend(backend: str):
+    """Geçersiz arka uç adında hata ver"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen embedding arka ucu: {backend} (geçerli: {', '.join(BACKENDS)})")
+
+
+def cache_key(model_name: str, backend: str) -> str:
+    """
+    Embedding önbellekleri için model anahtarı
+
+    int8 embedding'ler torch'unkilerle birebir aynı olmadığı için her arka
+    uç ayrı anahtar kullanır (torch eski anahtarla uyumlu kalır).
+    """
+    return model_name if backend == 'torch' else f'{model_name}@{backend}'
+
+
+def quantization_config() -> str:
+    """Bu işlemci için dinamik kuantizasyon ayarı"""
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return 'arm64'
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return 'avx2'
+    if 'avx512_vnni' in flags:
+        return 'avx512_vnni'
+    return 'avx512' if 'avx512f' in flags else 'avx2'
+
+
+def _export_path(model_name: str, export_dir: str) -> str:
+    """Modelin ONNX dosyalarının kaydedileceği klasör"""
+    return os.path.join(export_dir, re.sub(r'[^\w.-]', '_', model_name))
+
+
+def pool_embeddings(hidden: np.ndarray, mask: np.ndarray, mode: str = 'mean',
+                    normalize: bool = False) -> np.ndarray:
+    """
+    Token embedding'lerinden cümle embedding'i (sentence-transformers Pooling/Normalize)
+
+    Args:
+        hidden: Token embedding'leri (batch x seq x dim)
+        mask: attention_mask (batch x seq; padding = 0)
+        mode: 'mean', 'cls' veya 'max'
+        normalize: L2 normalizasyonu
+
+    Returns:
+        Embedding matrisi (batch x dim, float32)
+    """
+    mask = mask[:, :, None].astype(np.float32)
+    if mode == 'cls':
+        pooled = hidden[:, 0]
+    elif mode == 'max':
+        pooled = np.where(mask > 0, hidden, -1e9).max(axis=1)
+    else:
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = pooled.astype(np.float32)
+    if normalize:
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled
+
+
+def _read_json(path: str, default):
+    """Model klasöründeki ayar dosyası (yoksa varsayılan)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _pooling_mode(config: Dict) -> str:
+    """Pooling ayarından mod adı (1_Pooling/config.json; eski ve yeni biçim)"""
+    mode = config.get('pooling_mode')
+    if mode is None:
+        if config.get('pooling_mode_cls_token'):
+            mode = 'cls'
+        elif config.get('pooling_mode_max_tokens'):
+            mode = 'max'
+        elif config.get('pooling_mode_mean_tokens', True):
+            mode = 'mean'
+    if mode not in ('mean', 'cls', 'max'):
+        raise ValueError(f"ONNX arka ucu bu pooling modunu desteklemiyor: {mode} (torch arka ucunu kullanın)")
+    return mode
+
+
+class OnnxSentenceModel:
+    """
+    Dışa aktarılmış sentence-transformer modelini ONNX Runtime ile çalıştırır
+
+    sentence_transformers / torch import etmez; encode arayüzü
+    SentenceTransformer.encode ile aynıdır (numpy döner).
+    """
+
+    def __init__(self, path: str, file_name: str = 'onnx/model.onnx'):
+        """
+        Args:
+            path: save_pretrained ile kaydedilmiş model klasörü
+            file_name: Klasör içindeki ONNX dosyası
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(path, file_name), providers=['CPUExecutionProvider']
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        outputs = [o.name for o in self.session.get_outputs()]
+        self._output_name = 'last_hidden_state' if 'last_hidden_state' in outputs else outputs[0]
+
+        # Pooling ve normalizasyon modelin sentence-transformers ayarlarından
+        modules = _read_json(os.path.join(path, 'modules.json'), [])
+        self.normalize = any(m.get('type', '').endswith('Normalize') for m in modules)
+        pooling_dir = next((m['path'] for m in modules if m.get('type', '').endswith('Pooling')), '1_Pooling')
+        pooling = _read_json(os.path.join(path, pooling_dir, 'config.json'), {})
+        self.pooling = _pooling_mode(pooling)
+        self.dim = int(pooling.get('embedding_dimension') or pooling.get('word_embedding_dimension') or 0)
+
+        # Eski sürümler sentence_bert_config.json'a, yeniler tokenizer ayarına yazar
+        max_length = _read_json(os.path.join(path, 'sentence_bert_config.json'), {}).get('max_seq_length')
+        if not max_length:
+            max_length = _read_json(os.path.join(path, 'tokenizer_config.json'), {}).get('model_max_length')
+        self.max_seq_length = int(max_length) if max_length and max_length < 1e6 else 512
+        self._tokenizer = Tokenizer.from_file(os.path.join(path, 'tokenizer.json'))
+        # Padding batch içinde elle yapılır (token_lengths gerçek uzunlukları görsün)
+        self._pad_id = self._tokenizer.padding['pad_id'] if self._tokenizer.padding else 0
+        self._tokenizer.no_padding()
+        self._tokenizer.enable_truncation(self.max_seq_length)
+
+    def tokenizer(self, texts: Sequence[str], add_special_tokens: bool = True) -> Dict[str, List[List[int]]]:
+        """transformers tokenizer arayüzü (embedding_pipeline.token_lengths için)"""
+        encodings = self._tokenizer.encode_batch(list(texts), add_special_tokens=add_special_tokens)
+        return {'input_ids': [e.ids for e in encodings]}
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Tek batch: tokenize, en uzun metne göre pad, çalıştır, pool"""
+        encodings = self._tokenizer.encode_batch(texts)
+        length = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(texts), length), self._pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(texts), length), dtype=np.int64)
+        token_type_ids = np.zeros((len(texts), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            n = len(encoding.ids)
+            input_ids[row, :n] = encoding.ids
+            attention_mask[row, :n] = encoding.attention_mask
+            token_type_ids[row, :n] = encoding.type_ids
+
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask, 'token_type_ids': token_type_ids}
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+        hidden = self.session.run([self._output_name], feeds)[0]
+        return pool_embeddings(hidden, attention_mask, self.pooling, self.normalize)
+
+    def encode(self, texts, batch_size: int = 32, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        """
+        Metinleri embedding'e çevir
+
+        Args:
+            texts: Metin listesi (tek metin verilirse tek vektör döner)
+            batch_size: Batch başına metin sayısı
+            show_progress_bar: SentenceTransformer uyumluluğu için (kullanılmaz)
+
+        Returns:
+            Embedding matrisi (n_texts x embedding_dim)
+        """
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size)[0]
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.concatenate([
+            self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)
+        ])
+
+
+def load_sentence_model(model_name: str, backend: str = 'torch', export_dir: str = DEFAULT_EXPORT_DIR):
+    """
+    SentenceTransformer modelini seçilen arka uçla yükle
+
+    ONNX arka uçlarında model yalnızca ilk kullanımda sentence-transformers
+    ile dışa aktarılır; kayıtlı dosyalar OnnxSentenceModel ile (torch
+    yüklemeden) çalıştırılır.
+
+    Args:
+        model_name: Sentence-transformers model adı veya yolu
+        backend: 'torch', 'onnx' veya 'onnx-int8'
+        export_dir: ONNX dosyalarının saklandığı klasör
+
+    Returns:
+        SentenceTransformer veya OnnxSentenceModel (encode arayüzü aynı)
+    """
+    check_backend(backend)
+
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            f"'{backend}' arka ucu için ONNX Runtime gerekli: pip install optimum[onnxruntime]"
+        ) from e
+
+    path = _export_path(model_name, export_dir)
+    if not os.path.isfile(os.path.join(path, 'onnx', 'model.onnx')):
+        from sentence_transformers import SentenceTransformer
+
+        print(f"   🔄 Model ONNX'e çevriliyor: {path}")
+        SentenceTransformer(model_name, backend='onnx').save_pretrained(path)
+
+    if backend == 'onnx':
+        return OnnxSentenceModel(path)
+
+    config = quantization_config()
+    file_name = f'onnx/model_qint8_{config}.onnx'
+    if not os.path.isfile(os.path.join(path, file_name)):
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+        print(f"   🔄 int8 kuantizasyon ({config}): {path}")
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(path, backend='onnx'), config, path
+        )
+    return OnnxSentenceModel(path, file_name)
@@ -0,0 +1,265 @@
+"""
+Kalıcı Embedding Önbelleği
+
+Training her çalıştığında tüm manuellerin chunk'ları yeniden embedding'e
+çevriliyordu. Bu modül embedding'leri (model adı, chunk metninin
+SHA-256 özeti) anahtarıyla bir SQLite dosyasında saklar; yeniden
+training'de sadece yeni veya değişmiş chunk'lar modele gönderilir.
+
+    data/embedding_cache.sqlite
+    └── embeddings(model, text_hash, dim, vector)  # vector: float32 bayt
+
+Sorgu tarafında QueryEmbeddingCache, tekrar eden soruların embedding'ini
+bellekte (LRU) tutar.
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+
+from src.lexical_index import turkish_casefold
+
+
+# SQLite tek sorguda en fazla 999 parametre kabul eder (eski sürümler)
+_QUERY_BATCH = 900
+
+
+def text_hash(text: str) -> str:
+    """Chunk metninin önbellek anahtarı"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """(model, metin özeti) -> embedding SQLite önbelleği"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite dosya yolu (yoksa oluşturulur)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Streamlit her yeniden çalıştırmada farklı thread kullanabilir
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            ' model TEXT NOT NULL,'
+            ' text_hash TEXT NOT NULL,'
+            ' dim INTEGER NOT NULL,'
+            ' vector BLOB NOT NULL,'
+            ' PRIMARY KEY (model, text_hash))'
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Önbellekteki embedding sayısı (tüm modeller)"""
+        return self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        """Bu oturumdaki isabet oranı (0-1)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> dict:
+        """
+        Önbellekte bulunan embedding'leri getir
+
+        Args:
+            model: Embedding model adı
+            hashes: Metin özetleri
+
+        Returns:
+            {özet: embedding} (bulunamayanlar yok)
+        """
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), _QUERY_BATCH):
+            batch = unique[start:start + _QUERY_BATCH]
+            rows = self._conn.execute(
+                f'SELECT text_hash, vector FROM embeddings WHERE model = ? '
+                f'AND text_hash IN ({",".join("?" * len(batch))})',
+                [model, *batch]
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, hashes: Sequence[str], embeddings: np.ndarray):
+        """
+        Embedding'leri önbelleğe yaz
+
+        Args:
+            model: Embedding model adı
+            hashes: Metin özetleri
+            embeddings: Özetlerle aynı sırada embedding matrisi
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)',
+                [(model, key, vector.shape[0], vector.tobytes())
+                 for key, vector in zip(hashes, embeddings)]
+            )
+
+    def encode(
+        self,
+        model: str,
+        texts: List[str],
+        encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Metinleri önbellek üzerinden embedding'e çevir
+
+        Önbellekte olmayan metinler (tekrarlar bir kez) encode_fn ile
+        hesaplanır ve önbelleğe yazılır.
+
+        Args:
+            model: Embedding model adı
+            texts: Metin listesi
+            encode_fn: Eksik metinler için embedding fonksiyonu
+
+        Returns:
+            Embedding matrisi (girdi sırasıyla)
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = self.get_many(model, hashes)
+
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            computed = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            self.put_many(model, list(missing), computed)
+            found.update(zip(missing, computed))
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in hashes])
+
+    def clear(self, model: Optional[str] = None):
+        """Önbelleği (veya sadece bir modelin kayıtlarını) temizle"""
+        with self._conn:
+            if model is None:
+                self._conn.execute('DELETE FROM embeddings')
+            else:
+                self._conn.execute('DELETE FROM embeddings WHERE model = ?', (model,))
+
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        self._conn.close()
+
+
+def normalize_query(query: str) -> str:
+    """Sorgu önbellek anahtarı: Türkçe küçük harf + tek boşluk"""
+    return ' '.join(turkish_casefold(query).split())
+
+
+class QueryEmbeddingCache:
+    """
+    Sorgu embedding'leri için sınırlı LRU önbellek
+
+    Aynı sorular ("yağ değişimi nasıl yapılır?") tekrar tekrar soruluyor;
+    isabette transformer çalıştırılmaz. Anahtar normalize edilmiş sorgu
+    metnidir. Farklı bir model adıyla erişildiğinde tüm kayıtlar silinir.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Args:
+            max_size: En fazla kaç sorgu embedding'i tutulacak (0 = kapalı)
+        """
+        self.max_size = max_size
+        self.model: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Önbellekteki sorgu sayısı"""
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """İsabet oranı (0-1)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _check_model(self, model: str):
+        """Model değiştiyse eski modelin embedding'lerini at"""
+        if model != self.model:
+            self._entries.clear()
+            self.model = model
+
+    def get(self, model: str, query: str) -> Optional[np.ndarray]:
+        """
+        Önbellekteki sorgu embedding'i (yoksa None)
+
+        Args:
+            model: Embedding model adı
+            query: Sorgu metni (normalize edilir)
+        """
+        key = normalize_query(query)
+        with self._lock:
+            self._check_model(model)
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, model: str, query: str, embedding: np.ndarray):
+        """Sorgu embedding'ini ekle; doluysa en eski kullanılanı çıkar"""
+        if self.max_size <= 0:
+            return
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.flags.writeable = False  # Paylaşılan kopya değiştirilmesin
+        with self._lock:
+            self._check_model(model)
+            key = normalize_query(query)
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def encode(
+        self,
+        model: str,
+        queries: List[str],
+        encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Sorguları önbellek üzerinden embedding'e çevir
+
+        Sadece önbellekte olmayan sorgular encode_fn ile hesaplanır.
+
+        Returns:
+            Embedding matrisi (girdi sırasıyla)
+        """
+        embeddings = [self.get(model, query) for query in queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = encode_fn([queries[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                self.put(model, queries[i], embedding)
+                embeddings[i] = embedding
+        return np.stack(embeddings).astype(np.float32, copy=False)
+
+    def clear(self):
+        """Tüm kayıtları sil (sayaçlar korunur)"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,156 @@
+"""
+Training İçin Paralel Embedding Hattı
+
+SentenceTransformer.encode tek işlemde çalışır ve aynı batch'e düşen
+kısa/uzun chunk'lar en uzun olana kadar padding'lenir. Bu modül:
+
+    1. Chunk'ları token uzunluğuna göre sıralayıp benzer uzunlukta
+       batch'lere (kova) böler
+    2. Batch'leri çekirdek sayısı kadar işçi process'e dağıtır (her işçi
+       modeli bir kez yükler)
+    3. Embedding'leri girdi sırasına geri dizer
+
+Sadece training'de kullanılır; sorgu embedding'i tek process'te kalır.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+
+
+# Process havuzundaki her işçinin yüklediği model
+_WORKER_MODEL = None
+
+
+def token_lengths(model, texts: Sequence[str]) -> np.ndarray:
+    """
+    Metinlerin token uzunlukları
+
+    Modelin tokenizer'ı varsa onunla, yoksa kelime sayısıyla ölçülür.
+    """
+    tokenizer = getattr(model, 'tokenizer', None)
+    if tokenizer is not None:
+        try:
+            ids = tokenizer(list(texts), add_special_tokens=False)['input_ids']
+            return np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(texts))
+        except Exception:
+            pass
+    return np.fromiter((len(text.split()) for text in texts), dtype=np.int64, count=len(texts))
+
+
+def length_buckets(lengths: np.ndarray, batch_size: int) -> List[np.ndarray]:
+    """
+    Uzunluğa göre sıralı batch'ler (satır indeksleri)
+
+    Uzundan kısaya sıralanır: en pahalı batch'ler havuza önce girer,
+    kısa olanlar sonda boşta kalan işçileri doldurur.
+
+    Args:
+        lengths: Metin başına token uzunluğu
+        batch_size: Batch başına metin sayısı
+
+    Returns:
+        Batch'lerin girdi indeksleri
+    """
+    order = np.argsort(-np.asarray(lengths), kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def gather(batches: Sequence[np.ndarray], outputs: Sequence[np.ndarray], count: int) -> np.ndarray:
+    """Batch çıktılarını girdi sırasına geri diz"""
+    dim = outputs[0].shape[1]
+    embeddings = np.empty((count, dim), dtype=np.float32)
+    for ids, output in zip(batches, outputs):
+        embeddings[ids] = output
+    return embeddings
+
+
+def default_workers() -> int:
+    """Kullanılabilir çekirdek sayısı"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(model_name: str, backend: str, threads: int):
+    """İşçi process'te modeli bir kez yükle"""
+    global _WORKER_MODEL
+    from src.embedding_backends import load_sentence_model
+
+    # İşçiler çekirdekleri paylaşır; her biri kendi payı kadar thread kullanır
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    if backend == 'torch':
+        import torch
+        torch.set_num_threads(threads)
+    _WORKER_MODEL = load_sentence_model(model_name, backend)
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    """İşçi process'te tek batch'i encode et"""
+    return np.asarray(
+        _WORKER_MODEL.encode(texts, batch_size=len(texts), show_progress_bar=False),
+        dtype=np.float32
+    )
+
+
+def encode_bucketed(
+    texts: Sequence[str],
+    lengths: np.ndarray,
+    encode_batch: Callable[[List[str]], np.ndarray],
+    batch_size: int = 32,
+    model_name: Optional[str] = None,
+    backend: str = 'torch',
+    workers: int = 1,
+    progress: bool = True
+) -> np.ndarray:
+    """
+    Metinleri uzunluk kovalarıyla (ve istenirse process havuzunda) encode et
+
+    Args:
+        texts: Metin listesi
+        lengths: Metin başına token uzunluğu (bkz. token_lengths)
+        encode_batch: Tek process'te batch encode fonksiyonu (workers=1)
+        batch_size: Batch başına metin sayısı
+        model_name: İşçilerin yükleyeceği model (workers > 1 için)
+        backend: İşçilerdeki model arka ucu (bkz. embedding_backends)
+        workers: İşçi process sayısı (1 = bu process'te)
+        progress: Tamamlanan batch'leri yazdır
+
+    Returns:
+        Embedding matrisi (girdi sırasıyla)
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    batches = length_buckets(lengths, batch_size)
+    batch_texts = [[texts[i] for i in ids] for ids in batches]
+    workers = max(1, min(workers, len(batches)))
+
+    if workers == 1:
+        outputs = []
+        for i, batch in enumerate(batch_texts, 1):
+            outputs.append(np.asarray(encode_batch(batch), dtype=np.float32))
+            if progress:
+                print(f"\r   Batch {i}/{len(batches)}", end='', flush=True)
+    else:
+        threads = max(1, default_workers() // workers)
+        # fork, torch'un iç thread havuzlarıyla kilitlenebilir
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name, backend, threads)
+        ) as executor:
+            outputs = []
+            for i, output in enumerate(executor.map(_encode_batch, batch_texts), 1):
+                outputs.append(output)
+                if progress:
+                    print(f"\r   Batch {i}/{len(batches)} ({workers} işçi)", end='', flush=True)
+    if progress:
+        print()
+
+    return gather(batches, outputs, len(texts))
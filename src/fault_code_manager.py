@@ -173,6 +173,22 @@ class FaultCodeManager:
                 return gen
         return None
     
+    def get_manual_generator_map(self) -> Dict[str, str]:
+        """
+        PDF manuel adı -> jeneratör ID'si eşlemesi
+        
+        Jeneratör kayıtlarındaki opsiyonel "manuals" listesinden oluşturulur;
+        training sırasında chunk'lar bu ID ile etiketlenir.
+        
+        Returns:
+            {dosya adı: jeneratör ID'si}
+        """
+        mapping = {}
+        for gen in self.generators:
+            for manual in gen.get('manuals', []):
+                mapping[os.path.basename(manual)] = gen.get('id')
+        return mapping
+    
     def format_fault_info(self, fault: Dict) -> str:
         """
         Arıza bilgisini okunabilir formatta döndür
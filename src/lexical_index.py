@@ -0,0 +1,298 @@
+"""
+Sözcüksel (BM25) Arama İndeksi
+
+Parça numaraları, arıza kodları ve tork değerleri gibi birebir geçen
+terimler embedding aramasında sık kaçar. Bu modül chunk metinleri
+üzerinde ters indeks tutar ve BM25 ile skorlar:
+
+    - Türkçe büyük/küçük harf dönüşümü (I -> ı, İ -> i)
+    - Hafif ek atma (motorun -> motor, yağı -> yağ); rakam içeren
+      terimler (E101, 1R-0750, 45.5) olduğu gibi korunur
+    - Yoğun (dense) ve sözcüksel sonuçların reciprocal-rank fusion ile
+      birleştirilmesi
+"""
+
+import re
+import json
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from src.vector_index import top_k_indices
+
+
+_TR_CASE = str.maketrans({'I': 'ı', 'İ': 'i'})
+_TOKEN_RE = re.compile(r'[0-9a-zçğıöşüâîû]+(?:[-./][0-9a-zçğıöşüâîû]+)*')
+_SPLIT_RE = re.compile(r'[-./]')
+# Kesme işaretinden sonraki ek ("E101'de", "motor’un"); terim olarak indekslenmez
+_APOSTROPHE_SUFFIX_RE = re.compile(r"['’`]\w+")
+# Tokenizasyon kuralları değişince kayıtlı indeksler yeniden oluşturulur
+TOKENIZER_VERSION = 2
+
+# En uzundan kısaya: çoğul + hal ekleri, iyelik ve kaynaştırmalı ekler
+_SUFFIXES = sorted({
+    'lerinden', 'larından', 'lerinde', 'larında', 'lerine', 'larına', 'lerini', 'larını',
+    'leriyle', 'larıyla', 'lerin', 'ların', 'leri', 'ları', 'ler', 'lar',
+    'ından', 'inden', 'undan', 'ünden', 'ndan', 'nden', 'dan', 'den', 'tan', 'ten',
+    'ında', 'inde', 'unda', 'ünde', 'nda', 'nde', 'da', 'de', 'ta', 'te',
+    'ıyla', 'iyle', 'uyla', 'üyle', 'yla', 'yle', 'nın', 'nin', 'nun', 'nün',
+    'ın', 'in', 'un', 'ün', 'ya', 'ye', 'yı', 'yi', 'yu', 'yü',
+    'sı', 'si', 'su', 'sü', 'ı', 'i', 'u', 'ü', 'a', 'e',
+}, key=len, reverse=True)
+MIN_STEM = 3
+MAX_STRIPS = 2
+
+# Bu kadar kısa ve kod benzeri terim içeren sorgular "birebir terim" sayılır
+EXACT_QUERY_MAX_TOKENS = 3
+# Kod benzeri terim: harf+rakam karışık (E101, 1R-0750), tireli (3406-1250)
+# veya çok noktalı (4.2.1) numara; düz sayılar ("500 saatlik", "45.5 Nm") değil
+_CODE_TOKEN_RE = re.compile(
+    r'(?=.*[0-9])(?=.*[a-zçğıöşüâîû]).+'
+    r'|[0-9]+(?:-[0-9]+)+'
+    r'|[0-9]+(?:\.[0-9]+){2,}'
+)
+
+
+def turkish_casefold(text: str) -> str:
+    """Türkçe kurallarıyla küçük harfe çevir (I -> ı, İ -> i)"""
+    return text.translate(_TR_CASE).lower()
+
+
+def stem(token: str) -> str:
+    """
+    Hafif Türkçe ek atma
+
+    En fazla MAX_STRIPS ek atılır ve gövde MIN_STEM karakterden kısa
+    kalmaz. Rakam içeren terimlere dokunulmaz.
+    """
+    if any(ch.isdigit() for ch in token):
+        return token
+    for _ in range(MAX_STRIPS):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def _strip_apostrophe_suffixes(text: str) -> str:
+    """Küçük harfe çevir ve kesme işaretli ekleri at"""
+    return _APOSTROPHE_SUFFIX_RE.sub('', turkish_casefold(text))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni BM25 terimlerine ayır
+
+    '1R-0750' gibi birleşik terimler hem bütün hem parça olarak eklenir;
+    kesme işaretinden sonraki ek atılır ("E101'de" -> e101).
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(_strip_apostrophe_suffixes(text)):
+        tokens.append(stem(token))
+        if _SPLIT_RE.search(token):
+            tokens.extend(stem(part) for part in _SPLIT_RE.split(token) if part)
+    return tokens
+
+
+def is_exact_term_query(query: str) -> bool:
+    """Sorgu birkaç kelimelik bir kod/parça numarası araması mı (örn: 'E101', '1R-0750 filtre')"""
+    tokens = _TOKEN_RE.findall(_strip_apostrophe_suffixes(query))
+    return (0 < len(tokens) <= EXACT_QUERY_MAX_TOKENS
+            and any(_CODE_TOKEN_RE.fullmatch(token) for token in tokens))
+
+
+def result_key(result: Dict) -> Tuple:
+    """Sonuçları listeler/parçalar arasında eşlemek için anahtar"""
+    return result.get('source'), result.get('chunk_id'), result.get('start_char')
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Dict]], top_k: int, k: int = 60) -> List[Dict]:
+    """
+    Sıralı sonuç listelerini RRF ile birleştir
+
+    skor(d) = Σ 1 / (k + sıra(d)); sıra 1'den başlar. Skor ölçekleri
+    (cosine, BM25) farklı olduğu için sadece sıralar kullanılır.
+
+    Args:
+        rankings: Sıralı sonuç listeleri (örn: [dense, bm25])
+        top_k: Kaç sonuç döndürülecek
+        k: RRF sabiti (büyük k = alt sıraların etkisi artar)
+
+    Returns:
+        'rrf_score' alanı eklenmiş birleşik liste
+    """
+    fused: Dict[Tuple, Dict] = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, 1):
+            key = result_key(result)
+            if key not in fused:
+                fused[key] = dict(result, rrf_score=0.0)
+            else:
+                # Diğer listedeki skor alanlarını (bm25 vb.) da taşı
+                for field, value in result.items():
+                    fused[key].setdefault(field, value)
+            fused[key]['rrf_score'] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda r: r['rrf_score'], reverse=True)[:top_k]
+
+
+class BM25Index:
+    """Chunk metinleri üzerinde BM25 ters indeksi"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: Terim frekansı doygunluğu
+            b: Doküman uzunluğu normalizasyonu
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}  # terim -> (satırlar, tf)
+        self.doc_len: List[int] = []
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_len_array: Optional[np.ndarray] = None
+        self._avgdl = 1.0
+
+    def __len__(self) -> int:
+        """İndekslenmiş chunk sayısı"""
+        return len(self.doc_len)
+
+    def add(self, chunks: Iterable[Dict], start_id: int):
+        """
+        Chunk metinlerini indekse ekle
+
+        Args:
+            chunks: Chunk'lar (sırayla start_id'den itibaren)
+            start_id: İlk chunk'ın satır indeksi
+        """
+        for row, chunk in enumerate(chunks, start_id):
+            counts: Dict[str, int] = {}
+            tokens = tokenize(chunk.get('text', ''))
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                ids, tfs = self.postings.setdefault(token, ([], []))
+                ids.append(row)
+                tfs.append(tf)
+                self._arrays.pop(token, None)
+            self.doc_len.append(len(tokens))
+        self._doc_len_array = None
+
+    def _posting(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Terimin posting listesi (NumPy dizisi olarak önbellekli)"""
+        if term not in self._arrays:
+            ids, tfs = self.postings[term]
+            self._arrays[term] = (np.asarray(ids, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+        return self._arrays[term]
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        candidates: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 ile en iyi chunk'ları bul
+
+        Sadece sorgu terimlerini içeren satırlar skorlanır (tam tarama yok).
+
+        Args:
+            query: Sorgu metni
+            top_k: Kaç sonuç döndürülecek
+            candidates: Sadece bu satırlar (artan sıralı, metadata filtresi)
+            exclude: Atlanacak satırların maskesi (silinmiş chunk'lar)
+
+        Returns:
+            (satır indeksleri, BM25 skorları) - azalan sırada
+        """
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        if not terms or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if self._doc_len_array is None:
+            self._doc_len_array = np.asarray(self.doc_len, dtype=np.float32)
+            self._avgdl = float(self._doc_len_array.mean()) or 1.0
+        doc_len, avgdl = self._doc_len_array, self._avgdl
+        n_docs = len(doc_len)
+
+        all_ids, all_weights = [], []
+        for term in terms:
+            ids, tfs = self._posting(term)
+            idf = math.log(1.0 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doc_len[ids] / avgdl)
+            all_ids.append(ids)
+            all_weights.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        ids = np.concatenate(all_ids)
+        weights = np.concatenate(all_weights)
+        keep = np.ones(len(ids), dtype=bool)
+        if candidates is not None:
+            keep &= np.isin(ids, candidates, assume_unique=False)
+        if exclude is not None:
+            inside = ids < len(exclude)
+            keep[inside] &= ~exclude[ids[inside]]
+        ids, weights = ids[keep], weights[keep]
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows, inverse = np.unique(ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights).astype(np.float32)
+        best = top_k_indices(scores, top_k)
+        return rows[best], scores[best]
+
+    def compact(self, keep: np.ndarray):
+        """
+        Silinen satırları listelerden çıkar ve indeksleri yeniden numarala
+
+        Args:
+            keep: Eski satır indekslerine göre canlı maske
+        """
+        remap = np.cumsum(keep) - 1
+        for term in list(self.postings):
+            ids, tfs = self._posting(term)
+            alive = keep[ids]
+            if alive.any():
+                self.postings[term] = (remap[ids[alive]].tolist(), tfs[alive].astype(int).tolist())
+            else:
+                del self.postings[term]
+        self.doc_len = np.asarray(self.doc_len)[keep[:len(self.doc_len)]].tolist()
+        self._arrays = {}
+        self._doc_len_array = None
+
+    # ------------------------------------------------------------------ #
+    # Kaydetme / yükleme
+    # ------------------------------------------------------------------ #
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Kaydetmek için diziler (terimler JSON, posting'ler CSR)"""
+        terms = list(self.postings)
+        ids = [self.postings[t][0] for t in terms]
+        tfs = [self.postings[t][1] for t in terms]
+        lengths = [len(x) for x in ids]
+        return {
+            'params': np.array([self.k1, self.b], dtype=np.float64),
+            'terms': np.array(json.dumps(terms, ensure_ascii=False)),
+            'offsets': np.cumsum([0] + lengths).astype(np.int64),
+            'ids': np.fromiter((i for x in ids for i in x), dtype=np.int64, count=sum(lengths)),
+            'tfs': np.fromiter((f for x in tfs for f in x), dtype=np.int32, count=sum(lengths)),
+            'doc_len': np.asarray(self.doc_len, dtype=np.int32),
+            'tokenizer': np.array(TOKENIZER_VERSION),
+        }
+
+    @classmethod
+    def from_state(cls, state) -> 'BM25Index':
+        """Kaydedilmiş dizilerden oluştur (eski tokenizasyonla kaydedildiyse boş döner)"""
+        k1, b = (float(x) for x in state['params'])
+        index = cls(k1=k1, b=b)
+        if 'tokenizer' not in state or int(state['tokenizer']) != TOKENIZER_VERSION:
+            return index  # İlk sözcüksel aramada chunk'lardan yeniden oluşturulur
+        terms = json.loads(str(state['terms']))
+        offsets, ids, tfs = state['offsets'], state['ids'], state['tfs']
+        for i, term in enumerate(terms):
+            start, end = offsets[i], offsets[i + 1]
+            index.postings[term] = (ids[start:end].tolist(), tfs[start:end].tolist())
+        index.doc_len = state['doc_len'].tolist()
+        return index
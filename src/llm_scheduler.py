@@ -0,0 +1,204 @@
+"""
+Öncelikli LLM İstek Zamanlayıcısı
+
+Streamlit'te her teknisyenin oturumu kendi thread'inde çalışır ve hepsi
+aynı Ollama'yı kullanır. Eşzamanlı istekler sırasız yığılıyor, uzun bir
+cevap diğerlerini bekletiyordu. LLMScheduler OllamaLLM'in önünde durur:
+
+    - Aynı anda en fazla `max_in_flight` istek Ollama'ya gider (Ollama'nın
+      OLLAMA_NUM_PARALLEL ayarıyla uyumlu tutulmalıdır)
+    - Fazlası sınırlı bir kuyrukta bekler; kuyruk doluysa istek hemen
+      QueueFullError ile reddedilir
+    - Kuyruktan önce öncelik (CRITICAL arıza soruları önce), sonra geliş
+      sırasıyla çıkılır; uzun bekleyen isteğin önceliği zamanla yükselir
+      (düşük öncelikliler aç kalmaz)
+    - Kuyruk derinliği, bekleme süreleri (p50/p95) ve red sayısı tutulur
+
+Aynı Ollama URL'ine giden tüm oturumlar tek zamanlayıcıyı paylaşır:
+
+    scheduler = get_scheduler('http://localhost:11434', max_in_flight=4)
+    with scheduler.slot(PRIORITY_CRITICAL):
+        ...  # Ollama isteği
+"""
+
+import math
+import time
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+# Öncelikler (küçük = önce)
+PRIORITY_CRITICAL = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_LOW = 3
+
+# Arıza kodu önem derecesi -> öncelik (diğerleri PRIORITY_NORMAL)
+SEVERITY_PRIORITY = {'CRITICAL': PRIORITY_CRITICAL, 'HIGH': PRIORITY_HIGH}
+
+# URL -> zamanlayıcı (Streamlit oturumları arasında paylaşılır)
+_SCHEDULERS: Dict[str, 'LLMScheduler'] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+class QueueFullError(RuntimeError):
+    """LLM kuyruğu dolu; istek reddedildi"""
+
+
+class QueueTimeoutError(RuntimeError):
+    """İstek kuyrukta izin verilen süreden uzun bekledi"""
+
+
+def priority_for_fault(fault_info: Optional[Dict]) -> int:
+    """Soruyla eşleşen arıza kodunun önem derecesine göre öncelik"""
+    severity = str((fault_info or {}).get('severity') or '').upper()
+    return SEVERITY_PRIORITY.get(severity, PRIORITY_NORMAL)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Yüzdelik (en yakın sıra; boşsa None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class LLMScheduler:
+    """Sınırlı kuyruklu, öncelikli, eşzamanlılık sınırlı istek zamanlayıcısı"""
+
+    def __init__(self, max_in_flight: int = 4, max_queue: int = 16, aging_seconds: float = 30.0):
+        """
+        Args:
+            max_in_flight: Aynı anda Ollama'ya giden en fazla istek
+            max_queue: Kuyrukta bekleyebilecek en fazla istek (dolunca red)
+            aging_seconds: Bekleyen isteğin önceliği bu sürede bir kademe yükselir
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.aging_seconds = aging_seconds
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.max_depth = 0
+        self.wait_times = deque(maxlen=500)
+        self._waiting: List[Dict] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def queue_depth(self) -> int:
+        """Kuyrukta bekleyen istek sayısı"""
+        return len(self._waiting)
+
+    def _rank(self, ticket: Dict, now: float):
+        """Kuyruk sırası: yaşlandırılmış öncelik, sonra geliş sırası"""
+        waited = now - ticket['enqueued']
+        return ticket['priority'] - waited / self.aging_seconds, ticket['sequence']
+
+    def _next_ticket(self) -> Optional[Dict]:
+        """Sıradaki bekleyen istek"""
+        if not self._waiting:
+            return None
+        now = time.monotonic()
+        return min(self._waiting, key=lambda ticket: self._rank(ticket, now))
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None) -> float:
+        """
+        Ollama'ya istek göndermek için sıra al (bloklar)
+
+        Args:
+            priority: İstek önceliği (PRIORITY_*; küçük = önce)
+            timeout: Kuyrukta en fazla bekleme (saniye; None = sınırsız)
+
+        Returns:
+            Kuyrukta beklenen süre (saniye)
+
+        Raises:
+            QueueFullError: Kuyruk dolu
+            QueueTimeoutError: timeout doldu
+        """
+        start = time.monotonic()
+        with self._condition:
+            # Boş slot var ve bekleyen yoksa kuyruğa girmeden geç
+            if self.in_flight < self.max_in_flight and not self._waiting:
+                self.in_flight += 1
+                self.wait_times.append(0.0)
+                return 0.0
+
+            if len(self._waiting) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"LLM kuyruğu dolu ({self.max_queue} istek bekliyor, "
+                    f"{self.in_flight} işleniyor); lütfen biraz sonra tekrar deneyin"
+                )
+
+            ticket = {'priority': priority, 'sequence': next(self._sequence), 'enqueued': start}
+            self._waiting.append(ticket)
+            self.max_depth = max(self.max_depth, len(self._waiting))
+            try:
+                while not (self.in_flight < self.max_in_flight and self._next_ticket() is ticket):
+                    remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                    if remaining is not None and remaining <= 0:
+                        self.timeouts += 1
+                        raise QueueTimeoutError(f"LLM kuyruğunda {timeout:.0f} s beklendi")
+                    # Yaşlanma sırayı değiştirebilir; ara ara yeniden bak
+                    self._condition.wait(min(remaining, 1.0) if remaining is not None else 1.0)
+            finally:
+                self._waiting.remove(ticket)
+                # Sıradaki bekleyen kendi durumunu kontrol etsin
+                self._condition.notify_all()
+
+            self.in_flight += 1
+            waited = time.monotonic() - start
+            self.wait_times.append(waited)
+            return waited
+
+    def release(self):
+        """İstek bitti; slotu sıradakine bırak"""
+        with self._condition:
+            self.in_flight -= 1
+            self.completed += 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None) -> Iterator[float]:
+        """acquire() / release() çifti; beklenen süreyi verir"""
+        waited = self.acquire(priority, timeout)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def stats(self) -> Dict:
+        """Kuyruk derinliği, eşzamanlılık, bekleme süresi ve red metrikleri"""
+        with self._condition:
+            waits = list(self.wait_times)
+            return {
+                'queue_depth': len(self._waiting),
+                'max_depth': self.max_depth,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'wait_p50': percentile(waits, 50),
+                'wait_p95': percentile(waits, 95),
+            }
+
+
+def get_scheduler(
+    url: str = "http://localhost:11434",
+    max_in_flight: int = 4,
+    max_queue: int = 16
+) -> LLMScheduler:
+    """URL için paylaşılan zamanlayıcı (ilk çağrının ayarlarıyla oluşturulur)"""
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(url)
+        if scheduler is None:
+            scheduler = _SCHEDULERS[url] = LLMScheduler(max_in_flight, max_queue)
+        return scheduler
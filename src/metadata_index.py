@@ -0,0 +1,160 @@
+"""
+Chunk Metadata İndeksi
+
+Chunk'ların metadata alanları (kaynak dosya, jeneratör, sayfa) için
+alan -> değer -> satır indeksleri şeklinde posting listeleri tutar.
+Filtreli aramada aday satırlar tüm chunk'lar taranmadan bu listelerden
+seçilir; skorlama sadece adaylar üzerinde yapılır.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Sequence
+import numpy as np
+
+
+METADATA_FIELDS = ('source', 'generator_id', 'page')
+
+
+class MetadataIndex:
+    """Alan başına posting listeleri (değer -> artan sıralı satır indeksleri)"""
+
+    def __init__(self, fields: Sequence[str] = METADATA_FIELDS):
+        """
+        Args:
+            fields: İndekslenecek chunk metadata alanları
+        """
+        self.fields = tuple(fields)
+        self.postings: Dict[str, Dict[Any, List[int]]] = {field: {} for field in self.fields}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """İndekslenmiş chunk sayısı"""
+        return self._size
+
+    def add(self, chunks: Iterable[Dict], start_id: int):
+        """
+        Yeni chunk'ları posting listelerine ekle
+
+        Args:
+            chunks: Chunk metadata'ları (sırayla start_id'den itibaren)
+            start_id: İlk chunk'ın satır indeksi
+        """
+        for row, chunk in enumerate(chunks, start_id):
+            for field in self.fields:
+                value = chunk.get(field)
+                if value is not None:
+                    self.postings[field].setdefault(value, []).append(row)
+            self._size = row + 1
+
+    def values(self, field: str) -> List:
+        """Bir alanın indeksteki değerleri"""
+        return list(self._field(field))
+
+    def ids(self, field: str, value) -> np.ndarray:
+        """
+        Bir alan değerine (veya değer listesine) sahip satırlar
+
+        Args:
+            field: Metadata alanı (örn: 'source')
+            value: Tek değer ya da değerlerden herhangi biri (list/tuple/set)
+
+        Returns:
+            Artan sıralı satır indeksleri
+        """
+        postings = self._field(field)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            lists = [postings[v] for v in value if v in postings]
+            if not lists:
+                return np.empty(0, dtype=np.int64)
+            return np.unique(np.concatenate([np.asarray(ids, dtype=np.int64) for ids in lists]))
+        return np.asarray(postings.get(value, []), dtype=np.int64)
+
+    def select(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Tüm filtrelere uyan satırlar (alanlar arasında VE, değerler arasında VEYA)
+
+        Args:
+            filters: {alan: değer veya değer listesi},
+                örn: {'generator_id': ['caterpillar_3406', 'general']}
+
+        Returns:
+            Artan sıralı satır indeksleri
+        """
+        selected = None
+        # En kısa listeden başlayınca kesişimler ucuzlar
+        for ids in sorted((self.ids(f, v) for f, v in filters.items()), key=len):
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+            if len(selected) == 0:
+                break
+        return selected if selected is not None else np.arange(self._size, dtype=np.int64)
+
+    def pop(self, field: str, value) -> List[int]:
+        """Bir değerin posting listesini çıkar ve döndür"""
+        return self._field(field).pop(value, [])
+
+    def compact(self, keep: np.ndarray):
+        """
+        Silinen satırları listelerden çıkar ve indeksleri yeniden numarala
+
+        Args:
+            keep: Eski satır indekslerine göre canlı maske
+        """
+        remap = np.cumsum(keep) - 1
+        for field, postings in self.postings.items():
+            for value in list(postings):
+                ids = np.asarray(postings[value], dtype=np.int64)
+                ids = remap[ids[keep[ids]]].tolist()
+                if ids:
+                    postings[value] = ids
+                else:
+                    del postings[value]
+        self._size = int(np.count_nonzero(keep))
+
+    def _field(self, field: str) -> Dict[Any, List[int]]:
+        """Alanın posting listeleri (indekslenmeyen alanda hata)"""
+        if field not in self.postings:
+            raise ValueError(
+                f"Filtrelenemeyen metadata alanı: {field} "
+                f"(geçerli: {', '.join(self.fields)})"
+            )
+        return self.postings[field]
+
+    # ------------------------------------------------------------------ #
+    # Kaydetme / yükleme
+    # ------------------------------------------------------------------ #
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """
+        Kaydetmek için diziler
+
+        Her alan için değerler JSON olarak (sayfa numaraları int kalır),
+        satır indeksleri tek dizi + ofsetler (CSR) olarak saklanır.
+        """
+        state = {
+            'fields': np.array(json.dumps(self.fields)),
+            'size': np.array(self._size),
+        }
+        for field, postings in self.postings.items():
+            values = list(postings)
+            lists = [np.asarray(postings[v], dtype=np.int64) for v in values]
+            state[f'{field}_values'] = np.array(json.dumps(values, ensure_ascii=False))
+            state[f'{field}_offsets'] = np.cumsum([0] + [len(ids) for ids in lists]).astype(np.int64)
+            state[f'{field}_ids'] = (np.concatenate(lists) if lists
+                                     else np.empty(0, dtype=np.int64))
+        return state
+
+    @classmethod
+    def from_state(cls, state) -> 'MetadataIndex':
+        """Kaydedilmiş dizilerden oluştur"""
+        index = cls(json.loads(str(state['fields'])))
+        index._size = int(state['size'])
+        for field in index.fields:
+            values = json.loads(str(state[f'{field}_values']))
+            offsets = state[f'{field}_offsets']
+            ids = state[f'{field}_ids']
+            index.postings[field] = {
+                value: ids[offsets[i]:offsets[i + 1]].tolist()
+                for i, value in enumerate(values)
+            }
+        return index
+
@@ -0,0 +1,286 @@
+"""
+Yerel Sahte Ollama Sunucusu
+
+Gerçek Ollama ve model olmadan asistanı uçtan uca ölçebilmek için
+Ollama HTTP API'sinin kullandığımız kısmını taklit eder:
+
+    GET  /              -> "Ollama is running"
+    GET  /api/version   -> {"version": ...}
+    GET  /api/tags      -> yüklü modeller (ollama.list)
+    POST /api/chat      -> sohbet; stream=true ise NDJSON akış (ollama.chat)
+
+Cevap süresi ayarlanabilir: ilk token gecikmesi (ttft), saniyedeki token
+(tokens_per_sec) ve soğuk başlangıçta bir kez model yükleme süresi
+(load_time; keep_alive süresi dolunca tekrar uygulanır). Eşzamanlı istek
+sayısı `parallel` ile sınırlanır (OLLAMA_NUM_PARALLEL gibi); fazlası
+sırada bekler.
+
+Kullanım:
+    python -m src.mock_ollama --port 11435 --ttft 0.3 --tps 25
+    OLLAMA_URL=http://127.0.0.1:11435 python main.py query "Yağ değişimi nasıl yapılır?"
+
+    with MockOllamaServer(ttft=0.05, tokens_per_sec=200) as server:
+        client = ollama.Client(host=server.url)
+"""
+
+import re
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+DEFAULT_ANSWER = """📋 ÖZET:
+Motor yağı, motor durdurulup soğuduktan sonra tahliye tapasından boşaltılarak değiştirilir.
+
+🔧 ADIMLAR:
+1. Motoru durdurun ve en az 15 dakika soğumasını bekleyin.
+2. Tahliye tapasının altına uygun bir kap yerleştirin ve tapayı sökün.
+3. Yağın tamamen boşalmasını bekleyin, yağ filtresini değiştirin.
+4. Tapayı yeni contayla 25 Nm torkla sıkın.
+5. Manuelde belirtilen sınıfta yağı seviye çubuğundaki üst çizgiye kadar doldurun.
+
+⚠️ GÜVENLİK:
+Sıcak yağ yanığa neden olur; eldiven ve gözlük kullanın.
+
+📚 KAYNAK:
+Bakım manueli, periyodik bakım bölümü."""
+
+
+def split_tokens(text: str) -> List[str]:
+    """Cevabı akış parçalarına böl (kelime + ardındaki boşluk)"""
+    return re.findall(r'\S+\s*|\s+', text)
+
+
+def now_iso() -> str:
+    """Ollama'nın created_at biçimi"""
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class MockOllamaServer:
+    """Ayarlanabilir gecikmeli sahte Ollama sunucusu (arka plan thread'inde)"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        ttft: float = 0.2,
+        tokens_per_sec: float = 30.0,
+        load_time: float = 0.0,
+        parallel: int = 4,
+        models: Optional[List[str]] = None,
+        answer: str = DEFAULT_ANSWER,
+        keep_alive: float = 300.0
+    ):
+        """
+        Args:
+            host: Dinlenecek adres
+            port: Port (0 = boş bir port seçilir)
+            ttft: İstek başına ilk token gecikmesi (prompt işleme, saniye)
+            tokens_per_sec: Üretim hızı (token/saniye)
+            load_time: Model yüklü değilken ilk istekte eklenecek yükleme süresi
+            parallel: Aynı anda işlenen en fazla istek
+            models: /api/tags'te görünecek modeller (istenen her model kabul edilir)
+            answer: Üretilecek cevap metni
+            keep_alive: İstekte keep_alive yoksa model bu kadar saniye yüklü kalır
+        """
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.load_time = load_time
+        self.parallel = parallel
+        self.models = models or ['mistral:latest', 'llama3.2:3b']
+        self.answer = answer
+        self.keep_alive = keep_alive
+        self.requests: List[Dict] = []
+        self.max_active = 0
+        self._active = 0
+        self._loaded_until = 0.0
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(parallel)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Sunucu adresi (OLLAMA_URL olarak verilir)"""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockOllamaServer':
+        """Sunucuyu arka planda başlat"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-ollama', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Sunucuyu bu thread'de çalıştır (komut satırı; Ctrl+C ile durur)"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            self._server.server_close()
+
+    def stop(self):
+        """Sunucuyu durdur"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockOllamaServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _load_delay(self, keep_alive) -> float:
+        """Model yüklü değilse yükleme süresi; yüklü kalma süresini uzat"""
+        if isinstance(keep_alive, str):
+            match = re.fullmatch(r'(-?\d+(?:\.\d+)?)([smh]?)', keep_alive.strip())
+            factor = {'': 1, 's': 1, 'm': 60, 'h': 3600}
+            keep_alive = float(match.group(1)) * factor[match.group(2)] if match else self.keep_alive
+        if keep_alive is None:
+            keep_alive = self.keep_alive
+        with self._lock:
+            now = time.monotonic()
+            delay = self.load_time if now >= self._loaded_until else 0.0
+            self._loaded_until = float('inf') if keep_alive < 0 else now + delay + keep_alive
+            return delay
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass  # İstek logları benchmark çıktısını kirletmesin
+
+            def _send_json(self, payload: Dict, status: int = 200):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                if self.path == '/api/tags':
+                    self._send_json({'models': [
+                        {'name': name, 'model': name, 'modified_at': now_iso(), 'size': 0,
+                         'digest': f'mock-{i}', 'details': {'format': 'gguf', 'family': 'mock'}}
+                        for i, name in enumerate(server.models)
+                    ]})
+                elif self.path == '/api/version':
+                    self._send_json({'version': '0.0.0-mock'})
+                elif self.path == '/':
+                    body = b'Ollama is running'
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._send_json({'error': 'not found'}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    self._send_json({'error': 'invalid JSON'}, 400)
+                    return
+                if self.path != '/api/chat':
+                    self._send_json({'error': 'not found'}, 404)
+                    return
+                with server._lock:
+                    server.requests.append(request)
+                with server._slots:
+                    with server._lock:
+                        server._active += 1
+                        server.max_active = max(server.max_active, server._active)
+                    try:
+                        self._chat(request)
+                    finally:
+                        with server._lock:
+                            server._active -= 1
+
+            def _chat(self, request: Dict):
+                start = time.perf_counter()
+                model = request.get('model', 'mock')
+                options = request.get('options') or {}
+                tokens = split_tokens(server.answer)
+                num_predict = options.get('num_predict')
+                if num_predict is not None and num_predict >= 0:
+                    tokens = tokens[:num_predict]
+                prompt_tokens = sum(len(split_tokens(m.get('content', ''))) for m in request.get('messages', []))
+
+                load = server._load_delay(request.get('keep_alive'))
+                time.sleep(load + server.ttft)
+                interval = 1.0 / server.tokens_per_sec if server.tokens_per_sec > 0 else 0.0
+
+                def final(content: str) -> Dict:
+                    total = time.perf_counter() - start
+                    return {
+                        'model': model, 'created_at': now_iso(),
+                        'message': {'role': 'assistant', 'content': content},
+                        'done': True, 'done_reason': 'stop',
+                        'total_duration': int(total * 1e9),
+                        'load_duration': int(load * 1e9),
+                        'prompt_eval_count': prompt_tokens,
+                        'prompt_eval_duration': int(server.ttft * 1e9),
+                        'eval_count': len(tokens),
+                        'eval_duration': int(max(0.0, total - load - server.ttft) * 1e9),
+                    }
+
+                if not request.get('stream', True):
+                    time.sleep(interval * len(tokens))
+                    self._send_json(final(''.join(tokens)))
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(interval)
+                    self._write_chunk({'model': model, 'created_at': now_iso(),
+                                       'message': {'role': 'assistant', 'content': token}, 'done': False})
+                self._write_chunk(final(''))
+                self.wfile.write(b'0\r\n\r\n')
+
+            def _write_chunk(self, payload: Dict):
+                line = (json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8')
+                self.wfile.write(f'{len(line):x}\r\n'.encode('ascii') + line + b'\r\n')
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    """Sunucuyu komut satırından başlat"""
+    parser = argparse.ArgumentParser(description='Sahte Ollama sunucusu (benchmark / test için)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--ttft', type=float, default=0.2, help='İlk token gecikmesi (s)')
+    parser.add_argument('--tps', type=float, default=30.0, help='Saniyedeki token')
+    parser.add_argument('--load-time', type=float, default=0.0, help='Soğuk model yükleme süresi (s)')
+    parser.add_argument('--parallel', type=int, default=4, help='Aynı anda işlenen istek')
+    args = parser.parse_args()
+
+    server = MockOllamaServer(args.host, args.port, args.ttft, args.tps, args.load_time, args.parallel)
+    print(f"🧪 Sahte Ollama: {server.url} (ttft {args.ttft} s, {args.tps} token/s, "
+          f"yükleme {args.load_time} s, paralel {args.parallel})")
+    print(f"   OLLAMA_URL={server.url} ile kullanın; durdurmak için Ctrl+C")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Ollama Sağlık İzleyicisi
+
+Streamlit her yeniden çalıştırmada kenar çubuğunu ve Ayarlar sayfasını
+baştan çizer; her çizimde ollama.list() çağırmak sayfayı ağ gecikmesi
+kadar bekletiyordu (Ollama kapalıyken bağlantı zaman aşımı kadar).
+OllamaLLM de her oluşturulduğunda aynı çağrıyı yapıyordu.
+
+OllamaHealthMonitor, Ollama'yı arka plandaki bir thread'de `ttl`
+saniyede bir yoklar ve son sonucu (çalışıyor mu, yüklü modeller)
+saklar. status() hiçbir zaman ağı beklemez; henüz yoklama yapılmadıysa
+durum "bilinmiyor" (ok=None) döner.
+
+Aynı URL için tek izleyici paylaşılır:
+
+    monitor = get_monitor('http://localhost:11434')
+    status = monitor.status()   # {'ok': True, 'models': ['mistral:latest'], ...}
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional
+
+
+# URL -> izleyici (Streamlit yeniden çalıştırmaları arasında modül kalıcıdır)
+_MONITORS: Dict[str, 'OllamaHealthMonitor'] = {}
+_MONITORS_LOCK = threading.Lock()
+DEFAULT_TTL = 30.0
+
+
+def model_names(result) -> List[str]:
+    """
+    ollama.list() sonucundan model adları
+
+    Yeni API: result.models (ListResponse, elemanlarda .model)
+    Eski API: result['models'] (dict, elemanlarda 'name' / 'model')
+    """
+    if hasattr(result, 'models'):
+        models = result.models
+    elif isinstance(result, dict):
+        models = result.get('models', [])
+    else:
+        models = []
+    names = []
+    for m in models or []:
+        name = getattr(m, 'model', None)
+        if name is None and isinstance(m, dict):
+            name = m.get('name', m.get('model'))
+        if name:
+            names.append(name)
+    return names
+
+
+class OllamaHealthMonitor:
+    """Ollama durumunu arka planda yoklayan, sonucu önbellekte tutan izleyici"""
+
+    def __init__(self, url: str = "http://localhost:11434", ttl: float = DEFAULT_TTL, timeout: float = 3.0):
+        """
+        Args:
+            url: Ollama API URL
+            ttl: Yoklamalar arası süre (saniye)
+            timeout: Tek yoklamanın zaman aşımı (saniye)
+        """
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.probes = 0
+        self._status: Dict = {'ok': None, 'models': [], 'error': None, 'checked': None, 'latency': None}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._probed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'OllamaHealthMonitor':
+        """Arka plan thread'ini başlat (zaten çalışıyorsa bir şey yapmaz)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name=f'ollama-health-{self.url}', daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Arka plan thread'ini durdur"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+
+    def _run(self):
+        """TTL aralıklarla yokla; refresh() beklemeyi erken bitirir"""
+        while not self._stop.is_set():
+            # Yoklamadan önce temizlenir: yoklama sırasında gelen refresh() kaybolmaz
+            self._wake.clear()
+            self.probe()
+            self._wake.wait(self.ttl)
+
+    def probe(self) -> Dict:
+        """Ollama'yı şimdi yokla (bloklar; sayfa çiziminden çağrılmamalı)"""
+        start = time.perf_counter()
+        try:
+            import ollama
+
+            result = ollama.Client(host=self.url, timeout=self.timeout).list()
+            status = {'ok': True, 'models': model_names(result), 'error': None}
+        except Exception as e:
+            status = {'ok': False, 'models': [], 'error': str(e)}
+        status['checked'] = time.time()
+        status['latency'] = time.perf_counter() - start
+        with self._lock:
+            self._status = status
+            self.probes += 1
+        self._probed.set()
+        return dict(status)
+
+    def refresh(self):
+        """Bir sonraki yoklamayı hemen yaptır (beklemeden döner)"""
+        self.start()
+        self._wake.set()
+
+    def status(self) -> Dict:
+        """
+        Son bilinen durum (ağı beklemez)
+
+        Returns:
+            {'ok': True/False/None (henüz yoklanmadı), 'models': [...],
+             'error': str/None, 'checked': epoch/None, 'latency': saniye/None}
+        """
+        self.start()
+        with self._lock:
+            return dict(self._status)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict:
+        """İlk yoklama bitene kadar bekle (CLI ve testler için)"""
+        self.start()
+        self._probed.wait(self.timeout + 1 if timeout is None else timeout)
+        return self.status()
+
+    def has_model(self, model: str) -> Optional[bool]:
+        """Model yüklü mü (durum bilinmiyorsa None; 'mistral' = 'mistral:latest')"""
+        status = self.status()
+        if not status['ok']:
+            return status['ok']
+        wanted = model if ':' in model else f'{model}:latest'
+        return any(name in (model, wanted) for name in status['models'])
+
+
+def get_monitor(url: str = "http://localhost:11434", ttl: Optional[float] = None) -> OllamaHealthMonitor:
+    """
+    URL için paylaşılan izleyici (ilk çağrıda oluşturulup başlatılır)
+
+    Args:
+        url: Ollama API URL
+        ttl: Yoklama aralığı (None = DEFAULT_TTL). İzleyici zaten varsa
+            daha kısa bir ttl uygulanır (en sık isteyen kazanır)
+    """
+    with _MONITORS_LOCK:
+        monitor = _MONITORS.get(url)
+        if monitor is None:
+            monitor = _MONITORS[url] = OllamaHealthMonitor(url, ttl=ttl or DEFAULT_TTL)
+        elif ttl is not None and ttl < monitor.ttl:
+            monitor.ttl = ttl
+            monitor.refresh()  # Uzun beklemedeki thread yeni aralığa geçsin
+    return monitor.start()
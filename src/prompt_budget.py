@@ -0,0 +1,181 @@
+"""
+Token Bütçeli Prompt Paketleme
+
+Önceden prompt (sistem + soru + chunk'ların tamamı + format şablonu)
+boyutu ölçülmeden birleştiriliyor ve her istekte num_ctx=2048
+gönderiliyordu: uzun chunk'larda bağlam sessizce taşıyor (Ollama
+prompt'un başını kesiyor), kısa prompt'larda ise gereksiz büyük KV
+önbelleği ayrılıyordu. Bu modül:
+
+    1. Token'ları önbellekli bir sayaçla sayar
+    2. Chunk'ları alaka sırasıyla bütçeye sığdırır; sığmayan son chunk'ı
+       cümle sınırında keser
+    3. num_ctx'i gerçek prompt + cevap uzunluğuna göre seçer (2'nin kuvveti)
+
+Sayaç: PROMPT_TOKENIZER ile bir HuggingFace tokenizer'ı (yerel dosyadan)
+verilirse onunla, yoksa Türkçe için temkinli bir tahminle sayar.
+"""
+
+import re
+import math
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Kelime parçaları ve noktalama (tahmini sayaç için)
+_PIECE_PATTERN = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+# Cümle sonu (., !, ? sonrası boşluk) veya satır sonu
+_SENTENCE_PATTERN = re.compile(r'(?<=[.!?…])\s+|\n+')
+# En küçük num_ctx; üstü 2'nin kuvvetlerine yuvarlanır. Ollama num_ctx
+# değişince modeli yeniden yükler, az sayıda sabit boyut bunu sınırlar.
+MIN_CONTEXT = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer'sız token tahmini
+
+    Türkçe eklemeli olduğu için LLM tokenizer'ları kelimeyi birkaç parçaya
+    böler; kelime/noktalama sayısı ile ~3 karakter/token'ın büyüğü alınır.
+    """
+    if not text:
+        return 0
+    return max(len(_PIECE_PATTERN.findall(text)), math.ceil(len(text) / 3))
+
+
+class TokenCounter:
+    """Önbellekli token sayacı (aynı chunk / sistem prompt'u tekrar sayılmaz)"""
+
+    def __init__(self, tokenizer_name: Optional[str] = None, cache_size: int = 4096):
+        """
+        Args:
+            tokenizer_name: HuggingFace tokenizer adı veya yolu (None = tahmin)
+            cache_size: Sayısı saklanacak metin sayısı
+        """
+        self.tokenizer_name = tokenizer_name
+        self._tokenizer = None
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+                # Offline çalışır: sadece yerel önbellekteki dosyalar
+                self._tokenizer = AutoTokenizer.from_pretrained(tokenizer_name, local_files_only=True)
+            except Exception as e:
+                print(f"⚠️  Tokenizer yüklenemedi ({tokenizer_name}): {e} — tahmini sayım kullanılacak")
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        """Metnin token sayısı"""
+        if self._tokenizer is None:
+            return estimate_tokens(text)
+        return len(self._tokenizer.encode(text, add_special_tokens=False))
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(tokenizer_name: Optional[str] = None) -> TokenCounter:
+    """Tokenizer başına paylaşılan sayaç (tokenizer bir kez yüklenir)"""
+    return TokenCounter(tokenizer_name)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Metni cümlelere böl (boş parçalar atılır)"""
+    return [s for s in _SENTENCE_PATTERN.split(text) if s.strip()]
+
+
+def truncate_to_budget(text: str, budget: int, count: Callable[[str], int]) -> str:
+    """
+    Metni bütçeye sığacak kadar baştan al (cümle sınırında)
+
+    İlk cümle bile sığmıyorsa kelime sınırında kesilir.
+
+    Args:
+        text: Metin
+        budget: Token bütçesi
+        count: Token sayma fonksiyonu
+
+    Returns:
+        Kısaltılmış metin (hiçbir şey sığmıyorsa boş)
+    """
+    if count(text) <= budget:
+        return text
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        cost = count(sentence + ' ')
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return ' '.join(kept)
+
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count(' '.join(words[:mid]) + ' …') <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return ' '.join(words[:low]) + ' …' if low else ''
+
+
+def pack_chunks(
+    chunks: Sequence[Dict],
+    budget: int,
+    count: Callable[[str], int],
+    format_chunk: Callable[[int, Dict, str], str],
+    min_tokens: int = 48
+) -> Tuple[List[str], int, bool]:
+    """
+    Chunk'ları alaka sırasıyla bütçeye yerleştir
+
+    Sığan chunk'lar tam eklenir; ilk sığmayan chunk en az `min_tokens`
+    yer kaldıysa cümle sınırında kısaltılarak eklenir, sonrakiler atlanır.
+
+    Args:
+        chunks: Alaka sırasıyla chunk'lar
+        budget: Chunk'lar için token bütçesi
+        count: Token sayma fonksiyonu
+        format_chunk: (sıra, chunk, metin) -> prompt'a girecek blok
+        min_tokens: Kısaltılmış chunk için gereken en az yer
+
+    Returns:
+        (bloklar, kullanılan token, son chunk kısaltıldı mı)
+    """
+    blocks = []
+    used = 0
+    truncated = False
+    for i, chunk in enumerate(chunks, 1):
+        block = format_chunk(i, chunk, chunk['text'])
+        cost = count(block)
+        if used + cost <= budget:
+            blocks.append(block)
+            used += cost
+            continue
+        overhead = count(format_chunk(i, chunk, ''))
+        remaining = budget - used - overhead
+        if remaining >= min_tokens:
+            text = truncate_to_budget(chunk['text'], remaining, count)
+            if text:
+                block = format_chunk(i, chunk, text)
+                blocks.append(block)
+                used += count(block)
+                truncated = True
+        break
+    return blocks, used, truncated
+
+
+def context_window(prompt_tokens: int, max_tokens: int, limit: int) -> int:
+    """
+    Prompt + cevap için gereken num_ctx (MIN_CONTEXT, 2048, 4096... kovaları)
+
+    Args:
+        prompt_tokens: Sistem + kullanıcı prompt'u token sayısı
+        max_tokens: En fazla üretilecek token (num_predict)
+        limit: Modelin / ayarın izin verdiği en büyük num_ctx
+    """
+    needed = prompt_tokens + max_tokens
+    size = MIN_CONTEXT
+    while size < needed:
+        size *= 2
+    return min(limit, size)
@@ -0,0 +1,122 @@
+"""
+Embedding Sıkıştırma (Skaler Kuantizasyon)
+
+VectorStore'daki normalize float32 embedding'leri daha az bellekle
+saklamak için iki mod:
+
+    float16 : Yarı hassasiyet, 2 bayt/boyut
+    int8    : Boyut başına ölçek + ofset ile 8-bit kod, 1 bayt/boyut
+
+Aday skorları sıkıştırılmış vektörler üzerinden hesaplanır; istenirse
+kısa liste diskteki tam hassasiyetli matrisle yeniden skorlanır.
+"""
+
+from typing import Optional
+import numpy as np
+
+
+QUANTIZATION_MODES = ('float16', 'int8')
+
+
+class ScalarQuantizer:
+    """float16 veya boyut başına ölçekli int8 kuantizasyon"""
+
+    def __init__(self, mode: str, block_size: int = 512):
+        """
+        Args:
+            mode: 'float16' veya 'int8'
+            block_size: Skorlamada bir seferde açılan satır sayısı
+                (küçük bloklar CPU önbelleğinde kalır)
+        """
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Bilinmeyen kuantizasyon modu: {mode} "
+                f"(geçerli: {', '.join(QUANTIZATION_MODES)})"
+            )
+        self.mode = mode
+        self.block_size = block_size
+        self.offset: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    def fit(self, embeddings: np.ndarray) -> 'ScalarQuantizer':
+        """
+        int8 için boyut başına min/max aralığını öğren
+
+        Args:
+            embeddings: Normalize float32 embedding matrisi
+        """
+        if self.mode == 'int8' and len(embeddings):
+            lo = np.min(embeddings, axis=0).astype(np.float32)
+            hi = np.max(embeddings, axis=0).astype(np.float32)
+            scale = (hi - lo) / 255.0
+            scale[scale == 0] = 1.0  # Sabit boyutlarda bölme hatasını önle
+            self.offset, self.scale = lo, scale
+        return self
+
+    def encode(self, embeddings: np.ndarray) -> np.ndarray:
+        """Embedding'leri sıkıştırılmış koda çevir"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.mode == 'float16':
+            return embeddings.astype(np.float16)
+
+        if self.offset is None:
+            self.fit(embeddings)
+        codes = np.rint((embeddings - self.offset) / self.scale)
+        # Sonradan eklenen vektörler öğrenilen aralığın dışına taşabilir
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Kodları yaklaşık float32 vektörlere geri çevir"""
+        if self.mode == 'float16':
+            return np.asarray(codes, dtype=np.float32)
+        return np.asarray(codes, dtype=np.float32) * self.scale + self.offset
+
+    def scores(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """
+        Sıkıştırılmış vektörlerle yaklaşık iç çarpım skorları
+
+        int8 için: q·x ≈ q·offset + (q*scale)·code, böylece kodlar
+        float'a çözülmeden sadece blok blok float32'ye yükseltilir.
+
+        Args:
+            codes: Kod matrisi (n x dim)
+            queries: Normalize sorgu vektörü (dim) veya matrisi (m x dim)
+
+        Returns:
+            Skorlar (n) veya (m x n)
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+
+        if self.mode == 'int8':
+            weights = queries * self.scale
+            bias = queries @ self.offset
+        else:
+            weights, bias = queries, 0.0
+
+        out = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), self.block_size):
+            block = np.asarray(codes[start:start + self.block_size], dtype=np.float32)
+            out[:, start:start + len(block)] = weights @ block.T
+        if self.mode == 'int8':
+            out += bias[:, None]
+
+        return out[0] if single else out
+
+    def state(self) -> dict:
+        """Kaydetmek için parametreler"""
+        state = {'mode': np.array(self.mode)}
+        if self.offset is not None:
+            state['offset'] = self.offset
+            state['scale'] = self.scale
+        return state
+
+    @classmethod
+    def from_state(cls, state) -> 'ScalarQuantizer':
+        """Kaydedilmiş parametrelerden oluştur"""
+        quantizer = cls(str(state['mode']))
+        if 'offset' in state:
+            quantizer.offset = np.asarray(state['offset'], dtype=np.float32)
+            quantizer.scale = np.asarray(state['scale'], dtype=np.float32)
+        return quantizer
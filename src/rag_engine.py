@@ -4,26 +4,69 @@ RAG (Retrieval-Augmented Generation) Motoru
 Bu modül, vektör veritabanı kullanarak doküman chunk'larını saklar,
 sorgu embedding'i oluşturur, en yakın chunk'ları bulur ve
 Ollama ile cevap üretir.
+
+sentence_transformers (torch) ve ollama modülleri ağır olduğu için
+ilk kullanıldıkları yerde import edilir; embedding modeli ve Ollama
+istemcisi de RAGEngine'de ilk gerçek ihtiyaçta oluşturulur.
 """
 
 import os
-import pickle
-from typing import List, Dict, Optional
+import re
+import sys
+import time
+import asyncio
+import shutil
+import threading
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import ollama
+
+# Proje kökünü path'e ekle (doğrudan çalıştırıldığında da çalışsın)
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.embedding_backends import cache_key, check_backend
+from src.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from src.lexical_index import BM25Index, is_exact_term_query, reciprocal_rank_fusion
+from src.llm_scheduler import PRIORITY_LOW, PRIORITY_NORMAL, priority_for_fault
+from src.metadata_index import MetadataIndex
+from src.prompt_budget import context_window, get_token_counter, pack_chunks
+from src.quantization import ScalarQuantizer
+from src.response_cache import ResponseCache, request_key, vector_db_fingerprint
+from src.vector_index import create_index, load_index, top_k_indices
+from src.vector_storage import (
+    INDEX_FILE,
+    EmbeddingBuffer,
+    LazyChunkList,
+    is_directory_store,
+    load_directory,
+    load_lexical,
+    load_metadata,
+    load_quantized,
+    read_legacy_pickle,
+    save_directory,
+    save_lexical,
+    save_metadata,
+    save_quantized,
+)
 
 
 class Embedder:
     """Metin embedding oluşturma"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", backend: str = 'torch'):
         """
         Args:
             model_name: Sentence-transformers model adı
+            backend: 'torch', 'onnx' veya 'onnx-int8' (bkz. embedding_backends)
         """
-        print(f"🤖 Embedding modeli yükleniyor: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        from src.embedding_backends import load_sentence_model
+        
+        print(f"🤖 Embedding modeli yükleniyor: {model_name} ({backend})")
+        self.model_name = model_name
+        self.backend = backend
+        self.model = load_sentence_model(model_name, backend)
         print("   ✓ Model yüklendi")
     
     def encode(self, texts: List[str]) -> np.ndarray:
@@ -41,20 +84,82 @@ class Embedder:
     def encode_single(self, text: str) -> np.ndarray:
         """Tek bir metni embedding'e çevir"""
         return self.model.encode([text])[0]
+    
+    def encode_corpus(self, texts: List[str], batch_size: int = 32, workers: int = 1) -> np.ndarray:
+        """
+        Training için toplu encode: uzunluk kovaları + process havuzu
+        
+        Benzer uzunluktaki chunk'lar aynı batch'e düşer (daha az padding);
+        workers > 1 ise batch'ler işçi process'lere dağıtılır.
+        
+        Args:
+            texts: Metin listesi
+            batch_size: Batch başına metin sayısı
+            workers: İşçi process sayısı (0 = çekirdek sayısı)
+        
+        Returns:
+            Embedding matrisi (girdi sırasıyla)
+        """
+        from src.embedding_pipeline import default_workers, encode_bucketed, token_lengths
+        
+        return encode_bucketed(
+            texts,
+            token_lengths(self.model, texts),
+            lambda batch: self.model.encode(batch, batch_size=len(batch), show_progress_bar=False),
+            batch_size=batch_size,
+            model_name=self.model_name,
+            backend=self.backend,
+            workers=workers or default_workers()
+        )
 
 
 class VectorStore:
     """FAISS tabanlı vektör veritabanı (basitleştirilmiş)"""
     
-    def __init__(self, embedding_dim: int = 384):
+    # ANN indeksi varken filtreye uyan aday sayısı bunun altındaysa
+    # adaylar doğrudan (tam) skorlanır
+    FILTER_EXACT_LIMIT = 50000
+    
+    def __init__(
+        self,
+        embedding_dim: int = 384,
+        index_type: Optional[str] = None,
+        index_params: Optional[Dict] = None,
+        quantization: Optional[str] = None,
+        rescore: bool = True,
+        rescore_factor: int = 4,
+        compaction_threshold: float = 0.25
+    ):
         """
         Args:
             embedding_dim: Embedding boyutu (all-MiniLM-L6-v2 için 384)
+            index_type: 'flat' (tam arama), 'ivf' veya 'hnsw'. None ise kayıtlı
+                DB'deki tip kullanılır, yoksa 'flat'
+            index_params: ANN indeks parametreleri (örn: {'nprobe': 16})
+            quantization: Flat aramada skorlanan matrisin saklama tipi:
+                'float32', 'float16' veya 'int8'. None ise kayıtlı DB'deki
+            rescore: Sıkıştırılmış skorlardan çıkan kısa listeyi tam
+                hassasiyetle yeniden skorla
+            rescore_factor: Kısa liste boyutu = top_k * rescore_factor
+            compaction_threshold: Silinmiş chunk oranı bu değeri aşınca
+                matris ve indeks sıkıştırılır
         """
         self.embedding_dim = embedding_dim
-        self.embeddings = []
+        self._buffer = EmbeddingBuffer(embedding_dim)
         self.chunks = []
         self.index_built = False
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.index = None
+        self.quantization = quantization
+        self.rescore = rescore
+        self.rescore_factor = rescore_factor
+        self.quantizer = None
+        self._codes = None
+        self.compaction_threshold = compaction_threshold
+        self.metadata = MetadataIndex()
+        self.lexical = BM25Index()
+        self._reset_deleted()
     
     def add_documents(self, chunks: List[Dict], embeddings: np.ndarray):
         """
@@ -67,24 +172,338 @@ class VectorStore:
         if len(chunks) != len(embeddings):
             raise ValueError("Chunk sayısı embedding sayısına eşit olmalı")
         
+        # BM25 indeksi güncelse yeni chunk'lar hemen eklenir (eski DB'lerde
+        # ilk sözcüksel aramada topluca oluşturulur)
+        if len(self.lexical) == len(self.chunks):
+            self.lexical.add(chunks, len(self.chunks))
+        
+        # Yeni satırlar eklenirken normalize edilir; mevcut veri kopyalanmaz
         self.chunks.extend(chunks)
-        self.embeddings.append(embeddings)
+        self._buffer.append(self._normalize(embeddings))
         self.index_built = False
     
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Normalize embedding matrisi (tampondaki dolu satırların görünümü)"""
+        return self._buffer.array
+    
+    @embeddings.setter
+    def embeddings(self, matrix: np.ndarray):
+        self._buffer = EmbeddingBuffer.from_array(np.asanyarray(matrix, dtype=np.float32))
+    
+    @property
+    def deleted_count(self) -> int:
+        """Silinmiş ama henüz sıkıştırılmamış chunk sayısı"""
+        return len(self._deleted_ids)
+    
+    @property
+    def live_count(self) -> int:
+        """Canlı (silinmemiş) chunk sayısı"""
+        return len(self.chunks) - self.deleted_count
+    
+    @property
+    def codes(self) -> Optional[np.ndarray]:
+        """Sıkıştırılmış embedding kopyası (kuantizasyon kapalıysa None)"""
+        return self._codes.array if self._codes is not None else None
+    
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """
+        Satırları birim uzunluğa getir (float32)
+        
+        Args:
+            matrix: Embedding matrisi (n x dim) veya tek vektör
+        
+        Returns:
+            L2 normalize edilmiş float32 kopya
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0  # Sıfır vektörde bölme hatasını önle
+        return matrix / norms
+    
+    def _reset_deleted(self):
+        """Tombstone maskesini sıfırla"""
+        self._deleted = None  # Silinmiş satır maskesi (tombstone)
+        self._deleted_ids = np.empty(0, dtype=np.int64)
+    
+    def _metadata_index(self) -> MetadataIndex:
+        """
+        Güncel metadata indeksi
+        
+        Sadece henüz indekslenmemiş (yeni eklenen) chunk'lar işlenir; kayıtlı
+        indeksi olmayan eski DB'lerde ilk çağrıda chunk'lar bir kez taranır.
+        """
+        indexed = len(self.metadata)
+        if indexed == 0:
+            self.metadata.add(self.chunks, 0)
+        elif indexed < len(self.chunks):
+            self.metadata.add(
+                (self.chunks[i] for i in range(indexed, len(self.chunks))), indexed
+            )
+        return self.metadata
+    
+    def _lexical_index(self) -> BM25Index:
+        """Güncel BM25 indeksi (eksik chunk'lar varsa eklenir)"""
+        indexed = len(self.lexical)
+        if indexed == 0:
+            self.lexical.add(self.chunks, 0)
+        elif indexed < len(self.chunks):
+            self.lexical.add(
+                (self.chunks[i] for i in range(indexed, len(self.chunks))), indexed
+            )
+        return self.lexical
+    
+    def sources(self) -> List[str]:
+        """Vektör DB'deki (silinmemiş) kaynak dosyalar"""
+        return sorted(self._metadata_index().values('source'))
+    
+    def delete_source(self, source: str) -> int:
+        """
+        Bir kaynağa ait tüm chunk'ları sil
+        
+        Satırlar hemen taşınmaz, tombstone maskesiyle işaretlenir ve
+        aramada atlanır. Silinmiş oran compaction_threshold'u aşınca
+        compact() çağrılır.
+        
+        Args:
+            source: Kaynak dosya adı (chunk'lardaki 'source' alanı)
+        
+        Returns:
+            Silinen chunk sayısı
+        """
+        ids = self._metadata_index().pop('source', source)
+        if not ids:
+            return 0
+        
+        if self._deleted is None or len(self._deleted) < len(self.chunks):
+            mask = np.zeros(len(self.chunks), dtype=bool)
+            if self._deleted is not None:
+                mask[:len(self._deleted)] = self._deleted
+            self._deleted = mask
+        self._deleted[ids] = True
+        self._deleted_ids = np.flatnonzero(self._deleted)
+        print(f"🗑️  {source}: {len(ids)} chunk silindi")
+        
+        if self.deleted_count > self.compaction_threshold * len(self.chunks):
+            self.compact()
+        return len(ids)
+    
+    def replace_source(self, source: str, chunks: List[Dict], embeddings: np.ndarray):
+        """
+        Bir kaynağın chunk'larını yenileriyle değiştir
+        
+        Sadece bu kaynağın satırları silinir ve yenileri eklenir; diğer
+        dokümanların embedding'leri yeniden hesaplanmaz.
+        
+        Args:
+            source: Kaynak dosya adı
+            chunks: Yeni chunk metadata listesi
+            embeddings: Yeni chunk embedding'leri
+        """
+        self.delete_source(source)
+        self.add_documents(chunks, embeddings)
+        self.build_index()
+    
+    def compact(self):
+        """
+        Silinmiş satırları fiziksel olarak çıkar
+        
+        Embedding matrisi, chunk listesi, sıkıştırılmış kopya ve ANN indeksi
+        sadece canlı satırlarla yeniden yazılır.
+        """
+        if self.deleted_count == 0:
+            return
+        
+        keep = np.ones(len(self.chunks), dtype=bool)
+        keep[self._deleted_ids] = False
+        removed = self.deleted_count
+        
+        old_chunks = self.chunks
+        self.chunks = [chunk for chunk, alive in zip(old_chunks, keep) if alive]
+        self.embeddings = np.asarray(self.embeddings)[keep]
+        if isinstance(old_chunks, LazyChunkList):
+            old_chunks.close()  # Kalan chunk'lar bellekte; eski dosya bırakılır
+        if self._codes is not None:
+            if len(self._codes) == len(keep):
+                self._codes = EmbeddingBuffer.from_array(self.codes[keep])
+            else:
+                self._codes = None  # Eksik kopya build_index'te yeniden oluşur
+        if self.index is not None:
+            if len(self.index) == len(keep):
+                self.index.compact(self.embeddings, keep)
+            else:
+                self._build_ann_index()
+        if len(self.metadata) == len(keep):
+            self.metadata.compact(keep)
+        else:
+            self.metadata = MetadataIndex()
+        if len(self.lexical) == len(keep):
+            self.lexical.compact(keep)
+        else:
+            self.lexical = BM25Index()
+        
+        self._reset_deleted()
+        print(f"🧹 Vektör DB sıkıştırıldı: {removed} silinmiş chunk çıkarıldı")
+    
     def build_index(self):
-        """Embedding matrisini oluştur"""
-        if self.embeddings:
-            self.embeddings = np.vstack(self.embeddings)
-            self.index_built = True
-            print(f"✓ Vektör indeksi oluşturuldu: {len(self.chunks)} chunk")
+        """
+        Arama yapılarını güncelle
+        
+        Embedding'ler eklenirken normalize edildiği için burada sadece
+        sıkıştırılmış kopya ve ANN indeksi yeni satırlarla güncellenir.
+        """
+        if len(self.embeddings) == 0:
+            return
+        
+        self._build_quantized()
+        
+        # Mevcut ANN indeksine sadece yeni satırlar eklenir (tam yeniden kurulum yok)
+        if self.index is not None and self.index.index_type == self.index_type:
+            self.index.add(self.embeddings, start_id=len(self.index))
+        else:
+            self._build_ann_index()
+        self.index_built = True
+        print(f"✓ Vektör indeksi oluşturuldu: {len(self.chunks)} chunk")
+    
+    def _build_ann_index(self):
+        """Seçili tip flat değilse ANN indeksini embedding'lerden oluştur"""
+        if (self.index_type or 'flat') == 'flat':
+            self.index = None
+            return
+        self.index = create_index(self.index_type, **self.index_params)
+        self.index.build(self.embeddings)
+    
+    def _build_quantized(self):
+        """Seçili moda göre sıkıştırılmış kopyayı oluştur (yeni satırlar artımlı)"""
+        mode = self.quantization or 'float32'
+        if mode == 'float32':
+            self.quantizer = None
+            self._codes = None
+            return
+        
+        if self.quantizer is None or self.quantizer.mode != mode or self._codes is None:
+            self.quantizer = ScalarQuantizer(mode).fit(self.embeddings)
+            self._codes = EmbeddingBuffer.from_array(self.quantizer.encode(self.embeddings))
+        elif len(self._codes) < len(self.embeddings):
+            self._codes.append(self.quantizer.encode(self.embeddings[len(self._codes):]))
+    
+    def _flat_scores(self, query_norms: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Chunk skorları (sıkıştırılmış kopya varsa onun üzerinden)
+        
+        Args:
+            query_norms: Normalize sorgu vektörü veya matrisi
+            ids: Sadece bu satırları skorla (None ise tümü)
+        """
+        if self.codes is not None:
+            codes = self.codes if ids is None else self.codes[ids]
+            return self.quantizer.scores(codes, query_norms)
+        embeddings = self.embeddings if ids is None else np.asarray(self.embeddings[ids])
+        return query_norms @ embeddings.T
     
-    def search(self, query_embedding: np.ndarray, top_k: int = 3) -> List[Dict]:
+    def _flat_top_k(
+        self,
+        scores: np.ndarray,
+        query_norm: np.ndarray,
+        top_k: int,
+        ids: Optional[np.ndarray] = None
+    ):
+        """
+        Skorlardan ilk top_k'yı seç
+        
+        Silinmiş satırlar atlanır. Sıkıştırılmış skorlarda kısa liste,
+        diskteki/bellekteki float32 matrisle yeniden skorlanır (sadece
+        shortlist satırları okunur).
+        
+        Args:
+            ids: Skorlar bir aday alt kümesine aitse satır indeksleri
+                (silinmişler önceden çıkarılmış olmalı)
+        """
+        if ids is None and self.deleted_count:
+            scores[self._deleted_ids] = -np.inf
+            top_k = min(top_k, self.live_count)
+        
+        if self.codes is None or not self.rescore:
+            top_indices = top_k_indices(scores, top_k)
+            rows = top_indices if ids is None else ids[top_indices]
+            return rows, scores[top_indices]
+        
+        shortlist = top_k_indices(scores, top_k * self.rescore_factor)
+        shortlist = shortlist[np.isfinite(scores[shortlist])]  # silinmişler hariç
+        shortlist.sort()  # mmap'li matriste sıralı okuma
+        rows = shortlist if ids is None else ids[shortlist]
+        exact = np.asarray(self.embeddings[rows]) @ query_norm
+        best = top_k_indices(exact, top_k)
+        return rows[best], exact[best]
+    
+    def _filter_candidates(self, filters: Optional[Dict]) -> Optional[np.ndarray]:
+        """
+        Filtrelere uyan canlı satırlar (posting listelerinden, tarama yok)
+        
+        Returns:
+            Artan sıralı satır indeksleri veya filtre yoksa None
+        """
+        if not filters:
+            return None
+        ids = self._metadata_index().select(filters)
+        if self.deleted_count:
+            ids = np.setdiff1d(ids, self._deleted_ids, assume_unique=True)
+        return ids
+    
+    def _search_normalized(
+        self,
+        query_norm: np.ndarray,
+        top_k: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """Normalize edilmiş tek sorgu için arama (aday kümesi opsiyonel)"""
+        # Seçici filtrelerde adaylar doğrudan skorlanır
+        if candidates is not None and (
+            self.index is None or len(candidates) <= self.FILTER_EXACT_LIMIT
+        ):
+            scores = self._flat_scores(query_norm, candidates)
+            indices, scores = self._flat_top_k(scores, query_norm, top_k, ids=candidates)
+            return self._build_results(indices, scores)
+        
+        # ANN indeksi varsa sadece aday kümeler/graf komşuları skorlanır
+        if self.index is not None:
+            if candidates is not None:
+                exclude = np.ones(len(self.embeddings), dtype=bool)
+                exclude[candidates] = False
+            else:
+                exclude = self._deleted if self.deleted_count else None
+            indices, scores = self.index.search(
+                self.embeddings, query_norm, top_k, exclude=exclude
+            )
+            return self._build_results(indices, scores)
+        
+        # Cosine similarity = normalize vektörlerin iç çarpımı
+        similarities = self._flat_scores(query_norm)
+        
+        # En yüksek skorları al (tam sıralama yerine kısmi seçim)
+        top_indices, scores = self._flat_top_k(similarities, query_norm, top_k)
+        
+        return self._build_results(top_indices, scores)
+    
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
         """
         En yakın chunk'ları bul (cosine similarity)
         
+        Matris build/load sırasında normalize edildiği için sorgu başına
+        tek bir matris-vektör çarpımı ve argpartition yeterlidir.
+        
         Args:
             query_embedding: Sorgu embedding'i
             top_k: Kaç sonuç döndürülecek
+            filters: Metadata filtreleri, skorlamadan önce uygulanır
+                (örn: {'generator_id': 'caterpillar_3406'},
+                {'source': ['a.pdf', 'b.pdf'], 'page': 12})
         
         Returns:
             En yakın chunk'lar
@@ -92,88 +511,507 @@ class VectorStore:
         if not self.index_built:
             self.build_index()
         
-        if len(self.chunks) == 0:
+        if self.live_count == 0 or top_k <= 0:
             return []
         
-        # Cosine similarity hesapla
-        query_norm = query_embedding / np.linalg.norm(query_embedding)
-        embeddings_norm = self.embeddings / np.linalg.norm(
-            self.embeddings, axis=1, keepdims=True
-        )
+        candidates = self._filter_candidates(filters)
+        if candidates is not None and len(candidates) == 0:
+            return []
         
-        similarities = np.dot(embeddings_norm, query_norm)
+        return self._search_normalized(self._normalize(query_embedding), top_k, candidates)
+    
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 3,
+        filters: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        Birden fazla sorgu için en yakın chunk'ları bul
+        
+        Tüm sorgular tek bir matris-matris çarpımıyla skorlanır.
+        
+        Args:
+            query_embeddings: Sorgu embedding matrisi (n_queries x embedding_dim)
+            top_k: Her sorgu için kaç sonuç döndürülecek
+            filters: Tüm sorgulara uygulanacak metadata filtreleri
+        
+        Returns:
+            Sorgu başına en yakın chunk listeleri (girdi sırasıyla)
+        """
+        if not self.index_built:
+            self.build_index()
+        
+        query_embeddings = np.atleast_2d(query_embeddings)
+        if self.live_count == 0 or top_k <= 0:
+            return [[] for _ in range(len(query_embeddings))]
+        
+        candidates = self._filter_candidates(filters)
+        if candidates is not None and len(candidates) == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        
+        query_norms = self._normalize(query_embeddings)
+        
+        # ANN indeksleri sorgu başına aday seçer
+        if self.index is not None and (
+            candidates is None or len(candidates) > self.FILTER_EXACT_LIMIT
+        ):
+            return [self._search_normalized(q, top_k, candidates) for q in query_norms]
+        
+        # (n_queries x dim) @ (dim x n_chunks) -> (n_queries x n_chunks)
+        similarities = self._flat_scores(query_norms, candidates)
+        
+        results = []
+        for row, query_norm in zip(similarities, query_norms):
+            top_indices, scores = self._flat_top_k(row, query_norm, top_k, ids=candidates)
+            results.append(self._build_results(top_indices, scores))
+        return results
+    
+    def lexical_search(
+        self,
+        query: str,
+        top_k: int = 3,
+        filters: Optional[Dict] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """
+        BM25 ile birebir terim araması (parça no, arıza kodu, tork değeri)
+        
+        Sadece sorgu terimlerini içeren chunk'lar skorlanır; embedding
+        hesaplanması gerekmez.
+        
+        Args:
+            query: Sorgu metni
+            top_k: Kaç sonuç döndürülecek
+            filters: Metadata filtreleri (bkz. search)
+            query_embedding: Verilirse 'similarity' sonuç satırları için
+                cosine olarak hesaplanır; yoksa None (skor sadece 'bm25')
+        
+        Returns:
+            'bm25' ve 'similarity' alanlı chunk'lar
+        """
+        if self.live_count == 0 or top_k <= 0:
+            return []
+        candidates = self._filter_candidates(filters)
+        if candidates is not None and len(candidates) == 0:
+            return []
         
-        # En yüksek skorları al
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        exclude = self._deleted if self.deleted_count else None
+        indices, bm25 = self._lexical_index().search(query, top_k, candidates, exclude)
+        if len(indices) == 0:
+            return []
+        
+        if query_embedding is not None:
+            similarity = np.asarray(self.embeddings[indices]) @ self._normalize(query_embedding)
+        else:
+            similarity = bm25
+        results = self._build_results(indices, similarity)
+        for result, score in zip(results, bm25):
+            result['bm25'] = float(score)
+            if query_embedding is None:
+                result['similarity'] = None  # BM25 skoru cosine gibi gösterilmesin
+        return results
+    
+    def hybrid_search(
+        self,
+        query_embedding: np.ndarray,
+        query: str,
+        top_k: int = 3,
+        filters: Optional[Dict] = None,
+        depth: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Yoğun (embedding) ve BM25 sonuçlarını reciprocal-rank fusion ile birleştir
         
+        Args:
+            query_embedding: Sorgu embedding'i
+            query: Sorgu metni (BM25 için)
+            top_k: Kaç sonuç döndürülecek
+            filters: Metadata filtreleri (bkz. search)
+            depth: Her listeden alınacak aday sayısı (None ise max(4*top_k, 20))
+        
+        Returns:
+            'rrf_score' alanlı birleşik chunk listesi
+        """
+        depth = depth or max(4 * top_k, 20)
+        dense = self.search(query_embedding, top_k=depth, filters=filters)
+        lexical = self.lexical_search(query, top_k=depth, filters=filters,
+                                      query_embedding=query_embedding)
+        return reciprocal_rank_fusion([dense, lexical], top_k)
+    
+    def _build_results(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        """İndeksler ve onlara karşılık gelen skorlardan sonuç listesi oluştur"""
         results = []
-        for idx in top_indices:
+        for idx, score in zip(indices, scores):
             result = self.chunks[idx].copy()
-            result['similarity'] = float(similarities[idx])
+            result['similarity'] = float(score)
             results.append(result)
-        
         return results
     
     def save(self, path: str):
-        """Vektör DB'yi kaydet"""
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        """
+        Vektör DB'yi klasör formatında kaydet
         
-        data = {
-            'embeddings': self.embeddings,
-            'chunks': self.chunks,
-            'embedding_dim': self.embedding_dim
-        }
+        Args:
+            path: Vektör DB klasörü (embeddings.npy + chunks.jsonl + meta.json)
+        """
+        if not self.index_built:
+            self.build_index()
+        
+        # Silinmiş satırlar diske yazılmaz
+        self.compact()
+        
+        # Aynı klasöre tekrar yazarken mmap'li dosyaları bellekten oku
+        embeddings = np.array(self.embeddings, dtype=np.float32)
+        chunks = self.chunks
+        if isinstance(chunks, LazyChunkList):
+            # Açık chunk dosyası ve embedding mmap'i yazmadan önce bırakılır
+            # (Windows açık dosyanın üzerine os.replace yapamaz)
+            chunks = list(chunks)
+            self.close()
+            self.chunks, self.embeddings = chunks, embeddings
         
-        with open(path, 'wb') as f:
-            pickle.dump(data, f)
+        save_directory(
+            path, embeddings, chunks, self.embedding_dim,
+            extra_meta={
+                'index_type': self.index_type or 'flat',
+                'index_params': self.index_params,
+                'quantization': self.quantization or 'float32',
+            }
+        )
+        if self.index is not None:
+            self.index.save(os.path.join(path, INDEX_FILE))
+        if self.codes is not None:
+            save_quantized(path, self.codes, self.quantizer.state())
+        save_metadata(path, self._metadata_index().state())
+        save_lexical(path, self._lexical_index().state())
+        
+        # Bellekteki kopyalar yerine kaydedilen dosyalar (load ile aynı: mmap + tembel chunk'lar)
+        data = load_directory(path)
+        self.embeddings = data['embeddings']
+        self.chunks = data['chunks']
         
         print(f"💾 Vektör DB kaydedildi: {path}")
     
+    def close(self):
+        """
+        Diskteki chunk dosyasını ve embedding mmap'ini bırak
+        
+        Windows'ta açık/mmap'li dosyalar silinemez ve üzerine yazılamaz;
+        DB'yi silmeden veya başka bir store ile kaydetmeden önce çağrılır.
+        Kapatılan store'dan diskteki chunk'lar okunamaz.
+        """
+        if isinstance(self.chunks, LazyChunkList):
+            self.chunks.close()
+        if isinstance(self.embeddings, np.memmap):
+            self.embeddings = np.empty((0, self.embedding_dim), dtype=np.float32)
+    
     def load(self, path: str):
-        """Vektör DB'yi yükle"""
+        """
+        Vektör DB'yi yükle
+        
+        Klasör formatında embedding matrisi mmap ile açılır, chunk'lar
+        yalnızca erişildiğinde diskten okunur. Eski tek dosyalık pickle
+        formatı da okunabilir (bkz. convert_legacy_pickle).
+        
+        Args:
+            path: Vektör DB klasörü veya eski vectordb.pkl dosyası
+        """
         if not os.path.exists(path):
             raise FileNotFoundError(f"Vektör DB bulunamadı: {path}")
         
-        with open(path, 'rb') as f:
-            data = pickle.load(f)
+        if is_directory_store(path):
+            data = load_directory(path)
+            meta = data['meta']
+            self.embeddings = data['embeddings']
+            self.chunks = data['chunks']
+            self.embedding_dim = meta['embedding_dim']
+            self._reset_deleted()
+            
+            # Kayıtlı posting listeleri yoksa ilk filtreli aramada oluşturulur
+            metadata = load_metadata(path)
+            if metadata is not None and int(metadata['size']) == len(self.chunks):
+                self.metadata = MetadataIndex.from_state(metadata)
+            else:
+                self.metadata = MetadataIndex()
+            lexical = load_lexical(path)
+            if lexical is not None and len(lexical['doc_len']) == len(self.chunks):
+                self.lexical = BM25Index.from_state(lexical)
+            else:
+                self.lexical = BM25Index()
+            
+            # Kayıtlı indeks istenen tiple uyuşuyorsa yeniden eğitme
+            saved_type = meta.get('index_type', 'flat')
+            if self.index_type is None:
+                self.index_type = saved_type
+                self.index_params = meta.get('index_params') or self.index_params
+            index_path = os.path.join(path, INDEX_FILE)
+            if self.index_type == saved_type != 'flat' and os.path.isfile(index_path):
+                self.index = load_index(self.index_type, index_path, **self.index_params)
+            else:
+                self._build_ann_index()
+            
+            # Sıkıştırılmış kopya RAM'e, float32 matris mmap olarak kalır
+            saved_quantization = meta.get('quantization', 'float32')
+            if self.quantization is None:
+                self.quantization = saved_quantization
+            codes, state = load_quantized(path)
+            if self.quantization == saved_quantization and codes is not None:
+                self._codes = EmbeddingBuffer.from_array(codes)
+                self.quantizer = ScalarQuantizer.from_state(state)
+            else:
+                self._build_quantized()
+        else:
+            data = read_legacy_pickle(path)
+            
+            # Eski kayıtlar normalize edilmemiş olabilir
+            if data.get('normalized'):
+                self.embeddings = np.asarray(data['embeddings'], dtype=np.float32)
+            else:
+                self.embeddings = self._normalize(data['embeddings'])
+            self.chunks = data['chunks']
+            self.embedding_dim = data['embedding_dim']
+            self.metadata = MetadataIndex()
+            self.lexical = BM25Index()
+            self._reset_deleted()
+            self._build_ann_index()
+            self._build_quantized()
         
-        self.embeddings = data['embeddings']
-        self.chunks = data['chunks']
-        self.embedding_dim = data['embedding_dim']
         self.index_built = True
         
         print(f"✓ Vektör DB yüklendi: {len(self.chunks)} chunk")
 
 
+def build_messages(prompt: str, system: str = "") -> List[Dict]:
+    """Ollama chat mesaj listesi"""
+    messages = []
+    
+    if system:
+        messages.append({
+            'role': 'system',
+            'content': system
+        })
+    
+    messages.append({
+        'role': 'user',
+        'content': prompt
+    })
+    return messages
+
+
+def generation_options(temperature: float, top_p: float, max_tokens: int, num_ctx: int = 2048) -> Dict:
+    """Ollama üretim ayarları (num_ctx: prompt + cevap için context window)"""
+    return {
+        'temperature': temperature,
+        'top_p': top_p,
+        'num_predict': max_tokens,
+        'num_ctx': num_ctx,
+    }
+
+
+# Chat şablonunun rol/ayraç token'ları için mesaj başına pay (2 mesaj)
+MESSAGE_OVERHEAD_TOKENS = 16
+# Bu süreden uzun model yüklemesi olan istek "soğuk" sayılır (saniye)
+COLD_LOAD_SECONDS = 0.5
+
+
+def keep_alive_value(value: Optional[str]):
+    """
+    OLLAMA_KEEP_ALIVE değeri: '30m', '2h' gibi süreler aynen, sayılar
+    saniye olarak (-1 = model hiç boşaltılmaz); boş = Ollama varsayılanı (5m)
+    """
+    if value is None or not str(value).strip():
+        return None
+    value = str(value).strip()
+    if re.fullmatch(r'-?\d+(\.\d+)?', value):
+        return float(value)
+    return value
+
+
+def training_settings(default_workers: int = 1) -> Dict:
+    """
+    Training ayarları (.env / ortam değişkenleri)
+
+    scripts/train_rag.py ve web arayüzünün Training sayfası aynı ayarlarla
+    aynı vektör DB'yi üretsin diye tek yerden okunur.
+
+    Args:
+        default_workers: EMBEDDING_WORKERS boşsa encode işçi sayısı. Web
+            arayüzü sunucuyu paylaştığı için 1; train_rag.py 0 (çekirdek sayısı)
+
+    Returns:
+        Klasör/chunk/parçalama ayarları ve 'engine' altında RAGEngine parametreleri
+    """
+    index_type = os.getenv('VECTOR_INDEX_TYPE', 'flat')
+    index_params = {
+        'ivf': {'nprobe': int(os.getenv('IVF_NPROBE', '8'))},
+        'hnsw': {'M': int(os.getenv('HNSW_M', '16')), 'ef_search': int(os.getenv('HNSW_EF_SEARCH', '50'))},
+    }.get(index_type)
+    return {
+        'manuals_folder': os.getenv('MANUALS_FOLDER', 'dokumanlar/manueller'),
+        'vector_db_path': os.getenv('VECTOR_DB_PATH', './data/vector_store/vectordb'),
+        'chunk_size': int(os.getenv('CHUNK_SIZE', '800')),
+        'chunk_overlap': int(os.getenv('CHUNK_OVERLAP', '200')),
+        'shard_by': os.getenv('VECTOR_SHARD_BY', '') or None,
+        'engine': {
+            'embedding_model': os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2'),
+            'embedding_backend': os.getenv('EMBEDDING_BACKEND', 'torch'),
+            'index_type': index_type,
+            'index_params': index_params,
+            'quantization': os.getenv('EMBEDDING_QUANTIZATION', 'float32'),
+            'embedding_cache_path': os.getenv('EMBEDDING_CACHE_PATH', './data/embedding_cache.sqlite') or None,
+            'embedding_batch_size': int(os.getenv('EMBEDDING_BATCH_SIZE', '32')),
+            'embedding_workers': int(os.getenv('EMBEDDING_WORKERS', '') or default_workers),
+        },
+    }
+
+
+def load_seconds(part) -> Optional[float]:
+    """Ollama cevabındaki model yükleme süresi (load_duration, ns -> s)"""
+    try:
+        duration = part.get('load_duration')
+    except AttributeError:
+        return None
+    return duration / 1e9 if duration else None
+
+
+def median(values) -> Optional[float]:
+    """Ortanca (boşsa None)"""
+    values = sorted(values)
+    if not values:
+        return None
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def ollama_error_message(model: str, e: Exception) -> str:
+    """Ollama hatası için kullanıcıya gösterilecek mesaj"""
+    error_msg = str(e)
+    if "404" in error_msg or "not found" in error_msg:
+        return (f"Ollama hatası: model '{model}' not found (status code: 404)\n\n"
+               f"Model indirmek için terminalde çalıştırın:\n"
+               f"  ollama pull {model}\n\n"
+               f"Veya farklı bir model kullanın (llama3.2:3b, gemma2:9b vb.)")
+    if "exit status 2" in error_msg or "terminated" in error_msg:
+        return (f"⚠️ Ollama inference hatası oluştu.\n\n"
+               f"Çözüm:\n"
+               f"1. Terminal açın: taskkill /F /IM ollama.exe\n"
+               f"2. Ollama'yı yeniden başlatın\n"
+               f"3. Web arayüzünü yenileyin\n\n"
+               f"Sorun devam ederse farklı bir soru deneyin (daha kısa).")
+    return f"Ollama hatası: {str(e)}\n\nOllama'nın çalıştığından ve '{model}' modelinin yüklü olduğundan emin olun."
+
+
 class OllamaLLM:
     """Ollama LLM entegrasyonu"""
     
-    def __init__(self, model: str = "mistral", url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        model: str = "mistral",
+        url: str = "http://localhost:11434",
+        keep_alive=None,
+        scheduler=None
+    ):
         """
         Args:
             model: Ollama model adı (mistral - en stabil)
             url: Ollama API URL
+            keep_alive: Modelin son istekten sonra bellekte kalma süresi
+                ('30m', saniye, -1 = sürekli; None = Ollama varsayılanı)
+            scheduler: Paylaşılan LLMScheduler (None = istekler doğrudan gider)
         """
         self.model = model
         self.url = url
+        self.keep_alive = keep_alive
+        self.scheduler = scheduler
+        # Son üretimin süreleri: ilk token (ttft), toplam, parça sayısı, model yükleme
+        self.last_timing: Dict = {}
+        self.last_warm_up: Dict = {}
+        # Soğuk (model yüklenerek) ve sıcak isteklerin ilk token süreleri
+        self.ttft_history = {'cold': deque(maxlen=200), 'warm': deque(maxlen=200)}
+        self._warm = False
+        self._client = None
         self._check_connection()
     
+    @property
+    def client(self):
+        """Ayarlı URL'e bağlı Ollama istemcisi (HTTP bağlantıları yeniden kullanılır)"""
+        if self._client is None:
+            import ollama
+            self._client = ollama.Client(host=self.url)
+        return self._client
+    
     def _check_connection(self):
-        """Ollama bağlantısını kontrol et"""
-        try:
-            ollama.list()
+        """
+        Ollama durumunu paylaşılan sağlık izleyicisinden oku (ağı beklemez)
+        
+        Durum henüz bilinmiyorsa izleyici arka planda yoklar; bağlantı
+        hatası ilk üretimde kullanıcıya gösterilir.
+        """
+        from src.ollama_health import get_monitor
+        
+        status = get_monitor(self.url).status()
+        if status['ok']:
             print(f"✓ Ollama bağlantısı başarılı (Model: {self.model})")
-        except Exception as e:
-            print(f"⚠️  Ollama bağlantı hatası: {e}")
+        elif status['ok'] is False:
+            print(f"⚠️  Ollama bağlantı hatası: {status['error']}")
             print("   Ollama'nın çalıştığından emin olun: ollama serve")
     
+    def _request_kwargs(self) -> Dict:
+        """keep_alive ayarlıysa isteğe eklenecek parametre"""
+        return {'keep_alive': self.keep_alive} if self.keep_alive is not None else {}
+    
+    def warm_up(self, system: str = "", num_ctx: int = 2048) -> Dict:
+        """
+        Modeli yükle ve sistem prompt'unu önceden işlet
+        
+        Tek token'lık bir istek gönderilir: model belleğe alınır ve sabit
+        sistem prompt'unun KV önbelleği ilk gerçek soruda yeniden kullanılır.
+        num_ctx gerçek isteklerle aynı olmalıdır (farklıysa Ollama modeli
+        yeniden yükler). Zamanlayıcı varsa istek düşük öncelikle sıraya
+        girer; kuyruk doluysa ısınma atlanır (hata olarak raporlanır).
+        
+        Returns:
+            {'load': model yükleme süresi, 'total': süre, 'error': hata/None}
+        """
+        start = time.perf_counter()
+        try:
+            if self.scheduler is not None:
+                self.scheduler.acquire(PRIORITY_LOW)
+            try:
+                response = self.client.chat(
+                    model=self.model,
+                    messages=build_messages("Hazır mısın?", system),
+                    options={'num_predict': 1, 'num_ctx': num_ctx},
+                    **self._request_kwargs()
+                )
+            finally:
+                if self.scheduler is not None:
+                    self.scheduler.release()
+            self._warm = True
+            result = {'load': load_seconds(response), 'error': None}
+        except Exception as e:
+            result = {'load': None, 'error': str(e)}
+        result['total'] = time.perf_counter() - start
+        self.last_warm_up = result
+        return result
+    
+    def ttft_summary(self) -> Dict:
+        """Soğuk ve sıcak isteklerin ilk token süreleri (adet, ortanca)"""
+        return {
+            kind: {'count': len(values), 'p50': median(values)}
+            for kind, values in self.ttft_history.items()
+        }
+    
     def generate(
         self, 
         prompt: str, 
         system: str = "",
         temperature: float = 0.3,
         top_p: float = 0.9,
-        max_tokens: int = 512  # Azaltıldı: 1024 -> 512 (bellek tasarrufu)
+        max_tokens: int = 512,  # Azaltıldı: 1024 -> 512 (bellek tasarrufu)
+        num_ctx: int = 2048,
+        priority: int = PRIORITY_NORMAL
     ) -> str:
         """
         Ollama ile cevap üret
@@ -184,76 +1022,288 @@ class OllamaLLM:
             temperature: Yaratıcılık (0.0-1.0, düşük = daha deterministik)
             top_p: Nucleus sampling
             max_tokens: Maksimum token sayısı
+            num_ctx: Context window (prompt + cevap token'ı)
+            priority: Zamanlayıcı önceliği (bkz. llm_scheduler)
         
         Returns:
             Üretilen cevap
         """
+        return "".join(self.generate_stream(prompt, system, temperature, top_p, max_tokens, num_ctx, priority))
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        system: str = "",
+        temperature: float = 0.3,
+        top_p: float = 0.9,
+        max_tokens: int = 512,
+        num_ctx: int = 2048,
+        priority: int = PRIORITY_NORMAL
+    ) -> Iterator[str]:
+        """
+        Ollama ile cevabı token token üret
+        
+        Parçalar geldikçe döndürülür; ilk token süresi (TTFT) ve toplam
+        süre üretim bitince `last_timing` içine yazılır. Hata olursa hata
+        mesajı tek parça olarak döndürülür.
+        
+        Zamanlayıcı varsa istek önce sırasını bekler (bekleme TTFT'ye
+        dahildir); kuyruk doluysa QueueFullError fırlatılır.
+        
+        Args:
+            generate() ile aynı
+            priority: Zamanlayıcı önceliği (bkz. llm_scheduler)
+        
+        Yields:
+            Cevap metni parçaları
+        """
+        start = time.perf_counter()
+        first_token = None
+        pieces = 0
+        error = False
+        load = None
+        # Kuyruk isteği reddederse önceki isteğin süreleri raporlanmasın
+        self.last_timing = {}
+        queued = self.scheduler.acquire(priority) if self.scheduler is not None else 0.0
         try:
-            messages = []
-            
-            if system:
-                messages.append({
-                    'role': 'system',
-                    'content': system
-                })
-            
-            messages.append({
-                'role': 'user',
-                'content': prompt
-            })
-            
-            response = ollama.chat(
+            stream = self.client.chat(
                 model=self.model,
-                messages=messages,
-                options={
-                    'temperature': temperature,
-                    'top_p': top_p,
-                    'num_predict': max_tokens,
-                    'num_ctx': 2048,  # Context window azaltıldı
-                }
+                messages=build_messages(prompt, system),
+                options=generation_options(temperature, top_p, max_tokens, num_ctx),
+                stream=True,
+                **self._request_kwargs()
             )
             
-            return response['message']['content']
+            for part in stream:
+                # Son parça (done) model yükleme süresini taşır
+                load = load_seconds(part) or load
+                content = part['message']['content']
+                if not content:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                pieces += 1
+                yield content
         
         except Exception as e:
-            error_msg = str(e)
-            if "404" in error_msg or "not found" in error_msg:
-                return (f"Ollama hatası: model '{self.model}' not found (status code: 404)\n\n"
-                       f"Model indirmek için terminalde çalıştırın:\n"
-                       f"  ollama pull {self.model}\n\n"
-                       f"Veya farklı bir model kullanın (llama3.2:3b, gemma2:9b vb.)")
-            if "exit status 2" in error_msg or "terminated" in error_msg:
-                return (f"⚠️ Ollama inference hatası oluştu.\n\n"
-                       f"Çözüm:\n"
-                       f"1. Terminal açın: taskkill /F /IM ollama.exe\n"
-                       f"2. Ollama'yı yeniden başlatın\n"
-                       f"3. Web arayüzünü yenileyin\n\n"
-                       f"Sorun devam ederse farklı bir soru deneyin (daha kısa).")
-            return f"Ollama hatası: {str(e)}\n\nOllama'nın çalıştığından ve '{self.model}' modelinin yüklü olduğundan emin olun."
+            error = True
+            # Sağlık durumu bir sonraki TTL'i beklemeden güncellensin
+            from src.ollama_health import get_monitor
+            get_monitor(self.url).refresh()
+            yield ollama_error_message(self.model, e)
+        
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release()
+            # Yükleme süresi bilinmiyorsa (eski Ollama) bu süreçteki ilk istek soğuktur
+            cold = load >= COLD_LOAD_SECONDS if load is not None else not self._warm
+            self.last_timing = {
+                'ttft': first_token,
+                'total': time.perf_counter() - start,
+                'tokens': pieces,
+                'error': error,
+                'load': load,
+                'cold': cold,
+                'queued': queued,
+            }
+            if not error:
+                self._warm = True
+                if first_token is not None:
+                    self.ttft_history['cold' if cold else 'warm'].append(first_token)
 
 
 class RAGEngine:
     """RAG sistemi ana motoru"""
     
+    # Cevap üretim ayarları (düşük temperature = daha tutarlı, deterministik)
+    ANSWER_PARAMS = {'temperature': 0.3, 'top_p': 0.9, 'max_tokens': 1024}
+    
+    # Sistem prompt'u ve cevap formatı her istekte aynıdır ve mesajların
+    # başında durur; Ollama bu önekin KV önbelleğini sorgular arasında
+    # yeniden kullanır. Değişen kısımlar (chunk'lar, soru) sonra gelir.
+    SYSTEM_PROMPT = """Sen askeri jeneratör bakım ve arıza giderme konusunda uzman bir teknisyensin.
+
+GÖREVİN:
+1. Verilen teknik dokümanlara SADECE dayanarak cevap ver
+2. Emin olmadığın konularda "Bu bilgi dokümanlarımda yok" de
+3. Adım adım, net ve uygulanabilir çözümler sun
+4. Güvenlik önlemleri varsa MUTLAKA belirt
+
+CEVAP FORMATI:
+- Kısa özet ile başla (1-2 cümle)
+- Adım adım çözüm sun (numaralı liste)
+- Güvenlik uyarısı varsa belirt
+- Hangi doküman/bölümden aldığını belirt
+
+YAPMA:
+- Genel tavsiyeler verme, spesifik ol
+- Spekülasyon yapma, sadece dokümanlara dayanarak cevap ver
+- Uzun giriş paragrafları yazma, direkt konuya gir
+- İngilizce kelime karıştırma
+
+Türkçe dil bilgisi kurallarına DİKKAT ET. Yazım hatası yapma.
+
+CEVABINI ŞU FORMATTA VER:
+
+📋 ÖZET:
+[Tek cümle ile sorunun çözümü]
+
+🔧 ADIMLAR:
+1. [İlk adım - spesifik ve uygulanabilir]
+2. [İkinci adım - spesifik ve uygulanabilir]
+3. [Devam eden adımlar...]
+
+⚠️ GÜVENLİK:
+[Varsa güvenlik uyarıları, yoksa "Standart güvenlik önlemleri yeterli"]
+
+📚 KAYNAK:
+[Hangi doküman/bölümden - eğer dokümanda yoksa "Dokümanlarda bu bilgi yok" de]"""
+    
     def __init__(
         self,
         embedding_model: str = "all-MiniLM-L6-v2",
         llm_model: str = "mistral",
-        vector_db_path: Optional[str] = None
+        vector_db_path: Optional[str] = None,
+        index_type: Optional[str] = None,
+        index_params: Optional[Dict] = None,
+        quantization: Optional[str] = None,
+        retrieval_mode: str = 'hybrid',
+        embedding_cache_path: Optional[str] = None,
+        query_cache_size: int = 256,
+        embedding_batch_size: int = 32,
+        embedding_workers: int = 1,
+        embedding_backend: str = 'torch',
+        llm_url: str = "http://localhost:11434",
+        llm_concurrency: int = 4,
+        llm_keep_alive=None,
+        llm_scheduler=None,
+        response_cache_path: Optional[str] = None,
+        response_cache_size: int = 1000,
+        response_cache_ttl: float = 7 * 24 * 3600,
+        prompt_budget: int = 2048,
+        prompt_tokenizer: Optional[str] = None,
+        pin_num_ctx: bool = False
     ):
         """
         Args:
             embedding_model: Sentence-transformers model
             llm_model: Ollama model
             vector_db_path: Vektör DB yolu (varsa yükle)
+            index_type: Arama indeksi ('flat', 'ivf' veya 'hnsw'; None = kayıtlı DB'deki)
+            index_params: İndeks parametreleri (örn: {'nprobe': 16}, {'ef_search': 64})
+            quantization: Embedding saklama tipi ('float32', 'float16', 'int8'; None = kayıtlı DB'deki)
+            retrieval_mode: 'hybrid' (embedding + BM25, RRF ile) veya 'dense' (sadece embedding)
+            embedding_cache_path: Chunk embedding önbelleği (SQLite; None = önbelleksiz)
+            query_cache_size: Bellekte tutulacak sorgu embedding'i sayısı (0 = kapalı)
+            embedding_batch_size: Chunk encode batch boyutu
+            embedding_workers: Chunk encode işçi process sayısı (0 = çekirdek sayısı)
+            embedding_backend: Embedding arka ucu ('torch', 'onnx', 'onnx-int8')
+            llm_url: Ollama API URL
+            llm_concurrency: Asenkron istemcide aynı anda Ollama'ya giden en fazla istek
+            llm_keep_alive: Modelin Ollama'da bellekte kalma süresi (bkz. keep_alive_value)
+            llm_scheduler: Oturumlar arası paylaşılan LLMScheduler (None = sırasız)
+            response_cache_path: LLM cevap önbelleği (SQLite; None = önbelleksiz)
+            response_cache_size: Önbellekte en fazla kaç cevap tutulacak
+            response_cache_ttl: Önbellekteki cevabın geçerlilik süresi (saniye)
+            prompt_budget: Sistem + kullanıcı prompt'u için en fazla token; chunk'lar
+                alaka sırasıyla bu bütçeye sığdırılır
+            prompt_tokenizer: Token sayımı için HuggingFace tokenizer adı/yolu (None = tahmin)
+            pin_num_ctx: True ise num_ctx hiç küçülmez (yeniden yükleme olmaz, ama
+                KV önbelleği en büyük prompt'a göre ayrılır; bkz. _pin_context)
         """
-        self.embedder = Embedder(model_name=embedding_model)
-        self.vector_store = VectorStore(embedding_dim=384)
-        self.llm = OllamaLLM(model=llm_model)
+        if retrieval_mode not in ('hybrid', 'dense'):
+            raise ValueError(f"Bilinmeyen arama modu: {retrieval_mode} (geçerli: hybrid, dense)")
+        self.retrieval_mode = retrieval_mode
+        # Embedding modeli ve Ollama istemcisi ilk ihtiyaçta oluşturulur
+        check_backend(embedding_backend)
+        self.embedding_model = embedding_model
+        self.embedding_backend = embedding_backend
+        self.llm_model = llm_model
+        self.llm_url = llm_url
+        self.llm_concurrency = llm_concurrency
+        self.llm_keep_alive = llm_keep_alive
+        self.llm_scheduler = llm_scheduler
+        self._embedder: Optional[Embedder] = None
+        self._llm: Optional[OllamaLLM] = None
+        self._llm_lock = threading.Lock()
+        self._async_llm = None
+        self.response_cache = (ResponseCache(response_cache_path, response_cache_size, response_cache_ttl)
+                               if response_cache_path else None)
+        self.last_answer_cached = False
+        self.prompt_budget = prompt_budget
+        self.token_counter = get_token_counter(prompt_tokenizer)
+        # Ollama'da yüklü modelin num_ctx'i (pin_num_ctx açıksa küçülmez)
+        self.pin_num_ctx = pin_num_ctx
+        self.pinned_num_ctx = 0
+        # Son prompt'un boyutu: token, num_ctx, kullanılan / kısaltılan chunk
+        self.last_prompt: Dict = {}
+        self.embedding_cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+        self.query_cache = QueryEmbeddingCache(max_size=query_cache_size)
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_workers = embedding_workers
+        self.vector_store = VectorStore(
+            embedding_dim=384,
+            index_type=index_type,
+            index_params=index_params,
+            quantization=quantization
+        )
         
-        # Vektör DB varsa yükle
+        # Vektör DB varsa yükle (parçalı DB'de arama tüm parçalara dağıtılır)
         if vector_db_path and os.path.exists(vector_db_path):
-            self.vector_store.load(vector_db_path)
+            from src.sharded_store import ShardedVectorStore, is_sharded_store
+            if is_sharded_store(vector_db_path):
+                self.vector_store = ShardedVectorStore(vector_db_path)
+            else:
+                self.vector_store.load(vector_db_path)
+        
+        # Vektör DB yeniden eğitildiyse / güncellendiyse eski cevaplar silinir
+        if self.response_cache is not None:
+            if self.response_cache.set_namespace(vector_db_fingerprint(vector_db_path)):
+                print("🗑️  Vektör DB değişmiş, LLM cevap önbelleği temizlendi")
+    
+    @property
+    def embedder(self) -> Embedder:
+        """Embedding modeli (ilk erişimde yüklenir)"""
+        if self._embedder is None:
+            self._embedder = Embedder(model_name=self.embedding_model, backend=self.embedding_backend)
+        return self._embedder
+    
+    @embedder.setter
+    def embedder(self, embedder: Embedder):
+        self._embedder = embedder
+        self.embedding_model = embedder.model_name
+        self.embedding_backend = embedder.backend
+    
+    @property
+    def embedding_key(self) -> str:
+        """Embedding önbelleklerinde model anahtarı (arka uç dahil)"""
+        return cache_key(self.embedding_model, self.embedding_backend)
+    
+    @property
+    def llm(self) -> OllamaLLM:
+        """Ollama istemcisi (ilk erişimde bağlantı kontrol edilir)"""
+        # Isınma thread'i ile ilk sorgu aynı anda erişebilir
+        with self._llm_lock:
+            if self._llm is None:
+                self._llm = OllamaLLM(model=self.llm_model, url=self.llm_url,
+                                      keep_alive=self.llm_keep_alive, scheduler=self.llm_scheduler)
+        return self._llm
+    
+    @llm.setter
+    def llm(self, llm: OllamaLLM):
+        self._llm = llm
+        self.llm_model = llm.model
+    
+    @property
+    def async_llm(self):
+        """Asenkron Ollama istemcisi (bkz. async_llm)"""
+        if self._async_llm is None:
+            from src.async_llm import AsyncOllamaLLM
+            self._async_llm = AsyncOllamaLLM(
+                model=self.llm_model, url=self.llm_url, max_concurrency=self.llm_concurrency,
+                keep_alive=self.llm_keep_alive, scheduler=self.llm_scheduler
+            )
+        return self._async_llm
     
     def add_documents(self, chunks: List[Dict]):
         """
@@ -268,39 +1318,179 @@ class RAGEngine:
         
         print(f"\n🔄 {len(chunks)} chunk için embedding oluşturuluyor...")
         
-        # Embedding oluştur
-        texts = [chunk['text'] for chunk in chunks]
-        embeddings = self.embedder.encode(texts)
+        # Embedding oluştur (önbellekte olanlar modele gönderilmez)
+        embeddings = self._embed_chunks(chunks)
         
         # Vektör DB'ye ekle
         self.vector_store.add_documents(chunks, embeddings)
         self.vector_store.build_index()
     
-    def retrieve_context(self, query: str, top_k: int = 3) -> List[Dict]:
+    def replace_source(self, source: str, chunks: List[Dict]):
+        """
+        Bir manuelin chunk'larını yenileriyle değiştir
+        
+        Sadece bu kaynağın chunk'ları için embedding oluşturulur; diğer
+        manueller yeniden işlenmez.
+        
+        Args:
+            source: Kaynak dosya adı (örn: jenerator_manual.pdf)
+            chunks: Manuelin yeni chunk listesi
+        """
+        print(f"\n🔄 {source}: {len(chunks)} chunk için embedding oluşturuluyor...")
+        embeddings = self._embed_chunks(chunks)
+        self.vector_store.replace_source(source, chunks, embeddings)
+    
+    def _embed_chunks(self, chunks: List[Dict]) -> np.ndarray:
+        """
+        Chunk metinlerini embedding'e çevir
+        
+        Önbellek açıksa sadece (model, metin özeti) anahtarı önbellekte
+        olmayan chunk'lar encode edilir. Encode uzunluk kovalarıyla ve
+        embedding_workers kadar process'te yapılır.
+        """
+        texts = [chunk['text'] for chunk in chunks]
+        
+        def encode(texts: List[str]) -> np.ndarray:
+            return self.embedder.encode_corpus(
+                texts, batch_size=self.embedding_batch_size, workers=self.embedding_workers
+            )
+        
+        if self.embedding_cache is None:
+            return encode(texts)
+        
+        hits_before = self.embedding_cache.hits
+        embeddings = self.embedding_cache.encode(self.embedding_key, texts, encode)
+        print(f"   ✓ Önbellekten: {self.embedding_cache.hits - hits_before}/{len(texts)} chunk")
+        return embeddings
+    
+    def remove_source(self, source: str) -> int:
+        """
+        Bir manuelin tüm chunk'larını vektör DB'den çıkar
+        
+        Returns:
+            Silinen chunk sayısı
+        """
+        return self.vector_store.delete_source(source)
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """
+        Sorgu embedding'i (LRU önbellekli)
+        
+        Anahtar Türkçe küçük harfe çevrilmiş, boşlukları sadeleştirilmiş
+        sorgu metnidir; embedding modeli değişirse önbellek boşaltılır.
+        """
+        embedding = self.query_cache.get(self.embedding_key, query)
+        if embedding is None:
+            embedding = self._encode_query(query)
+        return embedding
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Önbellekte olmadığı bilinen sorguyu encode et ve önbelleğe ekle"""
+        embedding = self.embedder.encode_single(query)
+        self.query_cache.put(self.embedding_key, query, embedding)
+        return embedding
+    
+    def retrieve_context(
+        self,
+        query: str,
+        top_k: int = 3,
+        filters: Optional[Dict] = None,
+        return_embedding: bool = False
+    ):
         """
         Sorguya en yakın doküman parçalarını getir
         
+        Hibrit modda yoğun ve BM25 sonuçları RRF ile birleştirilir; kısa
+        kod/parça numarası sorgularında BM25 yeterli sonuç verirse
+        embedding hiç hesaplanmaz.
+        
         Args:
             query: Kullanıcı sorusu
             top_k: Kaç chunk döndürülecek
+            filters: Metadata filtreleri (örn: {'generator_id': 'caterpillar_3406'})
+            return_embedding: True ise (chunk'lar, sorgu embedding'i) döner;
+                embedding hesaplanmadıysa (BM25 kısayolu) ikincisi None olur
         
         Returns:
             En yakın chunk'lar
         """
-        # Query embedding oluştur
-        query_embedding = self.embedder.encode_single(query)
+        # Kod / parça numarası sorgularında BM25 yeterliyse embedding hesaplanmaz;
+        # sorgu embedding'i önbellekteyse 'similarity' yine cosine olur
+        if self.retrieval_mode == 'hybrid' and is_exact_term_query(query):
+            query_embedding = self.query_cache.get(self.embedding_key, query)
+            results = self.vector_store.lexical_search(
+                query, top_k=top_k, filters=filters, query_embedding=query_embedding
+            )
+            if len(results) >= top_k:
+                return (results, query_embedding) if return_embedding else results
+            # Önbelleğe zaten bakıldı; ikinci bir get miss'i iki kez sayardı
+            if query_embedding is None:
+                query_embedding = self._encode_query(query)
+        else:
+            # Query embedding oluştur (tekrar eden sorular önbellekten)
+            query_embedding = self._embed_query(query)
         
         # Benzer chunk'ları bul
-        results = self.vector_store.search(query_embedding, top_k=top_k)
+        if self.retrieval_mode == 'hybrid':
+            results = self.vector_store.hybrid_search(
+                query_embedding, query, top_k=top_k, filters=filters
+            )
+        else:
+            results = self.vector_store.search(query_embedding, top_k=top_k, filters=filters)
         
-        return results
+        return (results, query_embedding) if return_embedding else results
+    
+    def retrieve_context_batch(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        filters: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        Birden fazla sorgu için doküman parçalarını toplu getir
+        
+        Tüm sorgular tek bir encode çağrısıyla embedding'e çevrilir ve
+        tek bir matris çarpımıyla skorlanır (değerlendirme/gece işleri için).
+        Hibrit modda yoğun sonuçlar sorgu başına BM25 sonuçlarıyla RRF ile
+        birleştirilir.
+        
+        Args:
+            queries: Kullanıcı soruları
+            top_k: Her sorgu için kaç chunk döndürülecek
+            filters: Tüm sorgulara uygulanacak metadata filtreleri
+        
+        Returns:
+            Sorgu başına en yakın chunk listeleri (girdi sırasıyla)
+        """
+        if not queries:
+            return []
+        
+        query_embeddings = self.query_cache.encode(
+            self.embedding_key, queries, lambda texts: self.embedder.encode(texts)
+        )
+        
+        if self.retrieval_mode == 'dense':
+            return self.vector_store.search_batch(query_embeddings, top_k=top_k, filters=filters)
+        
+        # Yoğun adaylar tek matris çarpımıyla, BM25 adayları sorgu başına
+        depth = max(4 * top_k, 20)
+        dense = self.vector_store.search_batch(query_embeddings, top_k=depth, filters=filters)
+        return [
+            reciprocal_rank_fusion([
+                dense_results,
+                self.vector_store.lexical_search(query, top_k=depth, filters=filters,
+                                                 query_embedding=embedding)
+            ], top_k)
+            for query, embedding, dense_results in zip(queries, query_embeddings, dense)
+        ]
     
     def generate_answer(
         self,
         query: str,
         context_chunks: Optional[List[Dict]] = None,
         fault_info: Optional[Dict] = None,
-        top_k: int = 3
+        top_k: int = 3,
+        priority: Optional[int] = None
     ) -> str:
         """
         Sorguya cevap üret (RAG)
@@ -310,90 +1500,253 @@ class RAGEngine:
             context_chunks: Önceden alınmış context (yoksa otomatik al)
             fault_info: Arıza kodu bilgisi (varsa)
             top_k: Kaç chunk kullanılacak
+            priority: LLM kuyruğu önceliği (None = arıza kodunun önem derecesine göre)
         
         Returns:
             Üretilen cevap
         """
+        return "".join(self.generate_answer_stream(query, context_chunks, fault_info, top_k, priority))
+    
+    def generate_answer_stream(
+        self,
+        query: str,
+        context_chunks: Optional[List[Dict]] = None,
+        fault_info: Optional[Dict] = None,
+        top_k: int = 3,
+        priority: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Sorguya cevabı token token üret (RAG)
+        
+        Args:
+            generate_answer() ile aynı
+        
+        Yields:
+            Cevap metni parçaları (süreler: self.llm.last_timing)
+        """
         # Context yoksa al
         if context_chunks is None:
             context_chunks = self.retrieve_context(query, top_k=top_k)
         
-        # System prompt - Gelişmiş versiyon
-        system_prompt = """Sen askeri jeneratör bakım ve arıza giderme konusunda uzman bir teknisyensin.
-
-GÖREVİN:
-1. Verilen teknik dokümanlara SADECE dayanarak cevap ver
-2. Emin olmadığın konularda "Bu bilgi dokümanlarımda yok" de
-3. Adım adım, net ve uygulanabilir çözümler sun
-4. Güvenlik önlemleri varsa MUTLAKA belirt
-
-CEVAP FORMATI:
-- Kısa özet ile başla (1-2 cümle)
-- Adım adım çözüm sun (numaralı liste)
-- Güvenlik uyarısı varsa belirt
-- Hangi doküman/bölümden aldığını belirt
-
-YAPMA:
-- Genel tavsiyeler verme, spesifik ol
-- Spekülasyon yapma, sadece dokümanlara dayanarak cevap ver
-- Uzun giriş paragrafları yazma, direkt konuya gir
-- İngilizce kelime karıştırma
-
-Türkçe dil bilgisi kurallarına DİKKAT ET. Yazım hatası yapma."""
-
-        # Context metni oluştur
-        context_parts = []
+        system_prompt, user_prompt, num_ctx = self._build_prompts(query, context_chunks, fault_info)
         
-        if context_chunks:
-            context_parts.append("📚 İLGİLİ DOKÜMAN BİLGİLERİ:\n")
-            for i, chunk in enumerate(context_chunks, 1):
-                context_parts.append(f"[Kaynak {i}: {chunk['source']}]")
-                context_parts.append(f"{chunk['text']}\n")
+        # Aynı istek daha önce cevaplandıysa LLM çağrılmaz
+        key = self._cached_response_key(system_prompt, user_prompt, num_ctx)
+        cached = self._cached_response(key)
+        if cached is not None:
+            yield cached
+            return
         
-        if fault_info:
-            context_parts.append("\n🔧 ARIZA KODU BİLGİSİ:")
-            context_parts.append(f"Kod: {fault_info.get('code')}")
-            context_parts.append(f"İsim: {fault_info.get('name')}")
-            context_parts.append(f"Kategori: {fault_info.get('category')}")
-            context_parts.append(f"Önem: {fault_info.get('severity')}\n")
+        pieces = []
+        # CRITICAL arıza soruları paylaşılan LLM kuyruğunda öne geçer
+        if priority is None:
+            priority = priority_for_fault(fault_info)
+        for piece in self.llm.generate_stream(
+            prompt=user_prompt, system=system_prompt, num_ctx=self._pin_context(num_ctx),
+            priority=priority, **self.ANSWER_PARAMS
+        ):
+            pieces.append(piece)
+            yield piece
         
-        context_text = "\n".join(context_parts) if context_parts else "Not: İlgili doküman bulunamadı."
+        if key is not None and not self.llm.last_timing.get('error'):
+            self.response_cache.put(key, self.llm_model, "".join(pieces))
+    
+    async def agenerate_answer_stream(
+        self,
+        query: str,
+        context_chunks: Optional[List[Dict]] = None,
+        fault_info: Optional[Dict] = None,
+        top_k: int = 3,
+        priority: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        generate_answer_stream()'in asenkron sürümü
         
-        # Yapılandırılmış user prompt
-        user_prompt = f"""SORU: {query}
-
-{context_text}
-
-CEVABINI ŞU FORMATTA VER:
-
-📋 ÖZET:
-[Tek cümle ile sorunun çözümü]
-
-🔧 ADIMLAR:
-1. [İlk adım - spesifik ve uygulanabilir]
-2. [İkinci adım - spesifik ve uygulanabilir]
-3. [Devam eden adımlar...]
-
-⚠️ GÜVENLİK:
-[Varsa güvenlik uyarıları, yoksa "Standart güvenlik önlemleri yeterli"]
+        Doküman araması thread havuzunda yapılır; event loop bu sırada
+        diğer kullanıcıların üretimlerini yürütmeye devam eder.
+        """
+        if context_chunks is None:
+            context_chunks = await asyncio.to_thread(self.retrieve_context, query, top_k)
+        
+        system_prompt, user_prompt, num_ctx = self._build_prompts(query, context_chunks, fault_info)
+        
+        key = self._cached_response_key(system_prompt, user_prompt, num_ctx)
+        cached = self._cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Eşzamanlı isteklerde süreler istek başına ayrı sözlükte tutulur
+        pieces, timing = [], {}
+        if priority is None:
+            priority = priority_for_fault(fault_info)
+        async for piece in self.async_llm.agenerate_stream(
+            prompt=user_prompt, system=system_prompt, num_ctx=self._pin_context(num_ctx), timing=timing,
+            priority=priority, **self.ANSWER_PARAMS
+        ):
+            pieces.append(piece)
+            yield piece
+        
+        if key is not None and not timing.get('error'):
+            self.response_cache.put(key, self.llm_model, "".join(pieces))
+    
+    async def agenerate_answer(
+        self,
+        query: str,
+        context_chunks: Optional[List[Dict]] = None,
+        fault_info: Optional[Dict] = None,
+        top_k: int = 3,
+        priority: Optional[int] = None
+    ) -> str:
+        """generate_answer()'in asenkron sürümü"""
+        pieces = []
+        async for piece in self.agenerate_answer_stream(query, context_chunks, fault_info, top_k, priority):
+            pieces.append(piece)
+        return "".join(pieces)
+    
+    def _pin_context(self, num_ctx: int) -> int:
+        """
+        İsteğin gönderileceği num_ctx
+        
+        Ollama num_ctx değişince modeli yeniden yükler (soğuk başlangıç).
+        pin_num_ctx açıksa yüklü boyuttan küçük bir pencere istenmez; bu
+        yeniden yüklemeyi önler ama KV önbelleği (bellek) görülen en büyük
+        prompt'un kovasına göre ayrılır. Kapalıysa (varsayılan) her istek
+        kendi kovasını kullanır. Önbellek anahtarı her durumda gerçek
+        ihtiyacı (num_ctx) kullanır.
+        """
+        if not self.pin_num_ctx:
+            return num_ctx
+        self.pinned_num_ctx = max(self.pinned_num_ctx, num_ctx)
+        return self.pinned_num_ctx
+    
+    def warm_up(self) -> Dict:
+        """
+        Modeli Ollama'ya yükle ve sabit sistem prompt'unu önceden işlet
+        
+        Tipik bir soru prompt'unun (sabit sistem prompt'u + DB'deki ilk
+        chunk'larla paketlenmiş bağlam) pencere boyutuyla ısınılır; böylece
+        gerçek sorular aynı kovaya düşer ve modeli yeniden yüklemez.
+        """
+        # Parçalı DB'de ilk parçanın chunk'ları örnek alınır
+        stores = list(getattr(self.vector_store, 'shards', {}).values()) or [self.vector_store]
+        sample = getattr(stores[0], 'chunks', [])[:3]
+        _, _, num_ctx = self._build_prompts("Bakım adımları nelerdir?", sample, None, record=False)
+        return self.llm.warm_up(system=self.SYSTEM_PROMPT, num_ctx=self._pin_context(num_ctx))
+    
+    def _cached_response_key(self, system_prompt: str, user_prompt: str, num_ctx: int) -> Optional[str]:
+        """Cevap önbelleği anahtarı (önbellek kapalıysa None)"""
+        if self.response_cache is None:
+            return None
+        return request_key(self.llm_model, system_prompt, user_prompt,
+                           generation_options(num_ctx=num_ctx, **self.ANSWER_PARAMS))
+    
+    def _cached_response(self, key: Optional[str]) -> Optional[str]:
+        """Önbellekteki cevap (yoksa None); last_answer_cached'i günceller"""
+        cached = self.response_cache.get(key) if key is not None else None
+        self.last_answer_cached = cached is not None
+        return cached
+    
+    def _build_prompts(
+        self,
+        query: str,
+        context_chunks: Optional[List[Dict]],
+        fault_info: Optional[Dict],
+        record: bool = True
+    ) -> Tuple[str, str, int]:
+        """
+        Sistem ve kullanıcı prompt'larını token bütçesiyle oluştur
+        
+        Sabit kısımlar (sistem prompt'u ve format şablonu, soru, arıza
+        bilgisi) önce sayılır; kalan bütçe chunk'lara alaka sırasıyla
+        dağıtılır. num_ctx prompt'un gerçek boyutu + cevap uzunluğudur.
+        record=False ise last_prompt güncellenmez (ısınma tahmini için).
+        
+        Returns:
+            (sistem prompt'u, kullanıcı prompt'u, num_ctx)
+        """
+        system_prompt = self.SYSTEM_PROMPT
 
-📚 KAYNAK:
-[Hangi doküman/bölümden - eğer dokümanda yoksa "Dokümanlarda bu bilgi yok" de]"""
+        fault_parts = []
+        if fault_info:
+            fault_parts.append("\n🔧 ARIZA KODU BİLGİSİ:")
+            fault_parts.append(f"Kod: {fault_info.get('code')}")
+            fault_parts.append(f"İsim: {fault_info.get('name')}")
+            fault_parts.append(f"Kategori: {fault_info.get('category')}")
+            fault_parts.append(f"Önem: {fault_info.get('severity')}\n")
         
-        # Cevap üret (düşük temperature = daha tutarlı)
-        answer = self.llm.generate(
-            prompt=user_prompt, 
-            system=system_prompt,
-            temperature=0.3,  # Düşük = deterministik
-            top_p=0.9,
-            max_tokens=1024
+        def format_chunk(i: int, chunk: Dict, text: str) -> str:
+            return f"[Kaynak {i}: {chunk['source']}]\n{text}\n"
+        
+        # Chunk'lar dışındaki her şey bütçeden önce düşülür
+        count = self.token_counter.count
+        header = "📚 İLGİLİ DOKÜMAN BİLGİLERİ:\n"
+        fixed = (count(system_prompt) + count(self._user_prompt(query, "\n".join([header] + fault_parts)))
+                 + MESSAGE_OVERHEAD_TOKENS)
+        blocks, used, truncated = pack_chunks(
+            context_chunks or [], self.prompt_budget - fixed, count, format_chunk
         )
         
-        return answer
+        context_parts = [header] + blocks if blocks else []
+        user_prompt = self._user_prompt(query, "\n".join(context_parts + fault_parts))
+        prompt_tokens = fixed + used
+        num_ctx = context_window(prompt_tokens, self.ANSWER_PARAMS['max_tokens'],
+                                 self.prompt_budget + self.ANSWER_PARAMS['max_tokens'])
+        if not record:
+            return system_prompt, user_prompt, num_ctx
+        
+        self.last_prompt = {
+            'prompt_tokens': prompt_tokens,
+            'num_ctx': num_ctx,
+            'chunks_used': len(blocks),
+            'chunks_dropped': len(context_chunks or []) - len(blocks),
+            'truncated': truncated,
+        }
+        if truncated or self.last_prompt['chunks_dropped']:
+            print(f"✂️  Token bütçesi ({self.prompt_budget}): {len(blocks)} chunk kullanıldı"
+                  f"{', sonuncusu kısaltıldı' if truncated else ''}, "
+                  f"{self.last_prompt['chunks_dropped']} chunk sığmadı")
+        return system_prompt, user_prompt, num_ctx
     
-    def save_vector_db(self, path: str):
-        """Vektör DB'yi kaydet"""
-        self.vector_store.save(path)
+    @staticmethod
+    def _user_prompt(query: str, context_text: str) -> str:
+        """Kullanıcı prompt'u: değişken bağlam, en sonda soru"""
+        if not context_text.strip():
+            context_text = "Not: İlgili doküman bulunamadı."
+        return f"""{context_text}
+
+SORU: {query}
+
+Cevabını sistem talimatındaki formatta ver."""
+    
+    def save_vector_db(self, path: str, shard_by: Optional[str] = None):
+        """
+        Vektör DB'yi kaydet
+        
+        Args:
+            path: Vektör DB klasörü
+            shard_by: Verilirse DB bu metadata alanına göre parçalı kaydedilir
+                ('generator_id' veya 'source'), bkz. ShardedVectorStore
+        """
+        from src.sharded_store import ShardedVectorStore, is_sharded_store
+        
+        # Yüklenmiş parçalı DB'de sadece değişen parçalar yazılır
+        if isinstance(self.vector_store, ShardedVectorStore):
+            self.vector_store.save(path)
+        else:
+            # Format değişiyorsa (tek <-> parçalı) eski klasör kalıntı bırakmasın
+            if os.path.isdir(path) and bool(shard_by) != is_sharded_store(path):
+                shutil.rmtree(path)
+            
+            if shard_by:
+                ShardedVectorStore.from_store(self.vector_store, path, by=shard_by)
+                print(f"💾 Parçalı vektör DB kaydedildi: {path}")
+            else:
+                self.vector_store.save(path)
+        
+        # Önceki DB sürümüyle üretilmiş cevaplar geçersiz
+        if self.response_cache is not None:
+            self.response_cache.set_namespace(vector_db_fingerprint(path))
 
 
 if __name__ == "__main__":
@@ -428,7 +1781,8 @@ if __name__ == "__main__":
     context = rag.retrieve_context(query, top_k=2)
     print("🔍 Bulunan Context:")
     for c in context:
-        print(f"  - {c['source']}: {c['text'][:60]}... (skor: {c['similarity']:.3f})")
+        score = f"skor: {c['similarity']:.3f}" if c['similarity'] is not None else f"BM25: {c['bm25']:.2f}"
+        print(f"  - {c['source']}: {c['text'][:60]}... ({score})")
     
     # Cevap üret (opsiyonel - Ollama gerekli)
     # answer = rag.generate_answer(query)
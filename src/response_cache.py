@@ -0,0 +1,164 @@
+"""
+Kalıcı LLM Cevap Önbelleği
+
+Aynı (model, sistem prompt'u, kullanıcı prompt'u, üretim ayarları)
+isteği CPU'da her seferinde onlarca saniye yeniden üretiliyordu. Bu modül
+cevapları isteğin tamamının SHA-256 özetiyle bir SQLite dosyasında saklar:
+
+    data/llm_cache.sqlite
+    ├── responses(key, model, response, created, accessed)
+    └── info(name, value)   # namespace: vektör DB parmak izi
+
+Çıkarma kuralları:
+    - TTL: `ttl_seconds`'tan eski kayıtlar okunmaz ve silinir
+    - Boyut: `max_entries` aşılınca en uzun süredir okunmayanlar silinir
+    - Vektör DB değişince (parmak izi farklı) tüm kayıtlar silinir; model
+      adı anahtarın parçası olduğu için model değişince eski cevaplar
+      kullanılmaz
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Dict, Optional
+
+from src.vector_storage import META_FILE
+
+
+def request_key(model: str, system: str, prompt: str, options: Dict) -> str:
+    """İsteğin tamamından önbellek anahtarı"""
+    payload = json.dumps(
+        {'model': model, 'system': system, 'prompt': prompt, 'options': options},
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def vector_db_fingerprint(path: Optional[str]) -> str:
+    """
+    Vektör DB'nin parmak izi (meta dosyalarının boyutu ve değişiklik zamanı)
+
+    Tek parça DB'de meta.json, parçalı DB'de shards.json ve her parçanın
+    meta.json'u kullanılır; DB her kaydedildiğinde değişir.
+    """
+    if not path or not os.path.exists(path):
+        return 'yok'
+    from src.sharded_store import SHARDS_FILE
+
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name in (META_FILE, SHARDS_FILE):
+                stat = os.stat(os.path.join(root, name))
+                relative = os.path.relpath(os.path.join(root, name), path)
+                digest.update(f'{relative}:{stat.st_size}:{stat.st_mtime_ns};'.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class ResponseCache:
+    """İstek özeti -> LLM cevabı SQLite önbelleği (TTL + LRU boyut sınırı)"""
+
+    def __init__(self, path: str, max_entries: int = 1000, ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Args:
+            path: SQLite dosya yolu (yoksa oluşturulur)
+            max_entries: En fazla kayıt sayısı
+            ttl_seconds: Kaydın geçerlilik süresi (saniye)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Streamlit her yeniden çalıştırmada farklı thread kullanabilir
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' model TEXT NOT NULL,'
+                ' response TEXT NOT NULL,'
+                ' created REAL NOT NULL,'
+                ' accessed REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS info (name TEXT PRIMARY KEY, value TEXT)')
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Önbellekteki cevap sayısı"""
+        return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        """Bu oturumdaki isabet oranı (0-1)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def set_namespace(self, namespace: str) -> bool:
+        """
+        Önbelleği bir vektör DB sürümüne bağla
+
+        Kayıtlı parmak izi farklıysa (DB yeniden eğitildi / güncellendi)
+        tüm cevaplar silinir.
+
+        Returns:
+            Önbellek temizlendiyse True
+        """
+        row = self._conn.execute("SELECT value FROM info WHERE name = 'namespace'").fetchone()
+        if row is not None and row[0] == namespace:
+            return False
+        with self._conn:
+            if row is not None:
+                self._conn.execute('DELETE FROM responses')
+            self._conn.execute(
+                "INSERT OR REPLACE INTO info (name, value) VALUES ('namespace', ?)", (namespace,)
+            )
+        return row is not None
+
+    def get(self, key: str) -> Optional[str]:
+        """Geçerli kayıt varsa cevabı döndür (erişim zamanını günceller)"""
+        now = time.time()
+        row = self._conn.execute(
+            'SELECT response, created FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        with self._conn:
+            self._conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        """Cevabı kaydet, süresi dolanları ve fazlalıkları çıkar"""
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model, response, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, model, response, now, now)
+            )
+            self._conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl_seconds,))
+            self._conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                ' SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self, model: Optional[str] = None):
+        """Önbelleği (veya sadece bir modelin cevaplarını) temizle"""
+        with self._conn:
+            if model is None:
+                self._conn.execute('DELETE FROM responses')
+            else:
+                self._conn.execute('DELETE FROM responses WHERE model = ?', (model,))
+
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        self._conn.close()
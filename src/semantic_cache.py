@@ -0,0 +1,159 @@
+"""
+Anlamsal Cevap Önbelleği
+
+Yoğun vardiyalarda aynı soru farklı kelimelerle tekrar soruluyor
+("yağ nasıl değiştirilir" / "yağ değişimi adımları"). Birebir cevap
+önbelleği (response_cache) bunları yakalayamaz. Bu önbellek geçmiş
+(sorgu embedding'i, getirilen chunk'lar, cevap) kayıtlarını tutar ve
+yeni sorgu için şu iki koşul sağlanırsa kayıtlı cevabı döndürür:
+
+    1. Sorgu embedding'lerinin cosine benzerliği >= eşik
+    2. Yeni sorgu aynı chunk'ları (ve aynı arıza kodunu) getirmiş
+
+İkinci koşul yanlış isabetleri (benzer görünen ama farklı konudaki
+sorular) eler; eşiği geçip bu koşulda elenen sorgular "yanlış isabet
+adayı" olarak sayılır ve eşik ayarı için raporlanır.
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from src.lexical_index import result_key
+
+
+class SemanticAnswerCache:
+    """Sorgu embedding benzerliğiyle cevap önbelleği (bellekte, sınırlı)"""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 500):
+        """
+        Args:
+            threshold: İsabet için en düşük cosine benzerliği (0-1)
+            max_entries: En fazla kayıt (dolunca en eski kullanılan çıkar)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.false_hits = 0     # Eşiği geçti ama farklı chunk'lar getirdi
+        self.reported_false = 0  # Kullanıcının yanlış bulduğu önbellek cevapları
+        self._embeddings = np.empty((0, 0), dtype=np.float32)
+        self._records: List[Dict] = []
+        self._last_hit: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Önbellekteki cevap sayısı"""
+        return len(self._records)
+
+    @staticmethod
+    def context_signature(chunks: Optional[Sequence[Dict]], fault_info: Optional[Dict]) -> Tuple:
+        """Cevabı belirleyen bağlam: chunk anahtarları (sırasız) + arıza kodu"""
+        keys = frozenset(result_key(chunk) for chunk in chunks or [])
+        return keys, (fault_info or {}).get('code')
+
+    def _check_model(self, model: str):
+        """Embedding modeli değiştiyse eski kayıtları at"""
+        if model != self.model:
+            self._embeddings = np.empty((0, 0), dtype=np.float32)
+            self._records = []
+            self._last_hit = None
+            self.model = model
+
+    def lookup(self, model: str, embedding: np.ndarray, signature: Tuple) -> Optional[str]:
+        """
+        Benzer soru + aynı bağlam için kayıtlı cevap
+
+        Args:
+            model: Embedding model anahtarı
+            embedding: Sorgu embedding'i
+            signature: context_signature() çıktısı
+
+        Returns:
+            Cevap veya None
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        with self._lock:
+            self._check_model(model)
+            if not self._records or self.threshold > 1.0:
+                self.misses += 1
+                return None
+            scores = self._embeddings @ query
+            near_miss = False
+            for i in np.argsort(-scores):
+                if scores[i] < self.threshold:
+                    break
+                record = self._records[i]
+                if record['signature'] == signature:
+                    record['hits'] += 1
+                    record['last_used'] = self.hits + self.misses
+                    self.hits += 1
+                    self._last_hit = record
+                    return record['answer']
+                near_miss = True
+            if near_miss:
+                self.false_hits += 1
+            self.misses += 1
+            return None
+
+    def add(self, model: str, embedding: np.ndarray, signature: Tuple, question: str, answer: str):
+        """Yeni cevabı kaydet (doluysa en uzun süre kullanılmayanı çıkar)"""
+        if self.max_entries <= 0:
+            return
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        with self._lock:
+            self._check_model(model)
+            if len(self._records) >= self.max_entries:
+                self._remove(min(range(len(self._records)), key=lambda i: self._records[i]['last_used']))
+            self._records.append({
+                'question': question,
+                'answer': answer,
+                'signature': signature,
+                'hits': 0,
+                'last_used': self.hits + self.misses,
+            })
+            self._embeddings = (query[None, :] if self._embeddings.size == 0
+                                else np.vstack([self._embeddings, query]))
+
+    def _remove(self, index: int):
+        """Kaydı ve embedding satırını sil"""
+        del self._records[index]
+        self._embeddings = np.delete(self._embeddings, index, axis=0)
+
+    def report_false_hit(self):
+        """
+        Önbellekten verilen son cevap yanlış bulundu (kullanıcı geri bildirimi)
+
+        Sayaç artırılır ve o cevap önbellekten çıkarılır.
+        """
+        with self._lock:
+            self.reported_false += 1
+            for i, record in enumerate(self._records):
+                if record is self._last_hit:
+                    self._remove(i)
+                    break
+            self._last_hit = None
+
+    def clear(self):
+        """Tüm kayıtları sil (sayaçlar korunur)"""
+        with self._lock:
+            self._embeddings = np.empty((0, 0), dtype=np.float32)
+            self._records = []
+            self._last_hit = None
+
+    def stats(self) -> Dict:
+        """İsabet ve yanlış isabet metrikleri"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._records),
+            'lookups': lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'false_hits': self.false_hits,
+            'false_hit_rate': self.false_hits / lookups if lookups else 0.0,
+            'reported_false': self.reported_false,
+            'threshold': self.threshold,
+        }
@@ -0,0 +1,414 @@
+"""
+Parçalı (Sharded) Vektör Deposu
+
+Vektör DB'yi üretici / manuel grubu başına bir VectorStore olacak şekilde
+parçalara böler:
+
+    vectordb/
+    ├── shards.json       # Parça adları (sırası arama sonucunu etkilemez)
+    ├── caterpillar_3406/ # Her parça normal bir VectorStore klasörü
+    └── general/
+
+Sorgu tüm parçalara bir thread veya process havuzu üzerinden dağıtılır,
+her parçanın top_k sonucu heap ile birleştirilir. Bir parça eklenirken
+veya silinirken diğer parçalara dokunulmaz.
+"""
+
+import os
+import re
+import json
+import heapq
+import shutil
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, List, Optional
+import numpy as np
+
+from src.lexical_index import reciprocal_rank_fusion
+from src.rag_engine import VectorStore
+from src.vector_storage import META_FILE
+
+
+SHARDS_FILE = 'shards.json'
+OTHER_SHARD = '_diger'  # Gruplama alanı olmayan chunk'lar
+
+# Process havuzundaki her işçinin açtığı parçalar: yol -> (meta mtime, store)
+_WORKER_STORES: Dict[str, tuple] = {}
+
+
+def is_sharded_store(path: str) -> bool:
+    """Yol parçalı vektör DB klasörü mü"""
+    return os.path.isfile(os.path.join(path, SHARDS_FILE))
+
+
+def shard_name(value) -> str:
+    """Metadata değerinden dosya sistemi için güvenli parça adı"""
+    return re.sub(r'[^\w.-]', '_', str(value)) or OTHER_SHARD
+
+
+def open_vector_store(path: str):
+    """Klasör tipine göre VectorStore veya ShardedVectorStore aç"""
+    if is_sharded_store(path):
+        return ShardedVectorStore(path)
+    store = VectorStore()
+    store.load(path)
+    return store
+
+
+def _worker_store(shard_path: str) -> VectorStore:
+    """İşçi process'te parçayı bir kez aç (diskte değiştiyse yeniden)"""
+    mtime = os.path.getmtime(os.path.join(shard_path, META_FILE))
+    cached = _WORKER_STORES.get(shard_path)
+    if cached is None or cached[0] != mtime:
+        store = VectorStore()
+        store.load(shard_path)
+        _WORKER_STORES[shard_path] = cached = (mtime, store)
+    return cached[1]
+
+
+def _call_shard_worker(shard_path: str, method: str, args: tuple):
+    """Process havuzunda tek parçada bir arama metodunu çalıştır"""
+    return getattr(_worker_store(shard_path), method)(*args)
+
+
+class ShardedVectorStore:
+    """Birden fazla VectorStore parçasında paralel arama"""
+
+    def __init__(self, path: str, executor: str = 'thread', max_workers: Optional[int] = None):
+        """
+        Args:
+            path: Parçalı vektör DB klasörü
+            executor: 'thread' (NumPy çarpımları GIL'i bırakır) veya 'process'
+                (her işçi parçaları diskten mmap ile açar; kaydedilmemiş
+                değişiklikleri görmez)
+            max_workers: Havuz boyutu (None ise CPU sayısı / parça sayısı)
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Bilinmeyen executor: {executor} (geçerli: thread, process)")
+        self.path = path
+        self.executor = executor
+        self.max_workers = max_workers
+        self.shards: Dict[str, VectorStore] = {}
+        self.by: Optional[str] = None  # Parçalamada kullanılan metadata alanı
+        self._dirty = set()  # Kaydedilmemiş değişikliği olan parçalar
+        self._unindexed = set()  # Eklenip indeksi güncellenmemiş parçalar
+        self._pool: Optional[Executor] = None
+
+        if is_sharded_store(path):
+            self.load()
+
+    # ------------------------------------------------------------------ #
+    # Parça yönetimi
+    # ------------------------------------------------------------------ #
+
+    def load(self):
+        """Kayıtlı parçaları aç (embedding'ler mmap, chunk'lar tembel)"""
+        with open(os.path.join(self.path, SHARDS_FILE), 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+        names = registry['shards']
+        self.by = registry.get('by')
+        self.shards = {}
+        for name in names:
+            store = VectorStore()
+            store.load(self._shard_path(name))
+            self.shards[name] = store
+        print(f"✓ Parçalı vektör DB yüklendi: {len(self.shards)} parça, {self.live_count} chunk")
+
+    def add_shard(self, name: str, store: VectorStore):
+        """
+        Parça ekle veya aynı adlı parçayı değiştir
+
+        Sadece bu parçanın klasörü yazılır; diğer parçalar değişmez.
+
+        Args:
+            name: Parça adı (örn: üretici veya jeneratör ID'si)
+            store: Parçanın VectorStore'u
+        """
+        name = shard_name(name)
+        os.makedirs(self.path, exist_ok=True)
+        store.save(self._shard_path(name))
+        self.shards[name] = store
+        self._save_registry()
+
+    def remove_shard(self, name: str) -> bool:
+        """
+        Parçayı sil
+
+        Returns:
+            Parça vardıysa True
+        """
+        store = self.shards.pop(name, None)
+        if store is None:
+            return False
+        store.close()
+        self._save_registry()
+        shutil.rmtree(self._shard_path(name), ignore_errors=True)
+        print(f"🗑️  Parça silindi: {name}")
+        return True
+
+    def delete_source(self, source: str) -> int:
+        """
+        Bir kaynağın chunk'larını içeren parçalardan sil (bkz. VectorStore.delete_source)
+
+        Returns:
+            Silinen chunk sayısı
+        """
+        removed = 0
+        for name, store in self.shards.items():
+            count = store.delete_source(source)
+            if count:
+                self._dirty.add(name)
+                removed += count
+        return removed
+
+    def _shard_for(self, chunk: Dict) -> str:
+        """Chunk'ın gideceği parça (parçalama alanının değeri; yoksa OTHER_SHARD)"""
+        value = chunk.get(self.by) if self.by else None
+        return shard_name(value) if value is not None else OTHER_SHARD
+
+    def _get_or_create_shard(self, name: str, embedding_dim: int) -> VectorStore:
+        """Parçayı getir; yoksa mevcut parçaların indeks ayarlarıyla oluştur"""
+        if name not in self.shards:
+            template = next(iter(self.shards.values()), None)
+            settings = {} if template is None else {
+                'index_type': template.index_type,
+                'index_params': template.index_params,
+                'quantization': template.quantization,
+                'rescore': template.rescore,
+                'rescore_factor': template.rescore_factor,
+            }
+            self.shards[name] = VectorStore(embedding_dim=embedding_dim, **settings)
+        return self.shards[name]
+
+    def add_documents(self, chunks: List[Dict], embeddings: np.ndarray):
+        """
+        Chunk'ları parçalama alanına göre ilgili parçalara ekle
+
+        Olmayan parçalar oluşturulur; aramadan önce build_index(),
+        diske yazmak için save() çağrılmalıdır (sadece değişen parçalar).
+
+        Args:
+            chunks: Chunk metadata listesi
+            embeddings: Chunk embedding'leri
+        """
+        if len(chunks) != len(embeddings):
+            raise ValueError("Chunk sayısı embedding sayısına eşit olmalı")
+        embeddings = np.asarray(embeddings)
+        groups: Dict[str, List[int]] = {}
+        for i, chunk in enumerate(chunks):
+            groups.setdefault(self._shard_for(chunk), []).append(i)
+        for name, ids in groups.items():
+            shard = self._get_or_create_shard(name, embeddings.shape[1])
+            shard.add_documents([chunks[i] for i in ids], embeddings[ids])
+            self._dirty.add(name)
+            self._unindexed.add(name)
+
+    def build_index(self):
+        """Sadece yeni chunk eklenen parçaların arama yapılarını güncelle"""
+        for name in sorted(self._unindexed):
+            if name in self.shards:
+                self.shards[name].build_index()
+        self._unindexed.clear()
+
+    def replace_source(self, source: str, chunks: List[Dict], embeddings: np.ndarray):
+        """
+        Bir kaynağın chunk'larını değiştir
+
+        Eski chunk'lar bulundukları parçadan silinir; yeniler parçalama
+        alanının değerine göre ilgili parçaya (yoksa yeni parçaya) eklenir.
+        """
+        self.delete_source(source)
+        if not chunks:
+            return
+        name = self._shard_for(chunks[0])
+        self._get_or_create_shard(name, np.shape(embeddings)[1]).replace_source(source, chunks, embeddings)
+        self._dirty.add(name)
+
+    def save(self, path: Optional[str] = None):
+        """
+        Değişen parçaları ve parça listesini kaydet
+
+        Args:
+            path: Farklı bir klasöre kaydetmek için (tüm parçalar yazılır)
+        """
+        if path and os.path.abspath(path) != os.path.abspath(self.path):
+            self.path = path
+            self._dirty = set(self.shards)
+        os.makedirs(self.path, exist_ok=True)
+        for name in sorted(self._dirty):
+            self.shards[name].save(self._shard_path(name))
+        self._dirty.clear()
+        self._save_registry()
+
+    @classmethod
+    def from_store(
+        cls,
+        store: VectorStore,
+        path: str,
+        by: str = 'generator_id',
+        **kwargs
+    ) -> 'ShardedVectorStore':
+        """
+        Tek bir VectorStore'u metadata alanına göre parçalara böl
+
+        Gruplama metadata posting listelerinden yapılır; alanı olmayan
+        chunk'lar OTHER_SHARD parçasına gider.
+
+        Args:
+            store: Kaynak VectorStore
+            path: Parçalı DB klasörü
+            by: Gruplama alanı ('generator_id' veya 'source')
+            **kwargs: ShardedVectorStore parametreleri
+        """
+        groups = {}
+        grouped = np.zeros(len(store.chunks), dtype=bool)
+        grouped[store._deleted_ids] = True  # silinmişler hiçbir parçaya girmez
+        for value in store._metadata_index().values(by):
+            ids = store._filter_candidates({by: value})
+            grouped[ids] = True
+            groups.setdefault(shard_name(value), []).append(ids)
+        groups.setdefault(OTHER_SHARD, []).append(np.flatnonzero(~grouped))
+
+        sharded = cls(path, **kwargs)
+        sharded.by = by
+        for name, id_lists in groups.items():
+            ids = np.unique(np.concatenate(id_lists))
+            if len(ids) == 0:
+                continue
+            shard = VectorStore(
+                embedding_dim=store.embedding_dim,
+                index_type=store.index_type,
+                index_params=store.index_params,
+                quantization=store.quantization,
+                rescore=store.rescore,
+                rescore_factor=store.rescore_factor
+            )
+            shard.add_documents([store.chunks[i] for i in ids], np.asarray(store.embeddings[ids]))
+            sharded.add_shard(name, shard)
+        return sharded
+
+    def _shard_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _save_registry(self):
+        """Parça listesini atomik olarak yaz"""
+        registry = os.path.join(self.path, SHARDS_FILE)
+        with open(registry + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'shards': sorted(self.shards), 'by': self.by}, f, ensure_ascii=False, indent=2)
+        os.replace(registry + '.tmp', registry)
+
+    # ------------------------------------------------------------------ #
+    # Arama
+    # ------------------------------------------------------------------ #
+
+    @property
+    def live_count(self) -> int:
+        """Tüm parçalardaki canlı chunk sayısı"""
+        return sum(store.live_count for store in self.shards.values())
+
+    def _executor(self) -> Executor:
+        """Havuzu ilk aramada oluştur"""
+        if self._pool is None:
+            workers = self.max_workers or min(len(self.shards), os.cpu_count() or 1) or 1
+            pool_cls = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+            self._pool = pool_cls(max_workers=workers)
+        return self._pool
+
+    def close(self):
+        """İşçi havuzunu kapat ve parçaların dosyalarını bırak (bkz. VectorStore.close)"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for store in self.shards.values():
+            store.close()
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 3,
+               filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Tüm parçalarda en yakın chunk'ları bul
+
+        Args:
+            query_embedding: Sorgu embedding'i
+            top_k: Kaç sonuç döndürülecek
+            filters: Her parçaya uygulanacak metadata filtreleri
+
+        Returns:
+            En yakın chunk'lar ('shard' alanı ile)
+        """
+        return self.search_batch(np.atleast_2d(query_embedding), top_k, filters)[0]
+
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 3,
+                     filters: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Birden fazla sorguyu tüm parçalarda ara
+
+        Her parça sorguları tek matris çarpımıyla skorlar; parça başına
+        top_k listeleri similarity'ye göre heap ile birleştirilir.
+
+        Returns:
+            Sorgu başına en yakın chunk listeleri (girdi sırasıyla)
+        """
+        query_embeddings = np.atleast_2d(query_embeddings)
+        if not self.shards or top_k <= 0:
+            return [[] for _ in range(len(query_embeddings))]
+
+        per_shard = self._fan_out('search_batch', query_embeddings, top_k, filters)
+        return [
+            self._merge([results[q] for results in per_shard], top_k, 'similarity')
+            for q in range(len(query_embeddings))
+        ]
+
+    def lexical_search(self, query: str, top_k: int = 3, filters: Optional[Dict] = None,
+                       query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Tüm parçalarda BM25 araması (bkz. VectorStore.lexical_search)
+
+        IDF parça içinde hesaplandığı için skorlar parçalar arasında
+        yaklaşık olarak karşılaştırılabilir.
+        """
+        if not self.shards or top_k <= 0:
+            return []
+        per_shard = self._fan_out('lexical_search', query, top_k, filters, query_embedding)
+        return self._merge(per_shard, top_k, 'bm25')
+
+    def hybrid_search(self, query_embedding: np.ndarray, query: str, top_k: int = 3,
+                      filters: Optional[Dict] = None, depth: Optional[int] = None) -> List[Dict]:
+        """
+        Parçalar genelinde birleştirilmiş yoğun ve BM25 listelerini RRF ile birleştir
+
+        Sıralar parça başına değil, birleştirilmiş listeler üzerinden hesaplanır.
+        """
+        depth = depth or max(4 * top_k, 20)
+        dense = self.search(query_embedding, top_k=depth, filters=filters)
+        lexical = self.lexical_search(query, top_k=depth, filters=filters,
+                                      query_embedding=query_embedding)
+        return reciprocal_rank_fusion([dense, lexical], top_k)
+
+    def _fan_out(self, method: str, *args) -> List:
+        """Metodu tüm parçalarda havuz üzerinden çalıştır (parça sırasıyla sonuçlar)"""
+        names = list(self.shards)
+        pool = self._executor()
+        if self.executor == 'process':
+            futures = [
+                pool.submit(_call_shard_worker, self._shard_path(name), method, args)
+                for name in names
+            ]
+        else:
+            futures = [pool.submit(getattr(self.shards[name], method), *args) for name in names]
+        results = [future.result() for future in futures]
+        for name, shard_results in zip(names, results):
+            for result in _flatten(shard_results):
+                result['shard'] = name
+        return results
+
+    @staticmethod
+    def _merge(lists: List[List[Dict]], top_k: int, key: str) -> List[Dict]:
+        """Parça başına sıralı listeleri heap ile birleştir"""
+        return heapq.nlargest(top_k, chain.from_iterable(lists), key=lambda r: r[key])
+
+
+def _flatten(results: List) -> List[Dict]:
+    """Tek sorgu (sonuç listesi) veya toplu sorgu (liste listesi) çıktısını düzleştir"""
+    if results and isinstance(results[0], list):
+        return [result for sub in results for result in sub]
+    return results
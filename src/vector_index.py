@@ -0,0 +1,630 @@
+"""
+Yaklaşık En Yakın Komşu (ANN) İndeksleri
+
+VectorStore'un kaba kuvvet (flat) aramasına alternatif indeksler.
+İndeksler embedding matrisini sahiplenmez; VectorStore'daki normalize
+matris her çağrıda parametre olarak verilir, indeks yalnızca yapısını
+(merkezler, listeler, graf) tutar ve diske kaydeder.
+
+Ortak arayüz:
+    build(embeddings)                       -> sıfırdan oluştur
+    add(embeddings, start_id)               -> start_id'den sonraki satırları ekle
+    search(embeddings, query, top_k,
+           exclude=None)                    -> (indeksler, skorlar)
+    compact(embeddings, keep)               -> silinen satırları çıkar
+    save(path) / load(path)                 -> .npz olarak sakla
+"""
+
+import heapq
+import json
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Skor dizisinde azalan sırada ilk top_k konumu döndür"""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < len(scores):
+        part = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind='stable')]
+
+
+def _is_excluded(ids: np.ndarray, exclude: np.ndarray) -> np.ndarray:
+    """ids içinden maskede işaretli olanlar (maske dışı indeksler geçerli)"""
+    inside = ids < len(exclude)
+    dropped = np.zeros(len(ids), dtype=bool)
+    dropped[inside] = exclude[ids[inside]]
+    return dropped
+
+
+class IVFIndex:
+    """
+    Inverted File (IVF) indeksi
+
+    Embedding'ler k-means ile `n_lists` kümeye ayrılır; sorgu sadece en
+    yakın `nprobe` kümenin listelerindeki vektörlerle karşılaştırılır.
+    Vektörler normalize olduğu için küresel k-means (iç çarpım) kullanılır.
+    """
+
+    index_type = 'ivf'
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        n_iter: int = 20,
+        max_train_points: int = 256,
+        seed: int = 42
+    ):
+        """
+        Args:
+            n_lists: Küme sayısı (None ise ~sqrt(N))
+            nprobe: Sorguda taranacak küme sayısı (yüksek = daha doğru, yavaş)
+            n_iter: k-means iterasyon sayısı
+            max_train_points: Küme başına en fazla eğitim örneği
+            seed: Rastgelelik tohumu
+        """
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.max_train_points = max_train_points
+        self.seed = seed
+        self.centroids = None
+        self.lists = []
+
+    # ------------------------------------------------------------------ #
+    # Oluşturma
+    # ------------------------------------------------------------------ #
+
+    def _train(self, embeddings: np.ndarray):
+        """Küresel k-means ile kaba merkezleri öğren"""
+        n = len(embeddings)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+        rng = np.random.default_rng(self.seed)
+
+        # Büyük korpuslarda eğitim için örneklem yeterli
+        n_train = min(n, n_lists * self.max_train_points)
+        sample_ids = np.sort(rng.choice(n, size=n_train, replace=False))
+        sample = np.asarray(embeddings[sample_ids], dtype=np.float32)
+
+        centroids = sample[rng.choice(n_train, size=n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assign = self._assign(sample, centroids)
+            counts = np.bincount(assign, minlength=n_lists)
+
+            # Küme toplamları: atamaya göre sıralayıp blok blok topla
+            order = np.argsort(assign, kind='stable')
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            nonempty = counts > 0
+            sums[nonempty] = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+
+            # Boş kalan kümeleri rastgele bir örnekle yeniden başlat
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(n_train, size=int(empty.sum()))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = sums / norms
+
+        self.centroids = centroids.astype(np.float32)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        """Her vektörü en yakın merkeze ata (bellek için parça parça)"""
+        assign = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), batch_size):
+            block = np.asarray(vectors[start:start + batch_size], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assign
+
+    def build(self, embeddings: np.ndarray):
+        """
+        İndeksi sıfırdan oluştur
+
+        Args:
+            embeddings: Normalize embedding matrisi
+        """
+        self.centroids = None
+        self.lists = []
+        if len(embeddings) == 0:
+            return
+        self._train(embeddings)
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self.add(embeddings, start_id=0)
+
+    def add(self, embeddings: np.ndarray, start_id: int):
+        """
+        Yeni satırları mevcut merkezlere göre listelere ekle
+
+        Args:
+            embeddings: VectorStore'daki normalize embedding matrisi
+            start_id: İlk yeni satırın indeksi (öncesi zaten indekste)
+        """
+        if start_id >= len(embeddings):
+            return
+        if self.centroids is None:
+            # Henüz eğitilmemiş: ilk ekleme oluşturma sayılır
+            self.build(embeddings)
+            return
+
+        assign = self._assign(embeddings[start_id:], self.centroids)
+        ids = np.arange(start_id, len(embeddings), dtype=np.int64)
+        order = np.argsort(assign, kind='stable')
+        bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+        for list_id in range(len(self.centroids)):
+            new_ids = ids[order[bounds[list_id]:bounds[list_id + 1]]]
+            if len(new_ids):
+                self.lists[list_id] = np.concatenate([self.lists[list_id], new_ids])
+
+    def __len__(self) -> int:
+        return int(sum(len(ids) for ids in self.lists))
+
+    # ------------------------------------------------------------------ #
+    # Arama
+    # ------------------------------------------------------------------ #
+
+    def search(
+        self,
+        embeddings: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        nprobe: Optional[int] = None,
+        exclude: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Yaklaşık en yakın komşuları bul
+
+        Args:
+            embeddings: VectorStore'daki normalize embedding matrisi
+            query: Normalize sorgu vektörü
+            top_k: Kaç sonuç döndürülecek
+            nprobe: Taranacak küme sayısı (None ise self.nprobe)
+            exclude: Atlanacak satırların maskesi (silinmiş chunk'lar veya
+                filtre dışı satırlar). Maskeden uzun indeksler geçerli sayılır;
+                taranan kümelerde top_k dolmazsa izinli satırlar tam skorlanır
+
+        Returns:
+            (satır indeksleri, cosine skorları) - azalan sırada
+        """
+        if self.centroids is None or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probe = top_k_indices(self.centroids @ query, nprobe)
+        candidates = np.concatenate([self.lists[i] for i in probe])
+        if exclude is not None:
+            candidates = candidates[~_is_excluded(candidates, exclude)]
+            if len(candidates) < top_k:
+                # Seçici filtrede taranan kümeler yetmez: izinli satırları tam skorla
+                candidates = np.flatnonzero(~_is_excluded(np.arange(len(self), dtype=np.int64), exclude))
+        if len(candidates) == 0:
+            return candidates, np.empty(0, dtype=np.float32)
+
+        # mmap'li matriste sıralı okuma için aday indekslerini sırala
+        candidates.sort()
+        scores = np.asarray(embeddings[candidates]) @ query
+        best = top_k_indices(scores, top_k)
+        return candidates[best], scores[best]
+
+    def compact(self, embeddings: np.ndarray, keep: np.ndarray):
+        """
+        Silinen satırları listelerden çıkar ve indeksleri yeniden numarala
+
+        Args:
+            embeddings: Sıkıştırılmış (sadece canlı satırlar) matris
+            keep: Eski satır indekslerine göre canlı maske
+        """
+        remap = np.cumsum(keep) - 1
+        self.lists = [remap[ids[keep[ids]]] for ids in self.lists]
+
+    # ------------------------------------------------------------------ #
+    # Kaydetme / yükleme
+    # ------------------------------------------------------------------ #
+
+    def params(self) -> Dict:
+        """Yeniden oluşturma için parametreler"""
+        return {'n_lists': self.n_lists, 'nprobe': self.nprobe, 'n_iter': self.n_iter,
+                'max_train_points': self.max_train_points, 'seed': self.seed}
+
+    def save(self, path: str):
+        """İndeksi .npz dosyasına kaydet (listeler CSR biçiminde)"""
+        lengths = np.array([len(ids) for ids in self.lists], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        flat = np.concatenate(self.lists) if self.lists else np.empty(0, dtype=np.int64)
+        centroids = self.centroids if self.centroids is not None else np.empty((0, 0), np.float32)
+        with open(path, 'wb') as f:
+            np.savez(f, centroids=centroids, list_ids=flat, list_offsets=offsets)
+
+    @classmethod
+    def load(cls, path: str, **params) -> 'IVFIndex':
+        """Kaydedilmiş indeksi yükle"""
+        data = np.load(path)
+        index = cls(**params)
+        if data['centroids'].size:
+            index.centroids = data['centroids'].astype(np.float32)
+            offsets = data['list_offsets']
+            flat = data['list_ids']
+            index.lists = [flat[offsets[i]:offsets[i + 1]].copy() for i in range(len(offsets) - 1)]
+        return index
+
+
+class HNSWIndex:
+    """
+    Hierarchical Navigable Small World (HNSW) graf indeksi
+
+    Her düğüm rastgele bir seviyeye kadar katmanlara eklenir; arama üst
+    katmanlardan açgözlü inip 0. katmanda `ef_search` genişliğinde bir
+    aday kümesiyle ilerler. Ekleme artımlıdır: yeni manueller tüm grafı
+    yeniden kurmadan eklenir.
+    """
+
+    index_type = 'hnsw'
+    # Atlanan düğümler yüzünden ef en fazla bu kata kadar büyütülür; yine
+    # eksik kalırsa izinli satırlar tam skorlanır
+    MAX_EF_EXPANSION = 4
+
+    def __init__(
+        self,
+        M: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 50,
+        seed: int = 42
+    ):
+        """
+        Args:
+            M: Düğüm başına komşu sayısı (0. katmanda 2*M)
+            ef_construction: Eklemede aday kümesi genişliği (yüksek = daha iyi graf)
+            ef_search: Aramada aday kümesi genişliği (yüksek = daha doğru, yavaş)
+            seed: Seviye seçimi için rastgelelik tohumu
+        """
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+        self._level_mult = 1.0 / np.log(max(M, 2))
+
+        # graph[level][node] -> komşu listesi
+        self.graph = []
+        self.node_levels = []
+        self.entry_point = None
+
+    def __len__(self) -> int:
+        return len(self.node_levels)
+
+    def _max_neighbors(self, level: int) -> int:
+        return self.M * 2 if level == 0 else self.M
+
+    # ------------------------------------------------------------------ #
+    # Graf üzerinde arama
+    # ------------------------------------------------------------------ #
+
+    def _search_layer(
+        self,
+        embeddings: np.ndarray,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        level: int
+    ) -> List[Tuple[float, int]]:
+        """
+        Tek katmanda en iyi-önce arama
+
+        Returns:
+            (skor, düğüm) listesi, azalan skor sırasıyla (en fazla ef)
+        """
+        layer = self.graph[level]
+        visited = set(entry_points)
+        entry_scores = np.asarray(embeddings[entry_points]) @ query
+
+        candidates = [(-float(s), n) for s, n in zip(entry_scores, entry_points)]
+        heapq.heapify(candidates)
+        results = [(float(s), n) for s, n in zip(entry_scores, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if -neg_score < results[0][0] and len(results) >= ef:
+                break
+
+            neighbors = [n for n in layer.get(node, ()) if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+
+            # Komşuların skorları tek matris-vektör çarpımıyla hesaplanır
+            scores = np.asarray(embeddings[neighbors]) @ query
+            for score, neighbor in zip(scores.tolist(), neighbors):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    heapq.heappush(results, (score, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def _greedy_descend(self, embeddings: np.ndarray, query: np.ndarray, target_level: int) -> List[int]:
+        """Üst katmanlardan target_level'a kadar tek adaylı açgözlü iniş"""
+        entry = [self.entry_point]
+        for level in range(self._entry_level(), target_level, -1):
+            entry = [self._search_layer(embeddings, query, entry, 1, level)[0][1]]
+        return entry
+
+    def _select_neighbors(
+        self,
+        embeddings: np.ndarray,
+        candidates: List[Tuple[float, int]],
+        max_count: int
+    ) -> List[int]:
+        """
+        Sezgisel komşu seçimi
+
+        Aday, sorguya seçilmiş komşulardan herhangi birinden daha yakınsa
+        alınır; böylece graf farklı yönlere bağlantı korur.
+        """
+        if len(candidates) <= max_count:
+            return [node for _, node in candidates]
+
+        nodes = [node for _, node in candidates]
+        vecs = np.asarray(embeddings[nodes], dtype=np.float32)
+        pairwise = (vecs @ vecs.T).tolist()
+
+        selected = []
+        for i, (score, _) in enumerate(candidates):
+            if len(selected) >= max_count:
+                break
+            if any(pairwise[i][j] > score for j in selected):
+                continue
+            selected.append(i)
+
+        # Sezgisel çok az komşu bıraktıysa en yakınlarla tamamla
+        if len(selected) < max_count:
+            chosen = set(selected)
+            for i in range(len(candidates)):
+                if len(selected) >= max_count:
+                    break
+                if i not in chosen:
+                    selected.append(i)
+                    chosen.add(i)
+        return [nodes[i] for i in selected]
+
+    # ------------------------------------------------------------------ #
+    # Oluşturma / ekleme
+    # ------------------------------------------------------------------ #
+
+    def _insert(self, embeddings: np.ndarray, node: int):
+        """Tek bir düğümü grafa ekle"""
+        query = np.asarray(embeddings[node], dtype=np.float32)
+        level = int(-np.log(1.0 - self._rng.random()) * self._level_mult)
+        self.node_levels.append(level)
+
+        while len(self.graph) <= level:
+            self.graph.append({})
+
+        if self.entry_point is None:
+            for l in range(level + 1):
+                self.graph[l][node] = []
+            self.entry_point = node
+            return
+
+        # Yeni düğümün seviyesinin üstündeki katmanlarda açgözlü iniş
+        entry = self._greedy_descend(embeddings, query, level)
+
+        for l in range(min(level, self._entry_level()), -1, -1):
+            found = self._search_layer(embeddings, query, entry, self.ef_construction, l)
+            neighbors = self._select_neighbors(embeddings, found, self.M)
+            self.graph[l][node] = neighbors
+
+            # Ters bağlantılar; komşu sayısı aşılırsa budanır
+            max_count = self._max_neighbors(l)
+            for neighbor in neighbors:
+                links = self.graph[l][neighbor]
+                links.append(node)
+                if len(links) > max_count:
+                    vec = np.asarray(embeddings[neighbor])
+                    scores = np.asarray(embeddings[links]) @ vec
+                    ranked = sorted(zip(scores.tolist(), links), reverse=True)
+                    self.graph[l][neighbor] = self._select_neighbors(embeddings, ranked, max_count)
+
+            entry = [n for _, n in found]
+
+        # Yeni üst katmanlar açıldıysa düğüm oralarda yalnızdır
+        for l in range(self._entry_level() + 1, level + 1):
+            self.graph[l][node] = []
+        if level > self._entry_level():
+            self.entry_point = node
+
+    def _entry_level(self) -> int:
+        return self.node_levels[self.entry_point]
+
+    def build(self, embeddings: np.ndarray):
+        """
+        İndeksi sıfırdan oluştur
+
+        Args:
+            embeddings: Normalize embedding matrisi
+        """
+        self._rng = np.random.default_rng(self.seed)
+        self.graph = []
+        self.node_levels = []
+        self.entry_point = None
+        self.add(embeddings, start_id=0)
+
+    def add(self, embeddings: np.ndarray, start_id: int):
+        """
+        Yeni satırları grafa artımlı ekle
+
+        Args:
+            embeddings: VectorStore'daki normalize embedding matrisi
+            start_id: İlk yeni satırın indeksi (öncesi zaten indekste)
+        """
+        if start_id != len(self):
+            raise ValueError("HNSW düğümleri sırayla eklenmeli")
+        for node in range(start_id, len(embeddings)):
+            self._insert(embeddings, node)
+
+    def search(
+        self,
+        embeddings: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        ef_search: Optional[int] = None,
+        exclude: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Yaklaşık en yakın komşuları bul
+
+        Args:
+            embeddings: VectorStore'daki normalize embedding matrisi
+            query: Normalize sorgu vektörü
+            top_k: Kaç sonuç döndürülecek
+            ef_search: Aday kümesi genişliği (None ise self.ef_search)
+            exclude: Atlanacak satırların maskesi (silinmiş chunk'lar veya
+                filtre dışı satırlar). Atlanan düğümler gezinmede kullanılır
+                ama sonuca girmez; ef MAX_EF_EXPANSION katına kadar büyütülüp
+                yine top_k dolmazsa izinli satırlar tam skorlanır
+
+        Returns:
+            (satır indeksleri, cosine skorları) - azalan sırada
+        """
+        if self.entry_point is None or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        ef = max(ef_search or self.ef_search, top_k)
+        max_ef = min(len(self), self.MAX_EF_EXPANSION * ef)
+        entry = self._greedy_descend(embeddings, query, 0)
+        while True:
+            found = self._search_layer(embeddings, query, entry, ef, 0)
+            if exclude is not None:
+                ids = np.array([n for _, n in found], dtype=np.int64)
+                dropped = _is_excluded(ids, exclude)
+                found = [item for item, drop in zip(found, dropped) if not drop]
+            # Silinenler / filtre yüzünden eksik kaldıysa aramayı sınırlı genişlet
+            if len(found) >= top_k or ef >= max_ef:
+                break
+            ef = min(ef * 2, max_ef)
+        if len(found) < top_k and exclude is not None:
+            # Geniş graf gezintisi düz taramadan yavaş: izinli satırları tam skorla
+            allowed = np.flatnonzero(~_is_excluded(np.arange(len(self), dtype=np.int64), exclude))
+            scores = np.asarray(embeddings[allowed]) @ query
+            best = top_k_indices(scores, top_k)
+            return allowed[best], scores[best].astype(np.float32)
+        found = found[:top_k]
+
+        ids = np.array([n for _, n in found], dtype=np.int64)
+        scores = np.array([s for s, _ in found], dtype=np.float32)
+        return ids, scores
+
+    def compact(self, embeddings: np.ndarray, keep: np.ndarray):
+        """
+        Silinen düğümleri çıkar
+
+        Graf bağlantıları silinen düğümler üzerinden geçtiği için graf
+        canlı satırlardan yeniden kurulur (sıkıştırma nadir çalışır).
+
+        Args:
+            embeddings: Sıkıştırılmış (sadece canlı satırlar) matris
+            keep: Eski satır indekslerine göre canlı maske
+        """
+        self.build(embeddings)
+
+    # ------------------------------------------------------------------ #
+    # Kaydetme / yükleme
+    # ------------------------------------------------------------------ #
+
+    def params(self) -> Dict:
+        """Yeniden oluşturma için parametreler"""
+        return {'M': self.M, 'ef_construction': self.ef_construction,
+                'ef_search': self.ef_search, 'seed': self.seed}
+
+    def save(self, path: str):
+        """Grafı .npz dosyasına kaydet (her katman CSR biçiminde)"""
+        arrays = {
+            'node_levels': np.asarray(self.node_levels, dtype=np.int8),
+            'entry_point': np.int64(-1 if self.entry_point is None else self.entry_point),
+            'rng_state': np.array(json.dumps(self._rng.bit_generator.state)),
+        }
+        for level, layer in enumerate(self.graph):
+            nodes = np.array(sorted(layer), dtype=np.int64)
+            lengths = [len(layer[n]) for n in nodes]
+            arrays[f'l{level}_nodes'] = nodes
+            arrays[f'l{level}_offsets'] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            arrays[f'l{level}_links'] = np.array(
+                [x for n in nodes for x in layer[n]], dtype=np.int64
+            )
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str, **params) -> 'HNSWIndex':
+        """Kaydedilmiş grafı yükle"""
+        data = np.load(path)
+        index = cls(**params)
+        index.node_levels = data['node_levels'].astype(int).tolist()
+        entry = int(data['entry_point'])
+        index.entry_point = None if entry < 0 else entry
+        index._rng.bit_generator.state = json.loads(str(data['rng_state']))
+
+        level = 0
+        while f'l{level}_nodes' in data:
+            nodes = data[f'l{level}_nodes'].tolist()
+            offsets = data[f'l{level}_offsets']
+            links = data[f'l{level}_links'].tolist()
+            index.graph.append({
+                node: links[offsets[i]:offsets[i + 1]] for i, node in enumerate(nodes)
+            })
+            level += 1
+        return index
+
+
+# index_type ayarı -> indeks sınıfı
+INDEX_TYPES = {
+    'ivf': IVFIndex,
+    'hnsw': HNSWIndex,
+}
+
+
+def create_index(index_type: str, **params):
+    """
+    Ayar değerine göre ANN indeksi oluştur
+
+    Args:
+        index_type: 'ivf' veya 'hnsw' (flat için indeks gerekmez)
+        **params: İndeks sınıfının parametreleri
+
+    Returns:
+        İndeks nesnesi
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Bilinmeyen indeks tipi: {index_type} "
+            f"(geçerli: flat, {', '.join(INDEX_TYPES)})"
+        )
+    return INDEX_TYPES[index_type](**params)
+
+
+def load_index(index_type: str, path: str, **params):
+    """
+    Kaydedilmiş ANN indeksini yükle
+
+    Args:
+        index_type: Kayıttaki indeks tipi
+        path: İndeks dosyası (.npz)
+        **params: İndeks sınıfının parametreleri
+
+    Returns:
+        İndeks nesnesi
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Bilinmeyen indeks tipi: {index_type}")
+    return INDEX_TYPES[index_type].load(path, **params)
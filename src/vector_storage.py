@@ -0,0 +1,380 @@
+"""
+Disk Tabanlı Vektör Deposu Formatı
+
+Vektör DB'yi tek bir pickle yerine bir klasör olarak saklar:
+
+    vectordb/
+    ├── meta.json         # Format sürümü, embedding boyutu, chunk sayısı
+    ├── embeddings.npy    # Normalize float32 matris (mmap ile açılır)
+    ├── chunks.jsonl      # Her satırda bir chunk (metin + metadata)
+    ├── chunk_offsets.npy # chunks.jsonl içindeki bayt ofsetleri (n + 1)
+    ├── index.npz         # (opsiyonel) ANN indeks yapısı, bkz. vector_index
+    ├── embeddings_q.npy  # (opsiyonel) float16/int8 sıkıştırılmış matris
+    ├── quantizer.npz     # (opsiyonel) int8 ölçek/ofset, bkz. quantization
+    ├── metadata.npz      # Metadata posting listeleri, bkz. metadata_index
+    └── lexical.npz       # BM25 ters indeksi, bkz. lexical_index
+
+Embedding matrisi `np.load(mmap_mode='r')` ile açıldığı için açılış süresi
+ve bellek kullanımı korpus boyutuyla büyümez; chunk metinleri yalnızca
+arama sonucunda ihtiyaç duyulduğunda diskten okunur.
+
+Bellekteki tarafta EmbeddingBuffer ve LazyChunkList eklemeleri amortize
+O(yeni chunk) maliyetle kabul eder; mevcut veri yeniden kopyalanmaz.
+"""
+
+import os
+import json
+import pickle
+import threading
+from typing import Dict, Iterator, List, Sequence
+import numpy as np
+
+
+FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+EMBEDDINGS_FILE = 'embeddings.npy'
+CHUNKS_FILE = 'chunks.jsonl'
+OFFSETS_FILE = 'chunk_offsets.npy'
+INDEX_FILE = 'index.npz'
+QUANTIZED_FILE = 'embeddings_q.npy'
+QUANTIZER_FILE = 'quantizer.npz'
+METADATA_FILE = 'metadata.npz'
+LEXICAL_FILE = 'lexical.npz'
+
+
+class EmbeddingBuffer:
+    """
+    Kapasitesi ikiye katlanarak büyüyen embedding matrisi
+
+    Ekleme, kapasite yettiği sürece sadece yeni satırları kopyalar;
+    kapasite dolunca bir kez iki katına çıkarılır (amortize O(yeni)).
+    Diskten mmap ile açılan matris ilk eklemeye kadar kopyalanmaz.
+    """
+
+    def __init__(self, embedding_dim: int, capacity: int = 1024, dtype=np.float32):
+        """
+        Args:
+            embedding_dim: Embedding boyutu
+            capacity: Başlangıç kapasitesi (satır)
+            dtype: Saklama tipi (float32; sıkıştırılmış kodlar için float16/uint8)
+        """
+        self.embedding_dim = embedding_dim
+        self._data = np.empty((capacity, embedding_dim), dtype=dtype)
+        self._size = 0
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'EmbeddingBuffer':
+        """Mevcut matrisi kopyalamadan sar (mmap dahil)"""
+        buffer = cls.__new__(cls)
+        buffer.embedding_dim = array.shape[1]
+        buffer._data = array
+        buffer._size = len(array)
+        return buffer
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def array(self) -> np.ndarray:
+        """Dolu satırların görünümü (kopya değil)"""
+        return self._data[:self._size]
+
+    def append(self, rows: np.ndarray) -> int:
+        """
+        Satırları sona ekle
+
+        Args:
+            rows: (n x embedding_dim) matris
+
+        Returns:
+            İlk eklenen satırın indeksi
+        """
+        rows = np.asarray(rows, dtype=self._data.dtype).reshape(-1, self.embedding_dim)
+        start = self._size
+        needed = start + len(rows)
+
+        # Salt okunur (mmap) veri ilk eklemede yazılabilir belleğe taşınır
+        if needed > self.capacity or not self._data.flags.writeable:
+            capacity = max(needed, 2 * self.capacity, 1024)
+            data = np.empty((capacity, self.embedding_dim), dtype=self._data.dtype)
+            data[:start] = self._data[:start]
+            self._data = data
+
+        self._data[start:needed] = rows
+        self._size = needed
+        return start
+
+
+class LazyChunkList(Sequence):
+    """
+    chunks.jsonl üzerinde ofset indeksli, tembel okunan chunk listesi
+
+    Diskteki chunk'lar sadece erişildiğinde okunur; sonradan eklenenler
+    kaydedilene kadar bellekte tutulur. Dosya liste kapatılana kadar açık
+    kalır: başka bir yazıcı DB'yi yeniden kaydetse (os.replace) bile bu
+    liste, ofsetleri ve mmap'li embedding'leriyle aynı sürümü okur.
+    """
+
+    def __init__(self, chunks_path: str, offsets: np.ndarray):
+        """
+        Args:
+            chunks_path: chunks.jsonl dosya yolu
+            offsets: Satır başlangıç ofsetleri (son eleman dosya sonu)
+        """
+        self.chunks_path = chunks_path
+        self.offsets = offsets
+        self.appended = []
+        self._file = open(chunks_path, 'rb')
+        self._lock = threading.Lock()
+
+    def _disk_len(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __len__(self) -> int:
+        return self._disk_len() + len(self.appended)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("Chunk indeksi aralık dışında")
+
+        if idx >= self._disk_len():
+            return self.appended[idx - self._disk_len()]
+
+        return self._read(idx)
+
+    def _read(self, idx: int) -> Dict:
+        """Diskteki idx. chunk (açık dosyadan; aramalar thread'lerden gelebilir)"""
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"Chunk dosyası kapatıldı: {self.chunks_path}")
+            self._file.seek(start)
+            data = self._file.read(end - start)
+        return json.loads(data.decode('utf-8'))
+
+    def __iter__(self) -> Iterator[Dict]:
+        # Tam taramada ofsetler sıralı: okuma diskte sırayla ilerler
+        for idx in range(self._disk_len()):
+            yield self._read(idx)
+        yield from self.appended
+
+    def close(self):
+        """Dosyayı kapat (Windows'ta açık dosyanın üzerine yazılamaz / silinemez)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def extend(self, chunks: List[Dict]):
+        """Yeni chunk'ları ekle (diskteki dosyaya dokunmadan)"""
+        self.appended.extend(chunks)
+
+
+def is_directory_store(path: str) -> bool:
+    """Yol, klasör formatında bir vektör DB mi?"""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def _atomic_write(path: str, write_fn):
+    """Geçici dosyaya yazıp yerine taşı (mmap ile açık eski dosya bozulmaz)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        write_fn(f)
+    os.replace(tmp_path, path)
+
+
+def save_directory(
+    path: str,
+    embeddings: np.ndarray,
+    chunks: Sequence[Dict],
+    embedding_dim: int,
+    extra_meta: Dict = None
+):
+    """
+    Vektör DB'yi klasör formatında kaydet
+
+    Args:
+        path: Hedef klasör
+        embeddings: Normalize embedding matrisi
+        chunks: Chunk listesi (embedding sırasıyla)
+        embedding_dim: Embedding boyutu
+        extra_meta: meta.json'a eklenecek ek alanlar
+    """
+    os.makedirs(path, exist_ok=True)
+
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    _atomic_write(os.path.join(path, EMBEDDINGS_FILE), lambda f: np.save(f, embeddings))
+
+    offsets = [0]
+
+    def write_chunks(f):
+        for chunk in chunks:
+            line = json.dumps(chunk, ensure_ascii=False).encode('utf-8') + b'\n'
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    _atomic_write(os.path.join(path, CHUNKS_FILE), write_chunks)
+    _atomic_write(
+        os.path.join(path, OFFSETS_FILE),
+        lambda f: np.save(f, np.asarray(offsets, dtype=np.int64))
+    )
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'embedding_dim': embedding_dim,
+        'count': len(offsets) - 1,
+    }
+    meta.update(extra_meta or {})
+
+    # meta.json en son yazılır: yarım kalan kayıt geçerli sayılmaz
+    _atomic_write(
+        os.path.join(path, META_FILE),
+        lambda f: f.write(json.dumps(meta, indent=2).encode('utf-8'))
+    )
+
+
+def load_directory(path: str) -> Dict:
+    """
+    Klasör formatındaki vektör DB'yi aç
+
+    Args:
+        path: Vektör DB klasörü
+
+    Returns:
+        {'embeddings': memmap, 'chunks': LazyChunkList, 'meta': dict}
+    """
+    with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('format_version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen vektör DB formatı: {meta.get('format_version')}")
+
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode='r')
+    # Ofsetler küçük (chunk başına 8 bayt): belleğe alınır, dosyası açık kalmaz
+    offsets = np.load(os.path.join(path, OFFSETS_FILE))
+    chunks = LazyChunkList(os.path.join(path, CHUNKS_FILE), offsets)
+
+    return {'embeddings': embeddings, 'chunks': chunks, 'meta': meta}
+
+
+def save_quantized(path: str, codes: np.ndarray, state: Dict):
+    """
+    Sıkıştırılmış embedding'leri ve kuantizasyon parametrelerini kaydet
+
+    Args:
+        path: Vektör DB klasörü
+        codes: float16/uint8 kod matrisi
+        state: ScalarQuantizer.state() çıktısı
+    """
+    _atomic_write(os.path.join(path, QUANTIZED_FILE), lambda f: np.save(f, codes))
+    _atomic_write(os.path.join(path, QUANTIZER_FILE), lambda f: np.savez(f, **state))
+
+
+def load_quantized(path: str):
+    """
+    Sıkıştırılmış embedding'leri belleğe yükle
+
+    Returns:
+        (kod matrisi, kuantizasyon parametreleri) veya dosya yoksa (None, None)
+    """
+    codes_path = os.path.join(path, QUANTIZED_FILE)
+    state_path = os.path.join(path, QUANTIZER_FILE)
+    if not (os.path.isfile(codes_path) and os.path.isfile(state_path)):
+        return None, None
+    with np.load(state_path) as data:
+        state = {key: data[key] for key in data.files}
+    return np.load(codes_path), state
+
+
+def _save_state(path: str, file_name: str, state: Dict):
+    """Yardımcı indeks dizilerini .npz olarak atomik yaz"""
+    _atomic_write(os.path.join(path, file_name), lambda f: np.savez(f, **state))
+
+
+def _load_state(path: str, file_name: str):
+    """Yardımcı indeks dizilerini oku (dosya yoksa None)"""
+    state_path = os.path.join(path, file_name)
+    if not os.path.isfile(state_path):
+        return None
+    with np.load(state_path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def save_metadata(path: str, state: Dict):
+    """
+    Metadata posting listelerini kaydet
+
+    Args:
+        path: Vektör DB klasörü
+        state: MetadataIndex.state() çıktısı
+    """
+    _save_state(path, METADATA_FILE, state)
+
+
+def load_metadata(path: str):
+    """
+    Metadata posting listelerini oku
+
+    Returns:
+        MetadataIndex.state() dizileri veya dosya yoksa None
+    """
+    return _load_state(path, METADATA_FILE)
+
+
+def save_lexical(path: str, state: Dict):
+    """
+    BM25 ters indeksini kaydet
+
+    Args:
+        path: Vektör DB klasörü
+        state: BM25Index.state() çıktısı
+    """
+    _save_state(path, LEXICAL_FILE, state)
+
+
+def load_lexical(path: str):
+    """
+    BM25 ters indeksini oku
+
+    Returns:
+        BM25Index.state() dizileri veya dosya yoksa None
+    """
+    return _load_state(path, LEXICAL_FILE)
+
+
+def read_legacy_pickle(path: str) -> Dict:
+    """Eski tek dosyalık vectordb.pkl içeriğini oku"""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def convert_legacy_pickle(pkl_path: str, out_dir: str) -> int:
+    """
+    Eski vectordb.pkl dosyasını klasör formatına dönüştür
+
+    Args:
+        pkl_path: Eski pickle dosyası
+        out_dir: Yeni vektör DB klasörü
+
+    Returns:
+        Dönüştürülen chunk sayısı
+    """
+    # Döngüsel import'u önlemek için burada
+    from src.rag_engine import VectorStore
+
+    store = VectorStore()
+    store.load(pkl_path)
+    store.save(out_dir)
+    return len(store.chunks)
+
@@ -0,0 +1,148 @@
+"""
+Ortak Test Yardımcıları
+
+Ollama istemcisi ve embedding modeli yerine kullanılan sahte nesneler;
+servis veya model indirme gerekmez.
+"""
+
+import os
+import sys
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import ollama
+import pytest
+
+
+class FakeOllama:
+    """
+    Sahte Ollama sunucusu: cevabı ayarlanır, gelen istekler kaydedilir
+
+    Testte alanlar değiştirilerek davranış ayarlanır:
+        pieces: akışta dönen parçalar (liste veya istek sayısını alan fonksiyon)
+        error: chat çağrısında fırlatılacak hata (None = yok)
+        first_load: ilk istekte model yükleme süresi (saniye), sonrakiler 1 ms;
+            None ise cevaplarda load_duration yoktur
+    """
+
+    def __init__(self):
+        self.pieces = ['Tamam.']
+        self.error = None
+        self.first_load = None
+        self.requests = []
+
+    @property
+    def calls(self) -> int:
+        """Şimdiye kadar yapılan chat isteği sayısı"""
+        return len(self.requests)
+
+    def _respond(self, model, messages, options, stream, keep_alive):
+        """İsteği kaydet, cevap parçalarını ve son (done) parçayı hazırla"""
+        self.requests.append({'model': model, 'messages': messages, 'options': options,
+                              'stream': stream, 'keep_alive': keep_alive})
+        if self.error is not None:
+            raise self.error
+        pieces = self.pieces(self.calls) if callable(self.pieces) else self.pieces
+        done = {'message': {'content': ''}, 'done': True}
+        if self.first_load is not None:
+            load = self.first_load if self.calls == 1 else 0.001
+            done['load_duration'] = load * 1e9
+        return [{'message': {'content': piece}} for piece in pieces], done
+
+    def client_class(self):
+        """ollama.Client yerine geçen sınıf"""
+        fake = self
+
+        class Client:
+            def __init__(self, host=None, **kwargs):
+                self.host = host
+
+            def list(self):
+                return {'models': []}
+
+            def chat(self, model, messages, options=None, stream=False, keep_alive=None):
+                parts, done = fake._respond(model, messages, options, stream, keep_alive)
+                if not stream:
+                    content = "".join(part['message']['content'] for part in parts)
+                    return {**done, 'message': {'content': content}}
+                return iter(parts + [done])
+
+        return Client
+
+    def async_client_class(self):
+        """ollama.AsyncClient yerine geçen sınıf"""
+        fake = self
+
+        class AsyncClient:
+            def __init__(self, host=None, **kwargs):
+                self.host = host
+
+            async def chat(self, model, messages, options=None, stream=False, keep_alive=None):
+                parts, done = fake._respond(model, messages, options, stream, keep_alive)
+
+                async def stream_parts():
+                    for part in parts + [done]:
+                        yield part
+                return stream_parts()
+
+            async def close(self):
+                pass
+
+        return AsyncClient
+
+
+class FakeEmbedder:
+    """
+    Model indirmeden sabit embedding'ler
+
+    Args:
+        vectors: sorgu metni -> vektör (None = her sorguya birler vektörü)
+        dim: birler vektörünün boyutu
+        corpus: encode_corpus'un sırayla döndüreceği embedding'ler
+    """
+    model_name = 'fake'
+    backend = 'torch'
+
+    def __init__(self, vectors=None, dim=384, corpus=None):
+        self.vectors = vectors
+        self.dim = dim
+        self.corpus = corpus
+
+    def encode_single(self, text):
+        if self.vectors is not None:
+            return self.vectors[text]
+        return np.ones(self.dim, dtype=np.float32)
+
+    def encode_corpus(self, texts, batch_size=32, workers=1):
+        return self.corpus[:len(texts)]
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch):
+    """ollama.Client ve ollama.AsyncClient'ı aynı sahte sunucuya bağla"""
+    fake = FakeOllama()
+    monkeypatch.setattr(ollama, 'Client', fake.client_class())
+    monkeypatch.setattr(ollama, 'AsyncClient', fake.async_client_class())
+    return fake
+
+
+@pytest.fixture
+def fake_embedder():
+    """Ayarlanabilir sahte embedder üreticisi: fake_embedder(vectors=..., corpus=...)"""
+    return FakeEmbedder
+
+
+@pytest.fixture
+def oil_chunks():
+    """Yağ değişimi hakkında tek chunk'lık bağlam"""
+    return [{'text': 'Yağ tahliye tapasını açın. Yağın boşalmasını bekleyin.', 'source': 'bakim.pdf',
+             'chunk_id': 4, 'similarity': 0.8}]
+
+
+@pytest.fixture
+def fuel_chunks():
+    """Yakıt filtresi hakkında tek chunk'lık bağlam"""
+    return [{'text': 'Yakıt filtresi 500 saatte değişir...', 'source': 'bakim.pdf', 'chunk_id': 9,
+             'similarity': 0.7}]
@@ -0,0 +1,92 @@
+"""
+Asenkron Ollama İstemcisi Testleri
+
+Ollama'nın AsyncClient'ı gecikmeli sahte bir akışla değiştirilir; servis
+gerekmez.
+"""
+
+import os
+import sys
+import asyncio
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ollama
+
+from src.async_llm import AsyncOllamaLLM
+
+
+class FakeAsyncClient:
+    """Aynı anda kaç isteğin işlendiğini ölçen sahte istemci"""
+
+    instances = []
+    active = 0
+    peak = 0
+
+    def __init__(self, host=None, **kwargs):
+        self.host = host
+        self.kwargs = kwargs
+        self.closed = False
+        FakeAsyncClient.instances.append(self)
+
+    async def chat(self, model, messages, options, stream=False):
+        assert stream
+        prompt = messages[-1]['content']
+
+        async def parts():
+            FakeAsyncClient.active += 1
+            FakeAsyncClient.peak = max(FakeAsyncClient.peak, FakeAsyncClient.active)
+            try:
+                for word in ["Cevap:", " ", prompt]:
+                    await asyncio.sleep(0.01)
+                    yield {'message': {'content': word}}
+            finally:
+                FakeAsyncClient.active -= 1
+
+        return parts()
+
+    async def close(self):
+        self.closed = True
+
+
+def test_concurrent_requests_share_client(monkeypatch):
+    """İstekler aynı istemciyi paylaşmalı ve eşzamanlılık sınırına uymalı"""
+    monkeypatch.setattr(ollama, 'AsyncClient', FakeAsyncClient)
+    FakeAsyncClient.instances, FakeAsyncClient.active, FakeAsyncClient.peak = [], 0, 0
+
+    llm = AsyncOllamaLLM(model='test', url='http://ollama-host:11434', max_concurrency=3)
+
+    async def run():
+        answers = await asyncio.gather(*(llm.agenerate(f"soru {i}") for i in range(10)))
+        await llm.aclose()
+        return answers
+
+    answers = asyncio.run(run())
+    assert answers == [f"Cevap: soru {i}" for i in range(10)]
+    assert len(FakeAsyncClient.instances) == 1
+    client = FakeAsyncClient.instances[0]
+    assert client.host == 'http://ollama-host:11434' and client.closed
+    assert client.kwargs['limits'].max_keepalive_connections == 3
+    assert 1 < FakeAsyncClient.peak <= 3
+    assert llm.in_flight == 0
+    assert llm.last_timing['tokens'] == 3
+    print("✓ Eşzamanlı istekler")
+
+
+def test_error_becomes_message(monkeypatch):
+    """Bağlantı hatası kullanıcı mesajı olarak dönmeli"""
+    class FailingClient(FakeAsyncClient):
+        async def chat(self, **kwargs):
+            raise ConnectionError("Failed to connect to Ollama")
+
+    monkeypatch.setattr(ollama, 'AsyncClient', FailingClient)
+    llm = AsyncOllamaLLM(model='test')
+    answer = asyncio.run(llm.agenerate("soru"))
+    assert answer.startswith("Ollama hatası") and llm.in_flight == 0
+    print("✓ Hata mesajı")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
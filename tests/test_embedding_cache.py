@@ -0,0 +1,108 @@
+"""
+Embedding Önbelleği Testleri
+"""
+
+import os
+import sys
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.embedding_cache import EmbeddingCache, QueryEmbeddingCache, normalize_query
+
+
+class CountingEncoder:
+    """Kaç metnin encode edildiğini sayan deterministik embedding fonksiyonu"""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return np.stack([
+            np.random.default_rng(abs(hash(text)) % (2 ** 32)).standard_normal(self.dim)
+            for text in texts
+        ]).astype(np.float32)
+
+
+def test_only_new_chunks_are_encoded(tmp_path):
+    """İkinci training'de sadece yeni chunk'lar modele gitmeli"""
+    path = str(tmp_path / 'cache' / 'embeddings.sqlite')
+    encoder = CountingEncoder()
+    first = ["Yağ değişimi", "Filtre değişimi", "Yağ değişimi"]
+
+    cache = EmbeddingCache(path)
+    embeddings = cache.encode('model-a', first, encoder)
+    assert embeddings.shape == (3, 8)
+    assert encoder.encoded == ["Yağ değişimi", "Filtre değişimi"]  # Tekrar bir kez
+    np.testing.assert_array_equal(embeddings[0], embeddings[2])
+    cache.close()
+
+    # Yeni oturum: önbellek diskten okunur
+    encoder.encoded.clear()
+    cache = EmbeddingCache(path)
+    second = first + ["Yeni manuel chunk'ı"]
+    again = cache.encode('model-a', second, encoder)
+    assert encoder.encoded == ["Yeni manuel chunk'ı"]
+    np.testing.assert_array_equal(again[:3], embeddings)
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_rate == 0.75
+
+    # Başka model aynı metinler için önbelleği paylaşmaz
+    encoder.encoded.clear()
+    cache.encode('model-b', first[:1], encoder)
+    assert encoder.encoded == ["Yağ değişimi"]
+    assert len(cache) == 4
+
+    cache.clear('model-b')
+    assert len(cache) == 3
+    cache.close()
+    print("✓ Sadece yeni chunk'lar encode edildi")
+
+
+def test_query_cache_lru_and_model_change():
+    """Normalize anahtar, LRU çıkarma ve model değişiminde boşaltma"""
+    assert normalize_query("  YAĞ   Değişimi\tNASIL? ") == "yağ değişimi nasıl?"
+    assert normalize_query("İLK ÇALIŞTIRMA") == "ilk çalıştırma"
+
+    encoder = CountingEncoder()
+    cache = QueryEmbeddingCache(max_size=2)
+    first = cache.encode('model-a', ["Yağ değişimi nasıl yapılır?"], encoder)
+    again = cache.get('model-a', "yağ  değişimi NASIL yapılır?")
+    np.testing.assert_array_equal(again, first[0])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Kapasite dolunca en uzun süre kullanılmayan çıkar
+    cache.encode('model-a', ["500 saatlik bakım", "E101"], encoder)
+    assert len(cache) == 2
+    assert cache.get('model-a', "yağ değişimi nasıl yapılır?") is None
+    assert cache.get('model-a', "e101") is not None
+
+    # Model değişince eski embedding'ler kullanılmaz
+    assert cache.get('model-b', "E101") is None
+    assert len(cache) == 0
+
+    # Boyut 0 = önbellek kapalı
+    disabled = QueryEmbeddingCache(max_size=0)
+    disabled.encode('model-a', ["E101", "E101"], encoder)
+    assert len(disabled) == 0 and disabled.hits == 0
+    print("✓ Sorgu LRU önbelleği")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("Embedding Önbelleği Testleri")
+    print("=" * 60 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_only_new_chunks_are_encoded(Path(tmp))
+    test_query_cache_lru_and_model_change()
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
@@ -0,0 +1,111 @@
+"""
+Paralel Embedding Hattı Testleri
+"""
+
+import os
+import sys
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.embedding_backends import cache_key, check_backend, pool_embeddings
+from src.embedding_pipeline import encode_bucketed, length_buckets, token_lengths
+from src.rag_engine import RAGEngine, training_settings
+
+
+def test_length_buckets_group_similar_lengths():
+    """Batch'ler uzunluğa göre sıralı ve tüm indeksleri bir kez içermeli"""
+    lengths = np.array([5, 300, 7, 250, 6, 280, 4])
+    batches = length_buckets(lengths, batch_size=3)
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lengths)))
+    assert set(batches[0].tolist()) == {1, 3, 5}  # Uzunlar önce
+    assert lengths[batches[1]].max() <= lengths[batches[0]].min()
+    print("✓ Uzunluk kovaları")
+
+
+def test_encode_bucketed_restores_order():
+    """Kovalarla encode edilen embedding'ler girdi sırasına dönmeli"""
+    texts = [("kelime " * n).strip() for n in [3, 40, 1, 25, 8, 60, 2]]
+    seen_batches = []
+
+    def encode_batch(batch):
+        seen_batches.append(batch)
+        return np.array([[len(text.split()), 1.0] for text in batch], dtype=np.float32)
+
+    lengths = token_lengths(object(), texts)  # Tokenizer yok: kelime sayısı
+    embeddings = encode_bucketed(texts, lengths, encode_batch, batch_size=2, progress=False)
+    assert embeddings[:, 0].tolist() == [3, 40, 1, 25, 8, 60, 2]
+    assert len(seen_batches) == 4
+    assert [len(t.split()) for t in seen_batches[0]] == [60, 40]
+    print("✓ Girdi sırası korundu")
+
+
+def test_backend_selection():
+    """Arka uç adı doğrulanmalı, önbellek anahtarları ayrışmalı"""
+    for backend in ('torch', 'onnx', 'onnx-int8'):
+        check_backend(backend)
+    try:
+        check_backend('tensorrt')
+        assert False, "Geçersiz arka uç kabul edildi"
+    except ValueError:
+        pass
+
+    # torch eski önbellek kayıtlarıyla uyumlu, int8 ayrı anahtar kullanır
+    assert cache_key('all-MiniLM-L6-v2', 'torch') == 'all-MiniLM-L6-v2'
+    assert cache_key('all-MiniLM-L6-v2', 'onnx-int8') == 'all-MiniLM-L6-v2@onnx-int8'
+    print("✓ Arka uç seçimi")
+
+
+def test_onnx_pooling_ignores_padding():
+    """ONNX arka ucunun pooling'i padding token'larını saymamalı (sentence-transformers ile aynı)"""
+    hidden = np.array([[[1.0, 0.0], [3.0, 4.0], [100.0, 100.0]],
+                       [[0.0, 2.0], [0.0, 0.0], [0.0, 0.0]]])
+    mask = np.array([[1, 1, 0], [1, 0, 0]])
+
+    mean = pool_embeddings(hidden, mask)
+    assert np.allclose(mean, [[2.0, 2.0], [0.0, 2.0]]) and mean.dtype == np.float32
+    assert np.allclose(pool_embeddings(hidden, mask, 'cls'), hidden[:, 0])
+    assert np.allclose(pool_embeddings(hidden, mask, 'max'), [[3.0, 4.0], [0.0, 2.0]])
+    assert np.allclose(np.linalg.norm(pool_embeddings(hidden, mask, normalize=True), axis=1), 1.0)
+    print("✓ ONNX pooling")
+
+
+
+def test_training_settings_from_env(monkeypatch):
+    """Training ayarları (CLI ve web arayüzü) ortam değişkenlerinden RAGEngine'e ulaşmalı"""
+    for name, value in {'EMBEDDING_CACHE_PATH': '', 'EMBEDDING_WORKERS': '2', 'VECTOR_INDEX_TYPE': 'hnsw',
+                        'HNSW_M': '8', 'EMBEDDING_QUANTIZATION': 'int8', 'VECTOR_SHARD_BY': 'generator_id'}.items():
+        monkeypatch.setenv(name, value)
+    settings = training_settings()
+    assert settings['shard_by'] == 'generator_id' and settings['chunk_size'] == 800
+
+    rag = RAGEngine(llm_model='test', **settings['engine'])
+    assert rag.embedding_cache is None and rag.embedding_workers == 2
+    assert rag.vector_store.index_type == 'hnsw' and rag.vector_store.index_params['M'] == 8
+    assert rag.vector_store.quantization == 'int8'
+
+    # İşçi sayısı verilmezse web arayüzü tek process, train_rag.py tüm çekirdekler
+    monkeypatch.setenv('EMBEDDING_WORKERS', '')
+    assert training_settings()['engine']['embedding_workers'] == 1
+    assert training_settings(default_workers=0)['engine']['embedding_workers'] == 0
+    print("✓ Training ayarları")
+
+
+if __name__ == "__main__":
+    import pytest
+    print("=" * 60)
+    print("Paralel Embedding Hattı Testleri")
+    print("=" * 60 + "\n")
+
+    test_length_buckets_group_similar_lengths()
+    test_encode_bucketed_restores_order()
+    test_backend_selection()
+    test_onnx_pooling_ignores_padding()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_training_settings_from_env(monkeypatch)
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
@@ -0,0 +1,184 @@
+"""
+BM25 Sözcüksel Arama Testleri
+"""
+
+import os
+import sys
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lexical_index import (
+    BM25Index,
+    is_exact_term_query,
+    reciprocal_rank_fusion,
+    tokenize,
+    turkish_casefold,
+)
+from src.rag_engine import RAGEngine, VectorStore
+
+
+TEXTS = [
+    "Motor yağı her 250 saatte değiştirilmelidir.",
+    "E101 arızası düşük yağ basıncını gösterir. Yağ pompasını kontrol edin.",
+    "Silindir kapağı cıvataları 45 Nm torkla sıkılır.",
+    "Yakıt filtresi 1R-0750 parça numarasıyla değiştirilir.",
+    "İLK ÇALIŞTIRMADA motorun ısınmasını bekleyin.",
+    "Radyatör kapağını sıcak motorda açmayın.",
+]
+
+
+def _chunks():
+    return [{'text': t, 'source': 'manual.pdf', 'chunk_id': i} for i, t in enumerate(TEXTS)]
+
+
+def test_turkish_tokenization():
+    """Türkçe harf dönüşümü, ek atma ve kodların korunması"""
+    assert turkish_casefold("IŞIK İLK") == "ışık ilk"
+    assert tokenize("İLK ÇALIŞTIRMA") == tokenize("ilk çalıştırma")
+    assert tokenize("motorun")[0] == tokenize("motor")[0] == "motor"
+    assert tokenize("yağı") == ["yağ"]
+
+    tokens = tokenize("Filtre 1R-0750, kod E101'de")
+    assert "1r-0750" in tokens and "0750" in tokens
+    assert "e101" in tokens and "de" not in tokens
+    assert tokenize("Motor’un yağı") == ["motor", "yağ"]
+    assert is_exact_term_query("E101'de ne yapılır")
+    assert is_exact_term_query("E101") and is_exact_term_query("1R-0750 filtre")
+    assert not is_exact_term_query("yağ basıncı neden düşer")
+    # Düz sayılar kod sayılmaz; anlamsal arama ile birleştirilir
+    assert is_exact_term_query("3406-1250") and is_exact_term_query("E04 nedir")
+    assert not is_exact_term_query("500 saatlik bakım")
+    assert not is_exact_term_query("45.5 Nm tork") and not is_exact_term_query("250")
+    print("✓ Türkçe tokenizasyon")
+
+
+def test_bm25_ranks_exact_terms():
+    """Kod ve parça numarası içeren chunk en üstte olmalı"""
+    index = BM25Index()
+    index.add(_chunks(), 0)
+    assert len(index) == len(TEXTS)
+
+    ids, scores = index.search("E101", top_k=3)
+    assert list(ids) == [1]
+    ids, _ = index.search("1R-0750 filtresi", top_k=3)
+    assert ids[0] == 3
+    ids, _ = index.search("ilk çalıştırmada", top_k=1)
+    assert ids[0] == 4
+
+    # Silinen satır atlanır, aday kümesi dışındakiler skorlanmaz
+    exclude = np.zeros(len(TEXTS), dtype=bool)
+    exclude[1] = True
+    assert len(index.search("E101", top_k=3, exclude=exclude)[0]) == 0
+    ids, _ = index.search("yağ", top_k=5, candidates=np.array([0, 5]))
+    assert list(ids) == [0]
+
+    restored = BM25Index.from_state(index.state())
+    assert list(restored.search("torkla 45 Nm", top_k=2)[0]) == list(index.search("torkla 45 Nm", top_k=2)[0])
+
+    # Eski tokenizasyonla kaydedilmiş indeks yeniden oluşturulmak üzere boş açılır
+    old_state = {k: v for k, v in index.state().items() if k != 'tokenizer'}
+    assert len(BM25Index.from_state(old_state)) == 0
+    print("✓ BM25 sıralaması")
+
+
+def test_hybrid_search_in_vector_store(tmp_path):
+    """Embedding'in kaçırdığı kod chunk'ı hibrit aramada gelmeli"""
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((len(TEXTS), 8))
+    store = VectorStore(embedding_dim=8)
+    store.add_documents(_chunks(), embeddings)
+
+    # Sorgu embedding'i E101 chunk'ından uzak (0 numaralı chunk'a yakın)
+    query_embedding = embeddings[0]
+    dense = [r['chunk_id'] for r in store.search(query_embedding, top_k=1)]
+    assert dense == [0]
+    hybrid = store.hybrid_search(query_embedding, "E101 arızası", top_k=2)
+    assert 1 in [r['chunk_id'] for r in hybrid]
+    assert all('rrf_score' in r and 'similarity' in r for r in hybrid)
+
+    # Embedding yoksa BM25 skoru cosine benzerliği gibi gösterilmez
+    lexical = store.lexical_search("E101", top_k=3)
+    assert [r['chunk_id'] for r in lexical] == [1]
+    assert lexical[0]['similarity'] is None and lexical[0]['bm25'] > 0
+    lexical = store.lexical_search("E101", top_k=3, query_embedding=embeddings[1])
+    assert abs(lexical[0]['similarity'] - 1.0) < 1e-5
+
+    # BM25 indeksi DB ile kaydedilir ve silmelerden sonra sıkıştırılır
+    store.add_documents([{'text': 'E101 yeni revizyon', 'source': 'yeni.pdf', 'chunk_id': 0}],
+                        rng.standard_normal((1, 8)))
+    store.delete_source('manual.pdf')
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+    loaded = VectorStore()
+    loaded.load(path)
+    assert len(loaded.lexical) == 1
+    assert [r['source'] for r in loaded.lexical_search("E101")] == ['yeni.pdf']
+    print("✓ Hibrit arama")
+
+
+def test_exact_term_shortcut_similarity():
+    """Kod sorgusu kısayolu önbellekteki sorgu embedding'iyle gerçek cosine vermeli"""
+    rng = np.random.default_rng(1)
+    embeddings = rng.standard_normal((len(TEXTS), 8))
+    rag = RAGEngine()
+    rag.vector_store = VectorStore(embedding_dim=8)
+    rag.vector_store.add_documents(_chunks(), embeddings)
+
+    # Embedding yok: model yüklenmez, sadece BM25 skoru
+    result = rag.retrieve_context("E101'de", top_k=1)[0]
+    assert result['chunk_id'] == 1 and result['similarity'] is None and rag._embedder is None
+
+    rag.query_cache.put(rag.embedding_key, "E101'de", embeddings[0])
+    result = rag.retrieve_context("E101'de", top_k=1)[0]
+    expected = embeddings[1] @ embeddings[0] / np.linalg.norm(embeddings[1]) / np.linalg.norm(embeddings[0])
+    assert abs(result['similarity'] - expected) < 1e-5
+    print("✓ Kod sorgusu benzerliği")
+
+
+def test_exact_term_fallback_counts_one_miss(fake_embedder):
+    """BM25 yetmeyip embedding'e düşen kod sorgusu önbellekte tek miss saymalı"""
+    rng = np.random.default_rng(2)
+    rag = RAGEngine()
+    rag.embedder = fake_embedder(dim=8)
+    rag.vector_store = VectorStore(embedding_dim=8)
+    rag.vector_store.add_documents(_chunks(), rng.standard_normal((len(TEXTS), 8)))
+
+    assert len(rag.retrieve_context("1R-0750", top_k=3)) == 3
+    assert (rag.query_cache.hits, rag.query_cache.misses) == (0, 1)
+    rag.retrieve_context("1R-0750", top_k=3)
+    assert (rag.query_cache.hits, rag.query_cache.misses) == (1, 1)
+    print("✓ Kod sorgusunda tek önbellek araması")
+
+
+def test_reciprocal_rank_fusion():
+    """İki listede de üstte olan sonuç öne geçmeli"""
+    a = [{'source': 's', 'chunk_id': i, 'similarity': 1.0 - i / 10} for i in [1, 2, 3]]
+    b = [{'source': 's', 'chunk_id': i, 'bm25': 5.0 - i} for i in [2, 4]]
+    fused = reciprocal_rank_fusion([a, b], top_k=3)
+    assert [r['chunk_id'] for r in fused] == [2, 1, 4]
+    assert fused[0]['bm25'] == 3.0 and fused[0]['similarity'] == 0.8
+    print("✓ Reciprocal-rank fusion")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("BM25 Sözcüksel Arama Testleri")
+    print("=" * 60 + "\n")
+
+    test_turkish_tokenization()
+    test_bm25_ranks_exact_terms()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_hybrid_search_in_vector_store(Path(tmp))
+    test_exact_term_shortcut_similarity()
+    from conftest import FakeEmbedder
+    test_exact_term_fallback_counts_one_miss(FakeEmbedder)
+    test_reciprocal_rank_fusion()
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
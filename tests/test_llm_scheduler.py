@@ -0,0 +1,162 @@
+"""
+Öncelikli LLM Zamanlayıcısı Testleri
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.llm_scheduler import (
+    PRIORITY_CRITICAL, PRIORITY_LOW, PRIORITY_NORMAL, LLMScheduler, QueueFullError,
+    QueueTimeoutError, priority_for_fault
+)
+from src.assistant import EngineeringAssistant
+from src.async_llm import AsyncOllamaLLM
+from src.rag_engine import OllamaLLM, RAGEngine
+
+
+def wait_for(condition, timeout=2.0):
+    """Koşul sağlanana kadar bekle"""
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def run_waiters(scheduler, priorities, delay=0.0):
+    """Her öncelik için sırayla kuyruğa giren bir thread başlat; çıkış sırasını döndür"""
+    order, threads = [], []
+
+    def worker(priority):
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    for i, priority in enumerate(priorities, 1):
+        thread = threading.Thread(target=worker, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: scheduler.queue_depth == i)
+        time.sleep(delay)
+    return order, threads
+
+
+def test_priority_order_and_metrics():
+    """Slot boşalınca önce CRITICAL, sonra geliş sırası"""
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=8)
+    scheduler.acquire()
+    order, threads = run_waiters(scheduler, [PRIORITY_NORMAL, PRIORITY_LOW, PRIORITY_CRITICAL])
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(2)
+    assert order == [PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_LOW]
+
+    stats = scheduler.stats()
+    assert stats['completed'] == 4 and stats['in_flight'] == 0 and stats['max_depth'] == 3
+    assert stats['wait_p95'] > 0
+    assert priority_for_fault({'severity': 'CRITICAL'}) == PRIORITY_CRITICAL
+    assert priority_for_fault(None) == PRIORITY_NORMAL
+    print("✓ Öncelik sırası")
+
+
+def test_aging_prevents_starvation():
+    """Uzun bekleyen düşük öncelikli istek yeni gelen CRITICAL'ın önüne geçmeli"""
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=8, aging_seconds=0.01)
+    scheduler.acquire()
+    order, threads = run_waiters(scheduler, [PRIORITY_LOW, PRIORITY_CRITICAL], delay=0.1)
+    scheduler.release()
+    for thread in threads:
+        thread.join(2)
+    assert order == [PRIORITY_LOW, PRIORITY_CRITICAL]
+    print("✓ Yaşlanma")
+
+
+def test_reject_when_full_and_timeout():
+    """Kuyruk doluysa hemen red; timeout dolunca kuyruktan çıkış"""
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=1)
+    scheduler.acquire()
+    with pytest.raises(QueueTimeoutError):
+        scheduler.acquire(timeout=0.05)
+    assert scheduler.queue_depth == 0
+
+    _, threads = run_waiters(scheduler, [PRIORITY_NORMAL])
+    start = time.perf_counter()
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(PRIORITY_CRITICAL)
+    assert time.perf_counter() - start < 0.1
+    assert scheduler.stats()['rejected'] == 1 and scheduler.stats()['timeouts'] == 1
+
+    scheduler.release()
+    threads[0].join(2)
+    print("✓ Red ve zaman aşımı")
+
+
+def test_llm_goes_through_scheduler(fake_ollama):
+    """OllamaLLM slotu üretim boyunca tutmalı, kuyruk doluysa reddetmeli"""
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=0)
+    llm = OllamaLLM(model='test', scheduler=scheduler)
+
+    stream = llm.generate_stream("Soru", priority=PRIORITY_CRITICAL)
+    assert next(stream) == 'Tamam.'
+    assert scheduler.in_flight == 1
+    with pytest.raises(QueueFullError):
+        llm.generate("Başka soru")
+    assert list(stream) == [] and scheduler.in_flight == 0
+    assert llm.generate("Soru") == 'Tamam.' and scheduler.stats()['completed'] == 2
+    print("✓ LLM zamanlayıcı üzerinden")
+
+
+def test_warm_up_and_async_go_through_scheduler(monkeypatch, fake_ollama):
+    """Isınma ve asenkron üretim de aynı kuyruğa girmeli; asenkron yolda arıza önceliği uygulanmalı"""
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=0)
+
+    # Slot doluyken ısınma ve asenkron istek reddedilir
+    scheduler.acquire()
+    assert 'kuyruğu dolu' in OllamaLLM(model='test', scheduler=scheduler).warm_up()['error']
+    async_llm = AsyncOllamaLLM(model='test', scheduler=scheduler)
+    with pytest.raises(QueueFullError):
+        asyncio.run(async_llm.agenerate("Soru"))
+    scheduler.release()
+
+    priorities = []
+    acquire = scheduler.acquire
+    monkeypatch.setattr(scheduler, 'acquire', lambda priority=PRIORITY_NORMAL, timeout=None:
+                        priorities.append(priority) or acquire(priority, timeout))
+    rag = RAGEngine(llm_model='test', llm_scheduler=scheduler)
+    assert rag.warm_up()['error'] is None
+    answer = asyncio.run(rag.agenerate_answer("Soru", context_chunks=[], fault_info={'severity': 'CRITICAL'}))
+    assert answer == 'Tamam.' and rag.async_llm.last_timing['queued'] == 0.0
+    assert priorities == [PRIORITY_LOW, PRIORITY_CRITICAL]
+    assert scheduler.in_flight == 0 and scheduler.stats()['rejected'] == 2
+    print("✓ Isınma ve asenkron istek zamanlayıcı üzerinden")
+
+
+def test_rejected_query_does_not_report_previous_timing(monkeypatch, tmp_path, fake_ollama):
+    """Kuyruk reddettiğinde asistan önceki isteğin ilk token / soğuk bilgisini göstermemeli"""
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=0)
+    assistant = EngineeringAssistant(vector_db_path=str(tmp_path / 'yok'))
+    assistant._rag_engine = RAGEngine(llm_model='test', llm_scheduler=scheduler)
+    monkeypatch.setattr(assistant, '_retrieve', lambda *args: ([], None))
+
+    assert "".join(assistant.query_stream("Soru")) == 'Tamam.'
+    assert assistant.last_timing['ttft'] is not None and assistant.last_timing['cold']
+
+    scheduler.acquire()
+    with pytest.raises(QueueFullError):
+        list(assistant.query_stream("Başka soru"))
+    scheduler.release()
+    timing = assistant.last_timing
+    assert timing['ttft'] is None and not timing['cold'] and timing['load'] is None
+    assert timing['queued'] == 0.0
+    print("✓ Reddedilen istekte eski süreler yok")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
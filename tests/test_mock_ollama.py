@@ -0,0 +1,72 @@
+"""
+Sahte Ollama Sunucusu Testleri
+
+Gerçek ollama istemcisi ve OllamaLLM, yerel sahte sunucuya bağlanır;
+Ollama servisi veya model gerekmez.
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ollama
+
+from src.mock_ollama import DEFAULT_ANSWER, MockOllamaServer, split_tokens
+from src.rag_engine import OllamaLLM
+
+
+def test_client_list_and_chat():
+    """ollama istemcisi modelleri listeleyebilmeli, akışlı ve akışsız cevap almalı"""
+    with MockOllamaServer(ttft=0.05, tokens_per_sec=1000, models=['test:latest']) as server:
+        client = ollama.Client(host=server.url)
+        assert [m.model for m in client.list().models] == ['test:latest']
+
+        messages = [{'role': 'user', 'content': 'Yağ nasıl değişir?'}]
+        chunks = list(client.chat(model='test', messages=messages, stream=True))
+        assert ''.join(c['message']['content'] for c in chunks) == DEFAULT_ANSWER
+        assert chunks[-1]['done'] and chunks[-1]['eval_count'] == len(split_tokens(DEFAULT_ANSWER))
+
+        response = client.chat(model='test', messages=messages, options={'num_predict': 3})
+        assert response['message']['content'] == ''.join(split_tokens(DEFAULT_ANSWER)[:3])
+        assert len(server.requests) == 2
+    print("✓ Sahte sunucu API'si")
+
+
+def test_llm_timing_cold_then_warm():
+    """İlk istek model yüklemesini (soğuk), sonraki sıcak ilk token'ı ölçmeli"""
+    with MockOllamaServer(ttft=0.05, tokens_per_sec=2000, load_time=0.6) as server:
+        llm = OllamaLLM(model='test', url=server.url, keep_alive='5m')
+        answer = ''.join(llm.generate_stream("Soru", system="Sistem"))
+        assert answer == DEFAULT_ANSWER
+        assert llm.last_timing['cold'] and llm.last_timing['ttft'] >= 0.65
+
+        llm.generate("Soru")
+        assert not llm.last_timing['cold'] and not llm.last_timing['load']
+        assert server.requests[-1]['keep_alive'] == '5m'
+    print("✓ Soğuk / sıcak ilk token")
+
+
+def test_parallel_limit():
+    """Sunucu aynı anda en fazla `parallel` isteği işlemeli"""
+    with MockOllamaServer(ttft=0.1, tokens_per_sec=0, parallel=2) as server:
+        def ask():
+            ollama.Client(host=server.url).chat(model='test', messages=[{'role': 'user', 'content': 'x'}])
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=ask) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert server.max_active == 2
+        assert time.perf_counter() - start >= 0.2
+    print("✓ Paralel istek sınırı")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
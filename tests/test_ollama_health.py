@@ -0,0 +1,135 @@
+"""
+Ollama Sağlık İzleyicisi Testleri
+
+Ollama istemcisi yavaş/hatalı sahte istemcilerle değiştirilir; servis gerekmez.
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ollama
+
+from src.ollama_health import OllamaHealthMonitor, get_monitor, model_names
+from src.rag_engine import OllamaLLM
+
+
+class SlowClient:
+    """list() çağrısı ağ gecikmesi kadar bekleyen sahte istemci"""
+
+    release = threading.Event()
+    calls = 0
+
+    def __init__(self, host=None, **kwargs):
+        pass
+
+    def list(self):
+        SlowClient.calls += 1
+        SlowClient.release.wait(5)
+        return {'models': [{'name': 'mistral:latest'}]}
+
+
+class DownClient:
+    """Ollama kapalıyken davranan sahte istemci"""
+
+    def __init__(self, host=None, **kwargs):
+        pass
+
+    def list(self):
+        raise ConnectionError("Connection refused")
+
+
+def test_status_never_waits(monkeypatch):
+    """İlk yoklama sürerken status() beklemeden 'bilinmiyor' dönmeli"""
+    monkeypatch.setattr(ollama, 'Client', SlowClient)
+    SlowClient.release.clear()
+
+    monitor = OllamaHealthMonitor('http://yavas:11434', ttl=60)
+    start = time.perf_counter()
+    assert monitor.status()['ok'] is None
+    assert time.perf_counter() - start < 0.5
+
+    SlowClient.release.set()
+    status = monitor.wait()
+    assert status['ok'] and status['models'] == ['mistral:latest']
+    assert monitor.has_model('mistral') and not monitor.has_model('llama3.2:3b')
+
+    # TTL dolmadan tekrar yoklanmaz; refresh() hemen yoklatır
+    calls = SlowClient.calls
+    for _ in range(10):
+        monitor.status()
+    assert SlowClient.calls == calls
+    monitor.refresh()
+    deadline = time.time() + 2
+    while monitor.probes < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert monitor.probes == 2
+    monitor.stop()
+    print("✓ Beklemeyen durum")
+
+
+def test_down_and_shared_monitor(monkeypatch):
+    """Kapalı Ollama hata ile raporlanmalı; aynı URL tek izleyiciyi paylaşmalı"""
+    monkeypatch.setattr(ollama, 'Client', DownClient)
+
+    monitor = get_monitor('http://kapali:11434')
+    assert get_monitor('http://kapali:11434') is monitor
+    status = monitor.wait()
+    assert status['ok'] is False and 'refused' in status['error']
+    assert monitor.has_model('mistral') is False
+
+    # LLM oluşturmak ağı beklemez ve paylaşılan izleyiciyi kullanır
+    start = time.perf_counter()
+    OllamaLLM(model='test', url='http://kapali:11434')
+    assert time.perf_counter() - start < 0.5 and monitor.probes == 1
+    monitor.stop()
+    print("✓ Kapalı Ollama ve paylaşılan izleyici")
+
+
+def test_later_ttl_and_refresh_during_probe(monkeypatch):
+    """Sonradan verilen kısa ttl uygulanmalı; yoklama sürerken gelen refresh() kaybolmamalı"""
+    monkeypatch.setattr(ollama, 'Client', SlowClient)
+    SlowClient.release.clear()
+
+    monitor = get_monitor('http://ttl:11434')
+    assert monitor.ttl == 30.0
+    assert get_monitor('http://ttl:11434', ttl=60).ttl == 30.0
+    assert get_monitor('http://ttl:11434', ttl=5).ttl == 5
+
+    # İlk yoklama list() içinde beklerken refresh() gelir
+    deadline = time.time() + 2
+    while SlowClient.calls == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    calls = SlowClient.calls
+    monitor.refresh()
+    SlowClient.release.set()
+    deadline = time.time() + 2
+    while SlowClient.calls < calls + 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert SlowClient.calls >= calls + 1
+    monitor.stop()
+    print("✓ Sonraki ttl ve yoklama sırasında refresh")
+
+
+def test_model_names_both_apis():
+    """Eski (dict) ve yeni (nesne) liste cevapları okunmalı"""
+    class Model:
+        def __init__(self, model):
+            self.model = model
+
+    class ListResponse:
+        models = [Model('llama3.2:3b')]
+
+    assert model_names({'models': [{'name': 'mistral:latest'}, {'model': 'phi3'}]}) == ['mistral:latest', 'phi3']
+    assert model_names(ListResponse()) == ['llama3.2:3b']
+    assert model_names(None) == []
+    print("✓ Model adları")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
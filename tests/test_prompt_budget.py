@@ -0,0 +1,73 @@
+"""
+Token Bütçeli Prompt Paketleme Testleri
+"""
+
+import os
+import sys
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.prompt_budget import (
+    context_window, estimate_tokens, get_token_counter, pack_chunks, truncate_to_budget
+)
+from src.rag_engine import RAGEngine
+
+
+SENTENCES = "Motoru durdurun. Yağ tahliye tapasını açın. Yağın tamamen boşalmasını bekleyin. " \
+            "Yeni contayla tapayı 25 Nm torkla sıkın. Motoru belirtilen yağla doldurun."
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def test_truncate_at_sentence_boundary():
+    """Kısaltma cümle sınırında olmalı; tek cümle sığmazsa kelimede kesilmeli"""
+    cut = truncate_to_budget(SENTENCES, 8, word_count)
+    assert cut == "Motoru durdurun. Yağ tahliye tapasını açın."
+    assert truncate_to_budget(SENTENCES, 100, word_count) == SENTENCES
+    assert truncate_to_budget("bir iki üç dört beş", 3, word_count) == "bir iki …"
+    assert estimate_tokens("") == 0 and estimate_tokens("yağ değişimi") >= 4
+    print("✓ Cümle sınırında kısaltma")
+
+
+def test_pack_in_relevance_order():
+    """Chunk'lar sırayla eklenmeli, sığmayan kısaltılmalı, sonrakiler atlanmalı"""
+    chunks = [{'text': SENTENCES, 'source': f'manual{i}.pdf'} for i in range(3)]
+
+    def format_chunk(i, chunk, text):
+        return f"[Kaynak {i}: {chunk['source']}] {text}"
+
+    blocks, used, truncated = pack_chunks(chunks, 40, word_count, format_chunk, min_tokens=5)
+    assert len(blocks) == 2 and truncated and used <= 40
+    assert blocks[0].startswith("[Kaynak 1: manual0.pdf]") and blocks[1].endswith("bekleyin.")
+
+    blocks, _, truncated = pack_chunks(chunks, 40, word_count, format_chunk, min_tokens=20)
+    assert len(blocks) == 1 and not truncated
+    print("✓ Alaka sırasıyla paketleme")
+
+
+def test_context_window_and_engine_prompt():
+    """num_ctx prompt boyutuyla büyümeli; motor bütçeyi aşmamalı"""
+    assert context_window(200, 256, 8192) == 1024
+    assert context_window(1500, 1024, 8192) == 4096
+    assert context_window(5000, 1024, 3072) == 3072
+
+    counter = get_token_counter()
+    assert get_token_counter() is counter
+    rag = RAGEngine(llm_model='test', prompt_budget=1200)
+    short = rag._build_prompts("Yağ nasıl değişir?", [], None)
+    assert short[2] == 2048 and "İlgili doküman bulunamadı" in short[1]
+
+    chunks = [{'text': SENTENCES * 10, 'source': f'manual{i}.pdf'} for i in range(3)]
+    system, user, num_ctx = rag._build_prompts("Yağ nasıl değişir?", chunks, {'code': 'E101'})
+    assert counter.count(system) + counter.count(user) <= 1200
+    assert rag.last_prompt['chunks_dropped'] >= 1 and "Kod: E101" in user
+    assert num_ctx == rag.last_prompt['num_ctx'] <= 1200 + RAGEngine.ANSWER_PARAMS['max_tokens']
+    print("✓ num_ctx ve motor prompt'u")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,95 @@
+"""
+Embedding Kuantizasyon Testleri
+"""
+
+import os
+import sys
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.quantization import ScalarQuantizer
+from src.rag_engine import VectorStore
+
+
+def _embeddings(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    return VectorStore._normalize(rng.standard_normal((n, dim)))
+
+
+def _chunks(n):
+    return [{'text': f'chunk {i}', 'source': 'test.pdf', 'chunk_id': i} for i in range(n)]
+
+
+def test_int8_scores_close_to_exact():
+    """int8 skorları tam skorlara yakın olmalı"""
+    embeddings = _embeddings(300, 32)
+    quantizer = ScalarQuantizer('int8').fit(embeddings)
+    codes = quantizer.encode(embeddings)
+
+    assert codes.dtype == np.uint8
+    query = embeddings[0]
+    approx = quantizer.scores(codes, query)
+    assert np.max(np.abs(approx - embeddings @ query)) < 0.05
+
+    # Matris sorgu da aynı sonucu vermeli
+    batch = quantizer.scores(codes, embeddings[:3])
+    assert np.allclose(batch[0], approx, atol=1e-5)
+    print("✓ int8 skorları tam skorlara yakın")
+
+
+def test_quantized_store_with_rescore(tmp_path):
+    """Yeniden skorlamalı sıkıştırılmış arama tam aramayla aynı sonucu vermeli"""
+    embeddings = _embeddings(500, 32, seed=1)
+    exact = VectorStore(embedding_dim=32)
+    exact.add_documents(_chunks(500), embeddings)
+
+    store = VectorStore(embedding_dim=32, quantization='int8', rescore=True)
+    store.add_documents(_chunks(500), embeddings)
+    store.build_index()
+    assert store.codes.nbytes == 500 * 32
+
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+    loaded = VectorStore()
+    loaded.load(path)
+    assert loaded.quantization == 'int8'
+    assert loaded.codes.dtype == np.uint8
+
+    query = embeddings[10] + 0.1
+    expected = [r['chunk_id'] for r in exact.search(query, top_k=5)]
+    assert [r['chunk_id'] for r in loaded.search(query, top_k=5)] == expected
+    assert [r['chunk_id'] for r in loaded.search_batch(query[None], top_k=5)[0]] == expected
+    print("✓ int8 + rescore tam aramayla aynı")
+
+
+def test_float16_store():
+    """float16 modunda matris yarı boyutta saklanmalı"""
+    embeddings = _embeddings(100, 16, seed=2)
+    store = VectorStore(embedding_dim=16, quantization='float16', rescore=False)
+    store.add_documents(_chunks(100), embeddings)
+    store.build_index()
+
+    assert store.codes.dtype == np.float16
+    result = store.search(embeddings[5], top_k=1)
+    assert result[0]['chunk_id'] == 5
+    print("✓ float16 saklama")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("Embedding Kuantizasyon Testleri")
+    print("=" * 60 + "\n")
+
+    test_int8_scores_close_to_exact()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_quantized_store_with_rescore(Path(tmp))
+    test_float16_store()
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
@@ -0,0 +1,80 @@
+"""
+LLM Cevap Önbelleği Testleri
+"""
+
+import os
+import sys
+import time
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import RAGEngine
+from src.response_cache import ResponseCache, request_key, vector_db_fingerprint
+
+
+def test_ttl_size_and_namespace(tmp_path):
+    """Süresi dolan, fazla olan ve eski DB'ye ait cevaplar silinmeli"""
+    cache = ResponseCache(str(tmp_path / 'llm.sqlite'), max_entries=2, ttl_seconds=3600)
+    keys = [request_key('model', 'sistem', f'soru {i}', {'temperature': 0.3}) for i in range(3)]
+    assert keys[0] != request_key('model-2', 'sistem', 'soru 0', {'temperature': 0.3})
+
+    cache.put(keys[0], 'model', 'cevap 0')
+    time.sleep(0.01)
+    cache.put(keys[1], 'model', 'cevap 1')
+    time.sleep(0.01)
+    assert cache.get(keys[0]) == 'cevap 0'  # 0 yeni kullanıldı, 1 en eski
+    time.sleep(0.01)
+    cache.put(keys[2], 'model', 'cevap 2')
+    assert len(cache) == 2 and cache.get(keys[1]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert not cache.set_namespace('db-v1')  # İlk bağlama: silme yok
+    assert not cache.set_namespace('db-v1')
+    assert cache.set_namespace('db-v2') and len(cache) == 0
+
+    expired = ResponseCache(str(tmp_path / 'expired.sqlite'), ttl_seconds=-1)
+    expired.put(keys[0], 'model', 'cevap')
+    assert expired.get(keys[0]) is None
+    print("✓ TTL, boyut ve DB parmak izi")
+
+
+def test_fingerprint_changes_on_save(tmp_path):
+    """DB her kaydedildiğinde parmak izi değişmeli"""
+    path = tmp_path / 'vectordb'
+    assert vector_db_fingerprint(str(path)) == 'yok'
+    path.mkdir()
+    (path / 'meta.json').write_text('{"count": 1}')
+    first = vector_db_fingerprint(str(path))
+    (path / 'meta.json').write_text('{"count": 12}')
+    assert vector_db_fingerprint(str(path)) != first
+    print("✓ Parmak izi")
+
+
+def test_repeat_answer_served_from_cache(fake_ollama, oil_chunks, tmp_path):
+    """Aynı soru + bağlam ikinci kez LLM'e gitmemeli, hatalar önbelleğe girmemeli"""
+    fake_ollama.pieces = ['Yağ seviyesini', ' kontrol edin.']
+
+    rag = RAGEngine(llm_model='test', response_cache_path=str(tmp_path / 'llm.sqlite'))
+    first = rag.generate_answer("E101 nedir?", context_chunks=oil_chunks)
+    assert first == 'Yağ seviyesini kontrol edin.' and not rag.last_answer_cached
+    assert rag.generate_answer("E101 nedir?", context_chunks=oil_chunks) == first
+    assert rag.last_answer_cached and fake_ollama.calls == 1
+
+    # Farklı bağlam = farklı istek
+    rag.generate_answer("E101 nedir?", context_chunks=oil_chunks + oil_chunks)
+    assert fake_ollama.calls == 2
+
+    # Model değişince eski cevap kullanılmaz; hata cevabı saklanmaz
+    fake_ollama.error = ConnectionError("Failed to connect to Ollama")
+    rag.llm_model = 'test-2'
+    rag._llm = None
+    assert rag.generate_answer("E101 nedir?", context_chunks=oil_chunks).startswith("Ollama hatası")
+    rag.generate_answer("E101 nedir?", context_chunks=oil_chunks)
+    assert fake_ollama.calls == 4
+    print("✓ Tekrar eden cevap önbellekten")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
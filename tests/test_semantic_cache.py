@@ -0,0 +1,123 @@
+"""
+Benzer Soru (Anlamsal) Cevap Önbelleği Testleri
+
+Embedding modeli ve Ollama sahte nesnelerle değiştirilir; servis gerekmez.
+"""
+
+import os
+import sys
+import subprocess
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.assistant import EngineeringAssistant
+from src.rag_engine import RAGEngine, VectorStore
+from src.semantic_cache import SemanticAnswerCache
+
+
+# Paraphrase'ler birbirine yakın, farklı konu uzak vektörler
+VECTORS = {
+    "yağ nasıl değiştirilir": np.array([1.0, 0.0, 0.0], dtype=np.float32),
+    "yağ değişimi adımları": np.array([0.97, 0.2, 0.0], dtype=np.float32),
+    "yakıt filtresi ne zaman değişir": np.array([0.0, 0.0, 1.0], dtype=np.float32),
+}
+
+
+def test_threshold_context_and_metrics(oil_chunks, fuel_chunks):
+    """Eşiği geçen ve aynı bağlamı getiren sorgu isabet etmeli"""
+    cache = SemanticAnswerCache(threshold=0.9, max_entries=2)
+    oil = SemanticAnswerCache.context_signature(oil_chunks, None)
+    fuel = SemanticAnswerCache.context_signature(fuel_chunks, None)
+    assert oil != SemanticAnswerCache.context_signature(oil_chunks, {'code': 'E101'})
+
+    assert cache.lookup('m', VECTORS["yağ nasıl değiştirilir"], oil) is None
+    cache.add('m', VECTORS["yağ nasıl değiştirilir"], oil, "yağ nasıl değiştirilir", "yağ cevabı")
+    assert cache.lookup('m', VECTORS["yağ değişimi adımları"], oil) == "yağ cevabı"
+
+    # Benzer ama farklı chunk'lar: yanlış isabet adayı, cevap verilmez
+    assert cache.lookup('m', VECTORS["yağ değişimi adımları"], fuel) is None
+    # Eşiğin altı: sıradan ıska
+    assert cache.lookup('m', VECTORS["yakıt filtresi ne zaman değişir"], oil) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['lookups'], stats['false_hits']) == (1, 4, 1)
+
+    # Kullanıcı geri bildirimi isabet eden kaydı çıkarır
+    assert cache.lookup('m', VECTORS["yağ değişimi adımları"], oil) == "yağ cevabı"
+    cache.report_false_hit()
+    assert len(cache) == 0 and cache.stats()['reported_false'] == 1
+
+    # Boyut sınırı ve model değişimi
+    for text in VECTORS:
+        cache.add('m', VECTORS[text], oil, text, text)
+    assert len(cache) == 2
+    assert cache.lookup('m-2', VECTORS["yakıt filtresi ne zaman değişir"], oil) is None
+    assert len(cache) == 0
+    print("✓ Eşik, bağlam ve metrikler")
+
+
+def test_assistant_paraphrase_skips_llm(monkeypatch, tmp_path, fake_ollama, fake_embedder,
+                                        oil_chunks, fuel_chunks):
+    """Paraphrase soru aynı chunk'ları getirirse LLM çağrılmamalı"""
+    fake_ollama.pieces = lambda calls: [f'cevap {calls}']
+
+    assistant = EngineeringAssistant(vector_db_path=str(tmp_path / 'yok'),
+                                     semantic_cache_threshold=0.9, semantic_cache_size=10)
+    assistant._rag_engine = RAGEngine(llm_model='test')
+    assistant._rag_engine.embedder = fake_embedder(vectors=VECTORS)
+    retrieved = {"yağ nasıl değiştirilir": oil_chunks, "yağ değişimi adımları": oil_chunks,
+                 "yakıt filtresi ne zaman değişir": fuel_chunks}
+    monkeypatch.setattr(assistant, '_retrieve',
+                        lambda question, top_k, generator_id: (retrieved[question], VECTORS[question]))
+
+    assert assistant.query("yağ nasıl değiştirilir") == "cevap 1"
+    assert assistant.query("yağ değişimi adımları") == "cevap 1"
+    assert assistant.last_timing['cached'] == 'semantic' and fake_ollama.calls == 1
+    assert "benzer soru" in assistant.format_timing()
+
+    assert assistant.query("yakıt filtresi ne zaman değişir") == "cevap 2"
+    assert "İsabet: 1/3" in assistant.format_cache_stats()
+    print("✓ Asistanda benzer soru önbelleği")
+
+
+def test_assistant_reuses_retrieval_embedding(tmp_path, fake_ollama, fake_embedder, oil_chunks):
+    """Benzer soru önbelleği aramanın embedding'ini kullanmalı, sorgu LRU'sunu iki kez saymamalı"""
+    assistant = EngineeringAssistant(vector_db_path=str(tmp_path / 'yok'),
+                                     semantic_cache_threshold=0.99, semantic_cache_size=10)
+    assistant._rag_engine = RAGEngine(llm_model='test')
+    # VECTORS dışındaki bir metin encode edilirse KeyError verir
+    assistant._rag_engine.embedder = fake_embedder(vectors=VECTORS)
+    store = VectorStore(embedding_dim=3)
+    store.add_documents(oil_chunks + [{'text': 'E101 düşük yağ basıncı', 'source': 'kodlar.pdf',
+                                       'chunk_id': 0}],
+                        np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32))
+    assistant._rag_engine.vector_store = store
+
+    for question in VECTORS:
+        assistant.query(question, top_k=1)
+    query_cache = assistant._rag_engine.query_cache
+    assert (query_cache.hits, query_cache.misses) == (0, 3)
+
+    # BM25 kısayolunda embedding hesaplanmaz, anlamsal önbellek atlanır
+    assistant.query("E101", top_k=1)
+    assert (query_cache.hits, query_cache.misses) == (0, 4)
+    assert assistant.last_timing['cached'] is False
+    assert len(assistant.semantic_cache) == 3
+    print("✓ Aramanın embedding'i yeniden kullanılıyor")
+
+
+def test_assistant_import_stays_light():
+    """Arıza kodu komutları için asistan oluşturmak numpy yüklememeli (önbellek tembel)"""
+    code = ("import sys; from src.assistant import EngineeringAssistant; "
+            "EngineeringAssistant(vector_db_path='yok'); print('numpy' in sys.modules)")
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+    assert result.stdout.strip().endswith('False'), result.stdout + result.stderr
+    print("✓ Tembel önbellek")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,145 @@
+"""
+Parçalı Vektör Deposu Testleri
+"""
+
+import os
+import sys
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import RAGEngine, VectorStore
+from src.sharded_store import OTHER_SHARD, ShardedVectorStore, is_sharded_store
+
+
+def _chunks(n):
+    """Üç jeneratöre ve bir etiketsiz manuele dağılmış chunk'lar"""
+    generators = ['caterpillar_3406', 'cummins_qsx15', 'general', None]
+    chunks = []
+    for i in range(n):
+        chunk = {'text': f'chunk {i}', 'source': f'manual_{i % 4}.pdf', 'chunk_id': i}
+        if generators[i % 4]:
+            chunk['generator_id'] = generators[i % 4]
+        chunks.append(chunk)
+    return chunks
+
+
+def _single_store(n=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim))
+    store = VectorStore(embedding_dim=dim)
+    store.add_documents(_chunks(n), embeddings)
+    store.build_index()
+    return store, embeddings
+
+
+def test_sharded_search_matches_single_store(tmp_path):
+    """Parçalara dağıtılmış arama tek store ile aynı sonucu vermeli"""
+    store, embeddings = _single_store()
+    path = str(tmp_path / 'vectordb')
+    ShardedVectorStore.from_store(store, path, by='generator_id')
+
+    assert is_sharded_store(path)
+    queries = embeddings[[3, 50, 101]] + 0.1
+    expected = [[r['chunk_id'] for r in found] for found in store.search_batch(queries, top_k=5)]
+
+    for executor in ['thread', 'process']:
+        sharded = ShardedVectorStore(path, executor=executor, max_workers=2)
+        assert sorted(sharded.shards) == [OTHER_SHARD, 'caterpillar_3406', 'cummins_qsx15', 'general']
+        assert sharded.live_count == 200
+        results = sharded.search_batch(queries, top_k=5)
+        assert [[r['chunk_id'] for r in found] for found in results] == expected
+        assert results[0][0]['shard'] == sharded.search(queries[0], top_k=1)[0]['shard']
+        sharded.close()
+    print("✓ Parçalı arama tek store ile aynı")
+
+
+def test_add_remove_shard_leaves_others(tmp_path):
+    """Parça eklemek/silmek diğer parçaların dosyalarını değiştirmemeli"""
+    store, embeddings = _single_store(seed=1)
+    path = str(tmp_path / 'vectordb')
+    sharded = ShardedVectorStore.from_store(store, path, by='generator_id')
+    other_meta = os.path.join(path, 'general', 'meta.json')
+    mtime = os.path.getmtime(other_meta)
+
+    assert sharded.remove_shard('cummins_qsx15')
+    assert not os.path.exists(os.path.join(path, 'cummins_qsx15'))
+    assert all(r.get('generator_id') != 'cummins_qsx15'
+               for r in sharded.search(embeddings[1], top_k=10))
+
+    extra = VectorStore(embedding_dim=16)
+    extra.add_documents([{'text': 'yeni', 'source': 'yeni.pdf', 'chunk_id': 0}], embeddings[:1] * -1)
+    sharded.add_shard('yeni', extra)
+    assert os.path.getmtime(other_meta) == mtime
+
+    reloaded = ShardedVectorStore(path)
+    assert 'yeni' in reloaded.shards and 'cummins_qsx15' not in reloaded.shards
+    assert reloaded.search(-embeddings[0], top_k=1)[0]['text'] == 'yeni'
+    print("✓ Parça ekleme/silme")
+
+
+def test_replace_source_in_sharded_store(tmp_path):
+    """Kaynak değiştirme sadece ilgili parçayı yeniden yazmalı"""
+    store, embeddings = _single_store(seed=2)
+    path = str(tmp_path / 'vectordb')
+    sharded = ShardedVectorStore.from_store(store, path, by='generator_id')
+    untouched = os.path.getmtime(os.path.join(path, 'general', 'meta.json'))
+
+    new_chunks = [{'text': 'revize', 'source': 'manual_0.pdf',
+                   'generator_id': 'caterpillar_3406', 'chunk_id': 0}]
+    sharded.replace_source('manual_0.pdf', new_chunks, embeddings[:1] * -1)
+    sharded.save()
+
+    assert os.path.getmtime(os.path.join(path, 'general', 'meta.json')) == untouched
+    reloaded = ShardedVectorStore(path)
+    assert reloaded.shards['caterpillar_3406'].live_count == 1
+    assert reloaded.search(-embeddings[0], top_k=1)[0]['text'] == 'revize'
+    print("✓ Parçalı store'da kaynak değiştirme")
+
+
+def test_rag_engine_add_documents_to_sharded_store(tmp_path, fake_embedder):
+    """RAGEngine.add_documents yeni chunk'ları parçalama alanına göre yönlendirmeli"""
+    store, embeddings = _single_store(seed=3)
+    path = str(tmp_path / 'vectordb')
+    ShardedVectorStore.from_store(store, path, by='generator_id')
+    untouched = os.path.getmtime(os.path.join(path, 'general', 'meta.json'))
+
+    rag = RAGEngine(vector_db_path=path)
+    rag.embedder = fake_embedder(corpus=-embeddings)
+    rag.add_documents([
+        {'text': 'yeni cat', 'source': 'yeni.pdf', 'generator_id': 'caterpillar_3406', 'chunk_id': 0},
+        {'text': 'yeni jeneratör', 'source': 'yeni.pdf', 'generator_id': 'perkins_4000', 'chunk_id': 1},
+    ])
+    assert rag.vector_store.shards['caterpillar_3406'].live_count == 51
+    assert rag.vector_store.search(-embeddings[1], top_k=1)[0]['shard'] == 'perkins_4000'
+    rag.save_vector_db(path)
+
+    assert os.path.getmtime(os.path.join(path, 'general', 'meta.json')) == untouched
+    reloaded = ShardedVectorStore(path)
+    assert reloaded.live_count == 202 and 'perkins_4000' in reloaded.shards
+    assert reloaded.search(-embeddings[0], top_k=1)[0]['text'] == 'yeni cat'
+    print("✓ Parçalı store'a RAGEngine ile ekleme")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    from conftest import FakeEmbedder
+
+    print("=" * 60)
+    print("Parçalı Vektör Deposu Testleri")
+    print("=" * 60 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_sharded_search_matches_single_store(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_add_remove_shard_leaves_others(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_replace_source_in_sharded_store(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_rag_engine_add_documents_to_sharded_store(Path(tmp), FakeEmbedder)
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
@@ -0,0 +1,64 @@
+"""
+Token Akışı (Streaming) Testleri
+
+Ollama çağrısı sahte bir akışla değiştirilir; servis gerekmez.
+"""
+
+import os
+import sys
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.assistant import EngineeringAssistant
+from src.rag_engine import OllamaLLM, RAGEngine
+
+
+PIECES = ["📋 ÖZET:", " Yağ", " filtresini", " değiştirin."]
+
+
+def test_llm_stream_and_timing(fake_ollama):
+    """Parçalar geldikçe dönmeli, TTFT ve toplam süre ayrı ölçülmeli"""
+    fake_ollama.pieces = PIECES
+
+    llm = OllamaLLM(model='test', url='http://ollama-host:11434')
+    assert llm.client.host == 'http://ollama-host:11434'
+    assert list(llm.generate_stream("Soru", system="Sistem")) == PIECES
+    assert llm.last_timing['tokens'] == len(PIECES)
+    assert 0 <= llm.last_timing['ttft'] <= llm.last_timing['total']
+    assert llm.generate("Soru") == "".join(PIECES)
+    # Cevap akış olarak istenmeli, soru son (kullanıcı) mesajında
+    assert all(r['stream'] and r['messages'][-1]['role'] == 'user' for r in fake_ollama.requests)
+    print("✓ LLM akışı")
+
+
+def test_llm_stream_error_message(fake_ollama):
+    """Ollama hatası tek parça mesaj olarak dönmeli"""
+    fake_ollama.error = RuntimeError("model 'test' not found (status code: 404)")
+
+    llm = OllamaLLM(model='test')
+    pieces = list(llm.generate_stream("Soru"))
+    assert len(pieces) == 1 and "ollama pull test" in pieces[0]
+    assert llm.last_timing['ttft'] is None
+    print("✓ Akışta hata mesajı")
+
+
+def test_assistant_query_stream(tmp_path, fake_ollama, fake_embedder):
+    """Asistan cevabı parça parça vermeli ve süreleri kaydetmeli"""
+    fake_ollama.pieces = PIECES
+
+    assistant = EngineeringAssistant(vector_db_path=str(tmp_path / 'yok'))
+    assistant._rag_engine = RAGEngine(llm_model='test')
+    assistant._rag_engine.embedder = fake_embedder()
+    pieces = list(assistant.query_stream("Yağ filtresi"))
+    assert pieces == PIECES
+    timing = assistant.last_timing
+    assert timing['retrieval'] <= timing['ttft'] <= timing['total']
+    assert "İlk token" in assistant.format_timing()
+    assert assistant.query("Yağ filtresi") == "".join(PIECES)
+    print("✓ Asistan akışı")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
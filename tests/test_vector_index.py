@@ -0,0 +1,221 @@
+"""
+ANN İndeks Testleri
+"""
+
+import os
+import sys
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import VectorStore
+from src.vector_index import HNSWIndex, IVFIndex, top_k_indices
+
+
+def _clustered(n, dim, seed=0, n_topics=20):
+    """Kümelenmiş normalize test vektörleri"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim))
+    vectors = topics[rng.integers(0, n_topics, size=n)] + rng.standard_normal((n, dim)) * 0.3
+    return VectorStore._normalize(vectors)
+
+
+def _chunks(n):
+    return [{'text': f'chunk {i}', 'source': 'test.pdf', 'chunk_id': i} for i in range(n)]
+
+
+def test_ivf_full_probe_is_exact():
+    """Tüm kümeler taranınca IVF tam aramayla aynı sonucu vermeli"""
+    embeddings = _clustered(500, 16)
+    ivf = IVFIndex(n_lists=10)
+    ivf.build(embeddings)
+
+    assert len(ivf) == 500
+    query = embeddings[7]
+    ids, scores = ivf.search(embeddings, query, top_k=5, nprobe=10)
+
+    assert list(ids) == list(top_k_indices(embeddings @ query, 5))
+    assert scores[0] >= scores[-1]
+    print("✓ nprobe = n_lists iken IVF tam arama")
+
+
+def test_ivf_recall():
+    """Varsayılan ayarlarda recall yüksek olmalı"""
+    embeddings = _clustered(2000, 32, seed=1)
+    ivf = IVFIndex(nprobe=8)
+    ivf.build(embeddings)
+
+    rng = np.random.default_rng(2)
+    hits = 0
+    for q_id in rng.integers(0, 2000, size=30):
+        query = embeddings[q_id]
+        expected = set(top_k_indices(embeddings @ query, 5))
+        hits += len(expected & set(ivf.search(embeddings, query, top_k=5)[0]))
+
+    assert hits / (30 * 5) > 0.9
+    print(f"✓ IVF recall@5: {hits / 150:.2f}")
+
+
+def test_vector_store_ivf_persisted(tmp_path):
+    """IVF indeksi vektörlerle birlikte kaydedilip yüklenebilmeli"""
+    embeddings = _clustered(300, 16, seed=3)
+    store = VectorStore(embedding_dim=16, index_type='ivf', index_params={'n_lists': 8, 'nprobe': 8})
+    store.add_documents(_chunks(300), embeddings)
+    store.build_index()
+
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+    assert os.path.isfile(os.path.join(path, 'index.npz'))
+
+    loaded = VectorStore()
+    loaded.load(path)
+    assert isinstance(loaded.index, IVFIndex)
+    assert loaded.index.nprobe == 8
+
+    query = embeddings[42]
+    assert [r['chunk_id'] for r in loaded.search(query, top_k=3)] == \
+           [r['chunk_id'] for r in store.search(query, top_k=3)]
+    print("✓ IVF indeksi kaydedildi ve yüklendi")
+
+
+def test_hnsw_recall():
+    """HNSW aramasında recall yüksek olmalı"""
+    embeddings = _clustered(1500, 32, seed=4)
+    hnsw = HNSWIndex(M=8, ef_construction=64, ef_search=32)
+    hnsw.build(embeddings)
+
+    assert len(hnsw) == 1500
+    rng = np.random.default_rng(5)
+    hits = 0
+    for q_id in rng.integers(0, 1500, size=30):
+        query = embeddings[q_id]
+        expected = set(top_k_indices(embeddings @ query, 5))
+        hits += len(expected & set(hnsw.search(embeddings, query, top_k=5)[0]))
+
+    assert hits / (30 * 5) > 0.9
+    print(f"✓ HNSW recall@5: {hits / 150:.2f}")
+
+
+def test_vector_store_hnsw_incremental(tmp_path):
+    """Yeni chunk'lar HNSW grafına yeniden kurulum olmadan eklenmeli"""
+    embeddings = _clustered(400, 16, seed=6)
+    store = VectorStore(embedding_dim=16, index_type='hnsw', index_params={'M': 8})
+    store.add_documents(_chunks(300), embeddings[:300])
+    store.build_index()
+    graph = store.index
+
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+    loaded = VectorStore()
+    loaded.load(path)
+    assert isinstance(loaded.index, HNSWIndex)
+
+    loaded.add_documents(_chunks(100), embeddings[300:])
+    loaded.build_index()
+    assert len(loaded.index) == 400
+
+    store.add_documents(_chunks(100), embeddings[300:])
+    store.build_index()
+    assert store.index is graph  # aynı graf nesnesi genişletildi
+
+    # Yeni eklenen bir vektör kendisinin en yakın komşusu olmalı
+    result = loaded.search(embeddings[350], top_k=1)
+    assert result[0]['similarity'] > 0.999
+    print("✓ HNSW artımlı ekleme ve kaydetme")
+
+
+def test_ann_indexes_skip_deleted():
+    """IVF ve HNSW silinen satırları atlamalı, sıkıştırmadan sonra da doğru aramalı"""
+    embeddings = _clustered(300, 16, seed=7)
+    for index_type, params in [('ivf', {'n_lists': 8, 'nprobe': 8}), ('hnsw', {'M': 8})]:
+        store = VectorStore(embedding_dim=16, index_type=index_type,
+                            index_params=params, compaction_threshold=0.9)
+        store.add_documents(_chunks(150), embeddings[:150])
+        store.add_documents(
+            [{'text': f'x {i}', 'source': 'silinecek.pdf', 'chunk_id': i} for i in range(150)],
+            embeddings[150:]
+        )
+        store.build_index()
+        store.delete_source('silinecek.pdf')
+
+        results = store.search(embeddings[200], top_k=5)
+        assert len(results) == 5
+        assert all(r['source'] == 'test.pdf' for r in results)
+
+        store.compact()
+        assert len(store.index) == 150
+        assert store.search(embeddings[10], top_k=1)[0]['chunk_id'] == 10
+    print("✓ ANN indeksleri silinenleri atladı")
+
+
+def test_hnsw_exclude_expansion_is_capped():
+    """Çoğu satır atlanınca ef sınırlı büyümeli, sonra izinli satırlar tam skorlanmalı"""
+    embeddings = _clustered(1000, 16, seed=8)
+    hnsw = HNSWIndex(M=8, ef_search=20)
+    hnsw.build(embeddings)
+
+    exclude = np.ones(1000, dtype=bool)
+    allowed = np.arange(0, 1000, 97)
+    exclude[allowed] = False
+    widths = []
+    search_layer = hnsw._search_layer
+    hnsw._search_layer = lambda emb, q, entry, ef, level: widths.append(ef) or search_layer(emb, q, entry, ef, level)
+
+    query = embeddings[500]
+    ids, scores = hnsw.search(embeddings, query, top_k=5, exclude=exclude)
+    expected = allowed[top_k_indices(embeddings[allowed] @ query, 5)]
+    assert list(ids) == list(expected)
+    assert np.allclose(scores, embeddings[ids] @ query)
+    assert max(widths) <= HNSWIndex.MAX_EF_EXPANSION * 20
+    print("✓ HNSW genişletme sınırı")
+
+
+def test_ivf_selective_exclude_falls_back_to_exact():
+    """Taranan kümelerde izinli satır yetmezse IVF yine top_k sonuç vermeli"""
+    embeddings = _clustered(1000, 16, seed=9)
+    ivf = IVFIndex(n_lists=32, nprobe=1)
+    ivf.build(embeddings)
+
+    exclude = np.ones(1000, dtype=bool)
+    allowed = np.arange(0, 1000, 97)
+    exclude[allowed] = False
+    query = embeddings[500]
+    ids, scores = ivf.search(embeddings, query, top_k=5, exclude=exclude)
+    expected = allowed[top_k_indices(embeddings[allowed] @ query, 5)]
+    assert list(ids) == list(expected)
+    assert np.allclose(scores, embeddings[ids] @ query)
+
+    # Metadata filtresi de aynı maskeyi kullanır
+    store = VectorStore(embedding_dim=16, index_type='ivf', index_params={'n_lists': 32, 'nprobe': 1})
+    chunks = [{'text': f'chunk {i}', 'source': 'test.pdf', 'chunk_id': i,
+               'generator_id': 'nadir' if i in allowed else 'genel'} for i in range(1000)]
+    store.add_documents(chunks, embeddings)
+    store.build_index()
+    results = store.search(query, top_k=5, filters={'generator_id': 'nadir'})
+    assert [r['chunk_id'] for r in results] == list(expected)
+    print("✓ IVF seçici filtrede tam skorlama")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("ANN İndeks Testleri")
+    print("=" * 60 + "\n")
+
+    test_ivf_full_probe_is_exact()
+    test_ivf_recall()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_vector_store_ivf_persisted(Path(tmp))
+    test_hnsw_recall()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_vector_store_hnsw_incremental(Path(tmp))
+    test_ann_indexes_skip_deleted()
+    test_hnsw_exclude_expansion_is_capped()
+    test_ivf_selective_exclude_falls_back_to_exact()
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
@@ -0,0 +1,376 @@
+"""
+Vektör Veritabanı Testleri
+"""
+
+import os
+import sys
+import pickle
+import numpy as np
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import VectorStore
+from src.vector_storage import EmbeddingBuffer, LazyChunkList, convert_legacy_pickle
+
+
+def _make_chunks(n, source='test_manual.pdf'):
+    """Test chunk'ları oluştur"""
+    return [{'text': f'chunk {i}', 'source': source, 'chunk_id': i} for i in range(n)]
+
+
+def _brute_force(embeddings, query, top_k):
+    """Referans cosine similarity sıralaması"""
+    emb = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    sims = emb @ (query / np.linalg.norm(query))
+    return list(np.argsort(-sims)[:top_k])
+
+
+def test_embeddings_normalized_once():
+    """build_index sonrası matris normalize float32 olmalı"""
+    rng = np.random.default_rng(0)
+    store = VectorStore(embedding_dim=8)
+    store.add_documents(_make_chunks(20), rng.standard_normal((20, 8)) * 5)
+    store.build_index()
+
+    assert store.embeddings.dtype == np.float32
+    assert np.allclose(np.linalg.norm(store.embeddings, axis=1), 1.0, atol=1e-5)
+    print("✓ Embedding matrisi normalize edildi")
+
+
+def test_search_matches_brute_force():
+    """Arama sonuçları tam cosine sıralamasıyla aynı olmalı"""
+    rng = np.random.default_rng(1)
+    embeddings = rng.standard_normal((200, 16)).astype(np.float32)
+    store = VectorStore(embedding_dim=16)
+    store.add_documents(_make_chunks(200), embeddings)
+    store.build_index()
+
+    query = rng.standard_normal(16)
+    results = store.search(query, top_k=5)
+
+    assert [r['chunk_id'] for r in results] == _brute_force(embeddings, query, 5)
+    assert results[0]['similarity'] >= results[-1]['similarity']
+    print("✓ Arama sonuçları doğru sırada")
+
+
+def test_search_top_k_larger_than_corpus():
+    """top_k korpustan büyükse tüm chunk'lar dönmeli"""
+    store = VectorStore(embedding_dim=4)
+    store.add_documents(_make_chunks(3), np.eye(3, 4))
+    results = store.search(np.array([1.0, 0, 0, 0]), top_k=10)
+
+    assert len(results) == 3
+    assert results[0]['chunk_id'] == 0
+    print("✓ top_k > korpus durumu")
+
+
+def test_save_load_roundtrip(tmp_path):
+    """Kaydet/yükle sonrası arama aynı kalmalı"""
+    rng = np.random.default_rng(2)
+    embeddings = rng.standard_normal((50, 8))
+    store = VectorStore(embedding_dim=8)
+    store.add_documents(_make_chunks(50), embeddings)
+    store.build_index()
+
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+
+    loaded = VectorStore()
+    loaded.load(path)
+    query = rng.standard_normal(8)
+
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert isinstance(loaded.chunks, LazyChunkList)
+    assert loaded.chunks[7] == store.chunks[7]
+
+    assert [r['chunk_id'] for r in loaded.search(query, top_k=5)] == \
+           [r['chunk_id'] for r in store.search(query, top_k=5)]
+    print("✓ Kaydet/yükle testi geçti")
+
+
+def test_legacy_pickle_conversion(tmp_path):
+    """Eski vectordb.pkl yeni klasör formatına dönüştürülebilmeli"""
+    rng = np.random.default_rng(4)
+    embeddings = rng.standard_normal((30, 8)) * 3
+    chunks = _make_chunks(30)
+
+    # Normalize edilmemiş eski format
+    pkl_path = str(tmp_path / 'vectordb.pkl')
+    with open(pkl_path, 'wb') as f:
+        pickle.dump({'embeddings': embeddings, 'chunks': chunks, 'embedding_dim': 8}, f)
+
+    out_dir = str(tmp_path / 'vectordb')
+    assert convert_legacy_pickle(pkl_path, out_dir) == 30
+
+    store = VectorStore()
+    store.load(out_dir)
+    query = rng.standard_normal(8)
+
+    assert [r['chunk_id'] for r in store.search(query, top_k=5)] == _brute_force(embeddings, query, 5)
+    print("✓ Eski pickle dönüştürme testi geçti")
+
+
+def test_embedding_buffer_amortized_growth():
+    """Tampon kapasitesi ikiye katlanarak büyümeli, her eklemede kopyalanmamalı"""
+    buffer = EmbeddingBuffer(embedding_dim=4, capacity=4)
+    capacities = set()
+    for i in range(100):
+        assert buffer.append(np.full((1, 4), i)) == i
+        capacities.add(buffer.capacity)
+
+    assert len(buffer) == 100
+    assert sorted(capacities) == [4, 1024]
+    assert buffer.array[57, 0] == 57
+    print("✓ Tampon amortize büyüyor")
+
+
+def test_repeated_add_documents():
+    """build_index sonrası tekrar tekrar chunk eklenebilmeli"""
+    rng = np.random.default_rng(6)
+    store = VectorStore(embedding_dim=8)
+    all_embeddings = []
+    for batch in range(3):
+        embeddings = rng.standard_normal((10, 8))
+        all_embeddings.append(embeddings)
+        store.add_documents(_make_chunks(10, source=f'manual_{batch}.pdf'), embeddings)
+        store.build_index()
+
+    assert len(store.chunks) == len(store.embeddings) == 30
+    query = rng.standard_normal(8)
+    expected = _brute_force(np.vstack(all_embeddings), query, 5)
+    found = [int(r['source'][7]) * 10 + r['chunk_id'] for r in store.search(query, top_k=5)]
+    assert found == expected
+    print("✓ Tekrarlı ekleme testi geçti")
+
+
+def test_add_after_load(tmp_path):
+    """Diskten yüklenen DB'ye chunk eklenip tekrar kaydedilebilmeli"""
+    rng = np.random.default_rng(5)
+    store = VectorStore(embedding_dim=8)
+    store.add_documents(_make_chunks(10), rng.standard_normal((10, 8)))
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+
+    loaded = VectorStore()
+    loaded.load(path)
+    loaded.add_documents(_make_chunks(5, source='yeni.pdf'), rng.standard_normal((5, 8)))
+    assert isinstance(loaded.chunks, LazyChunkList)  # eski chunk'lar belleğe okunmadı
+    loaded.save(path)
+
+    reloaded = VectorStore()
+    reloaded.load(path)
+    assert len(reloaded.chunks) == 15
+    assert reloaded.chunks[-1]['source'] == 'yeni.pdf'
+    assert reloaded.chunks[3] == store.chunks[3]
+    print("✓ Yükleme sonrası ekleme testi geçti")
+
+
+def test_search_batch_matches_single():
+    """Toplu arama, tekil aramalarla aynı sonuçları vermeli"""
+    rng = np.random.default_rng(3)
+    store = VectorStore(embedding_dim=16)
+    store.add_documents(_make_chunks(100), rng.standard_normal((100, 16)))
+    store.build_index()
+
+    queries = rng.standard_normal((7, 16))
+    batch = store.search_batch(queries, top_k=4)
+
+    assert len(batch) == 7
+    for query, results in zip(queries, batch):
+        single = store.search(query, top_k=4)
+        assert [r['chunk_id'] for r in results] == [r['chunk_id'] for r in single]
+    print("✓ Toplu arama tekil aramalarla tutarlı")
+
+
+def test_delete_source_skipped_in_search(tmp_path):
+    """Silinen kaynağın chunk'ları aramada dönmemeli ve kayıtta yer almamalı"""
+    rng = np.random.default_rng(6)
+    embeddings = rng.standard_normal((60, 8))
+    store = VectorStore(embedding_dim=8, compaction_threshold=0.9)
+    store.add_documents(_make_chunks(30, 'eski.pdf'), embeddings[:30])
+    store.add_documents(_make_chunks(30, 'diger.pdf'), embeddings[30:])
+    store.build_index()
+
+    assert store.delete_source('eski.pdf') == 30
+    assert store.delete_source('eski.pdf') == 0
+    assert store.deleted_count == 30 and store.live_count == 30
+    assert store.sources() == ['diger.pdf']
+
+    results = store.search(embeddings[0], top_k=40)
+    assert len(results) == 30
+    assert all(r['source'] == 'diger.pdf' for r in results)
+
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+    loaded = VectorStore()
+    loaded.load(path)
+    assert len(loaded.chunks) == 30 and loaded.deleted_count == 0
+    print("✓ Silinen kaynak aramada atlandı")
+
+
+def test_replace_source_and_compaction():
+    """Kaynak değiştirilince eski chunk'lar gitmeli, eşik aşılınca sıkıştırılmalı"""
+    rng = np.random.default_rng(7)
+    embeddings = rng.standard_normal((50, 8))
+    store = VectorStore(embedding_dim=8, quantization='int8', compaction_threshold=0.25)
+    store.add_documents(_make_chunks(10, 'a.pdf'), embeddings[:10])
+    store.add_documents(_make_chunks(30, 'b.pdf'), embeddings[10:40])
+    store.build_index()
+
+    # 10/50 silinmiş: eşik altında, tombstone olarak kalır
+    new_chunks = [{'text': f'yeni {i}', 'source': 'a.pdf', 'chunk_id': i} for i in range(10)]
+    store.replace_source('a.pdf', new_chunks, embeddings[40:])
+    assert store.deleted_count == 10
+    assert store.search(embeddings[0], top_k=1)[0]['text'] != 'chunk 0'
+    assert store.search(embeddings[45], top_k=1)[0]['text'] == 'yeni 5'
+
+    # 30 daha silinince oran eşiği aşar ve satırlar fiziksel olarak çıkar
+    store.delete_source('b.pdf')
+    assert store.deleted_count == 0
+    assert len(store.embeddings) == len(store.chunks) == len(store.codes) == 10
+    assert store.search(embeddings[42], top_k=1)[0]['text'] == 'yeni 2'
+    print("✓ Kaynak değiştirme ve sıkıştırma")
+
+
+def test_concurrent_writer_does_not_break_loaded_store(tmp_path):
+    """Başka bir store DB'yi yeniden kaydedince yüklü store kendi sürümünü tutarlı okumalı"""
+    rng = np.random.default_rng(8)
+    embeddings = rng.standard_normal((40, 8))
+    path = str(tmp_path / 'vectordb')
+    store = VectorStore(embedding_dim=8)
+    store.add_documents(_make_chunks(20, 'a.pdf'), embeddings[:20])
+    store.add_documents([{'text': f'b {i}', 'source': 'b.pdf', 'chunk_id': i} for i in range(20)],
+                        embeddings[20:])
+    store.save(path)
+
+    reader, writer = VectorStore(), VectorStore()
+    reader.load(path)
+    writer.load(path)
+    assert writer.delete_source('a.pdf') == 20
+    writer.save(path)
+
+    # Okuyucu eski chunk'ları eski embedding'lerle eşleşmiş görür (bozuk JSON / kayma yok)
+    assert reader.search(embeddings[3], top_k=1)[0]['text'] == 'chunk 3'
+    assert [c['text'] for c in reader.chunks][25] == 'b 5'
+    # Yazıcı kendi klasörüne tekrar kaydedebilir; kayıttan sonra yeni dosyalar tembel açılır
+    assert len(writer.chunks) == 20
+    assert writer.search(embeddings[25], top_k=1)[0]['text'] == 'b 5'
+    writer.add_documents([{'text': 'c 0', 'source': 'c.pdf', 'chunk_id': 0}], -embeddings[:1])
+    writer.save(path)
+    assert isinstance(writer.chunks, LazyChunkList) and isinstance(writer.embeddings, np.memmap)
+    assert writer.search(-embeddings[0], top_k=1)[0]['text'] == 'c 0'
+    writer.add_documents([{'text': 'c 1', 'source': 'c.pdf', 'chunk_id': 1}], -embeddings[1:2])
+    writer.save(path)
+    assert writer.search(-embeddings[1], top_k=1)[0]['text'] == 'c 1'
+    assert reader.search(embeddings[3], top_k=1)[0]['text'] == 'chunk 3'
+
+    reader.close()
+    fresh = VectorStore()
+    fresh.load(path)
+    assert fresh.search(embeddings[25], top_k=1)[0]['text'] == 'b 5' and len(fresh.chunks) == 22
+    print("✓ Eşzamanlı yazıcı")
+
+
+def _tagged_chunks():
+    """Farklı jeneratör ve sayfalara ait test chunk'ları"""
+    chunks = []
+    for i in range(90):
+        chunks.append({
+            'text': f'chunk {i}',
+            'source': f'manual_{i % 3}.pdf',
+            'generator_id': ['caterpillar_3406', 'cummins_qsx15', 'general'][i % 3],
+            'page': i // 10 + 1,
+            'chunk_id': i,
+        })
+    return chunks
+
+
+def test_filtered_search_matches_post_filter(tmp_path):
+    """Filtreli arama, tam aramanın filtrelenmiş sonucuyla aynı olmalı"""
+    rng = np.random.default_rng(8)
+    embeddings = rng.standard_normal((90, 8))
+    chunks = _tagged_chunks()
+    filters = {'generator_id': ['caterpillar_3406', 'general'], 'page': [1, 2, 3]}
+    allowed = [i for i, c in enumerate(chunks)
+               if c['generator_id'] in filters['generator_id'] and c['page'] in filters['page']]
+
+    for quantization in ['float32', 'int8']:
+        store = VectorStore(embedding_dim=8, quantization=quantization, rescore_factor=10)
+        store.add_documents(chunks, embeddings)
+        query = rng.standard_normal(8)
+
+        expected = [allowed[i] for i in _brute_force(embeddings[allowed], query, 5)]
+        results = store.search(query, top_k=5, filters=filters)
+        assert [r['chunk_id'] for r in results] == expected
+        batch = store.search_batch(np.stack([query, query]), top_k=5, filters=filters)
+        assert [r['chunk_id'] for r in batch[1]] == expected
+
+    assert store.search(query, top_k=5, filters={'source': 'yok.pdf'}) == []
+
+    # Posting listeleri DB ile birlikte kaydedilir
+    path = str(tmp_path / 'vectordb')
+    store.save(path)
+    loaded = VectorStore()
+    loaded.load(path)
+    assert len(loaded.metadata) == 90
+    assert [r['chunk_id'] for r in loaded.search(query, top_k=5, filters=filters)] == expected
+    print("✓ Metadata filtreli arama")
+
+
+def test_filtered_search_with_index_and_deletes():
+    """ANN indeksli store'da filtre ve silme birlikte çalışmalı"""
+    rng = np.random.default_rng(9)
+    embeddings = rng.standard_normal((90, 8))
+    store = VectorStore(embedding_dim=8, index_type='ivf',
+                        index_params={'n_lists': 4, 'nprobe': 4}, compaction_threshold=0.9)
+    store.add_documents(_tagged_chunks(), embeddings)
+    store.build_index()
+    store.delete_source('manual_0.pdf')
+
+    query = embeddings[4]
+    for limit in [VectorStore.FILTER_EXACT_LIMIT, 0]:  # aday skorlama / ANN + maske
+        store.FILTER_EXACT_LIMIT = limit
+        results = store.search(query, top_k=3, filters={'generator_id': ['caterpillar_3406', 'cummins_qsx15']})
+        assert [r['chunk_id'] for r in results][0] == 4
+        assert all(r['generator_id'] == 'cummins_qsx15' for r in results)
+
+    store.compact()
+    assert store.metadata.values('source') == ['manual_1.pdf', 'manual_2.pdf']
+    results = store.search(query, top_k=3, filters={'page': 1})
+    assert all(r['page'] == 1 for r in results)
+    print("✓ İndeksli store'da filtre + silme")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    print("=" * 60)
+    print("Vektör Veritabanı Testleri")
+    print("=" * 60 + "\n")
+
+    test_embeddings_normalized_once()
+    test_search_matches_brute_force()
+    test_search_top_k_larger_than_corpus()
+    test_search_batch_matches_single()
+    test_embedding_buffer_amortized_growth()
+    test_repeated_add_documents()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_save_load_roundtrip(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_legacy_pickle_conversion(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_add_after_load(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_delete_source_skipped_in_search(Path(tmp))
+    test_replace_source_and_compaction()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_concurrent_writer_does_not_break_loaded_store(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_filtered_search_matches_post_filter(Path(tmp))
+    test_filtered_search_with_index_and_deletes()
+
+    print("\n" + "=" * 60)
+    print("✅ Tüm testler başarılı!")
+    print("=" * 60)
@@ -0,0 +1,81 @@
+"""
+Model Isınması, keep_alive ve Soğuk/Sıcak İlk Token Testleri
+
+Ollama istemcisi istekleri kaydeden sahte bir istemciyle değiştirilir (conftest.py).
+"""
+
+import os
+import sys
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rag_engine import RAGEngine, keep_alive_value
+
+
+def test_keep_alive_value():
+    """Süre metinleri aynen, sayılar saniye olarak gönderilmeli"""
+    assert keep_alive_value('30m') == '30m'
+    assert keep_alive_value('-1') == -1.0 and keep_alive_value('600') == 600.0
+    assert keep_alive_value('') is None and keep_alive_value(None) is None
+    print("✓ keep_alive değerleri")
+
+
+def test_warm_up_prefix_and_cold_warm_ttft(fake_ollama, oil_chunks):
+    """Isınma, gerçek soruyla aynı önek ve num_ctx'i kullanmalı; soğuk/sıcak ayrılmalı"""
+    fake_ollama.first_load = 4.0
+
+    rag = RAGEngine(llm_model='test', llm_keep_alive='30m')
+    warm_up = rag.warm_up()
+    assert warm_up['error'] is None and warm_up['load'] == 4.0
+
+    rag.generate_answer("Yağ nasıl boşaltılır?", context_chunks=oil_chunks)
+    rag.generate_answer("E101 nedir?", context_chunks=[])
+    first, second, third = fake_ollama.requests
+
+    # Sabit önek: sistem mesajı aynı, değişen kısım kullanıcı mesajında ve soru en sonda
+    assert first['messages'][0] == second['messages'][0] == third['messages'][0]
+    assert second['messages'][1]['content'].startswith("📚 İLGİLİ DOKÜMAN BİLGİLERİ")
+    assert "SORU: Yağ nasıl boşaltılır?" in second['messages'][1]['content'].split("[Kaynak 1")[-1]
+
+    # Isınma tipik prompt'un kovasını kullanır (bütçenin tamamının değil); sorular aynı kovada
+    assert first['options']['num_ctx'] == second['options']['num_ctx'] == third['options']['num_ctx'] == 2048
+    assert all(r['keep_alive'] == '30m' for r in fake_ollama.requests)
+
+    # Isınmadan sonraki istekler sıcak
+    summary = rag.llm.ttft_summary()
+    assert summary['warm']['count'] == 2 and summary['cold']['count'] == 0
+    assert rag.llm.last_timing['cold'] is False and rag.llm.last_timing['load'] == 0.001
+    print("✓ Isınma, sabit önek ve sıcak ilk token")
+
+
+def test_pin_num_ctx_opt_in(fake_ollama):
+    """num_ctx varsayılan olarak prompt'a göre seçilmeli; sabitleme açıksa küçülmemeli"""
+    long_context = [{'text': 'Yağ tahliye tapasını açın ve bekleyin. ' * 150, 'source': 'bakim.pdf'}]
+
+    for pin, expected in ((False, [3072, 2048]), (True, [3072, 3072])):
+        fake_ollama.requests = []
+        rag = RAGEngine(llm_model='test', pin_num_ctx=pin)
+        rag.generate_answer("Yağ nasıl boşaltılır?", context_chunks=long_context)
+        rag.generate_answer("E101 nedir?", context_chunks=[])
+        assert [r['options']['num_ctx'] for r in fake_ollama.requests] == expected
+    print("✓ num_ctx sabitleme isteğe bağlı")
+
+
+def test_cold_request_without_warm_up(fake_ollama, oil_chunks):
+    """Isınma yapılmadıysa model yükleyen ilk istek soğuk sayılmalı"""
+    fake_ollama.first_load = 4.0
+
+    rag = RAGEngine(llm_model='test')
+    rag.generate_answer("Yağ nasıl boşaltılır?", context_chunks=oil_chunks)
+    assert rag.llm.last_timing['cold'] and rag.llm.last_timing['load'] == 4.0
+    assert fake_ollama.requests[0]['keep_alive'] is None
+    rag.generate_answer("Yağ nasıl boşaltılır?", context_chunks=oil_chunks)
+    assert rag.llm.ttft_summary()['cold']['count'] == 1
+    assert rag.llm.ttft_summary()['warm']['count'] == 1
+    print("✓ Soğuk ilk istek")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))